@@ -0,0 +1,88 @@
+# advice_prefetch.py
+import os
+import threading
+import streamlit as st
+import gemini_client
+from ai_functions import get_ai_advice, LLM_ENABLED
+from job_queue import job_key, submit, get_job, release, get_queue_metrics
+
+# Suggested questions answered ahead of time when a project with skill gaps is selected, once the
+# session has used the advisor (picked a project or asked something there; see mark_advisor_used).
+# Budget: at most PREFETCH_PER_PROJECT suggestions per gap state, PREFETCH_PER_MINUTE model calls
+# per process, and only while no other job is waiting for a worker. Either set to 0 turns prefetching off.
+PREFETCH_PER_PROJECT = int(os.getenv("ADVISOR_PREFETCH", "3"))
+PREFETCH_PER_MINUTE = float(os.getenv("ADVISOR_PREFETCH_PER_MINUTE", "10"))
+PREFETCH_ENABLED = PREFETCH_PER_PROJECT > 0 and PREFETCH_PER_MINUTE > 0
+
+_budget = gemini_client.TokenBucket(PREFETCH_PER_MINUTE / 60.0, PREFETCH_PER_PROJECT) if PREFETCH_ENABLED else None
+_metrics_lock = threading.Lock()
+_metrics = {"prefetched": 0, "hits": 0, "misses": 0, "discarded": 0, "skipped_budget": 0, "skipped_busy": 0}
+
+def _count(name, amount=1):
+    with _metrics_lock:
+        _metrics[name] += amount
+
+def advice_key(project, question, missing_skills):
+    """Job key for an advice request; changes with the team, so answers never outlive the team they were for"""
+    return job_key("advice", project.get('id'), project['name'], question, missing_skills,
+                   [e.get('id') or e.get('name') for e in project.get('team', [])])
+
+def submit_advice(project, question, missing_skills):
+    """Submit (or join) the advice job for a question; a prefetched answer is picked up instantly"""
+    key = advice_key(project, question, missing_skills)
+    # Only this session's own prefetches count as hits, not jobs other sessions happened to start
+    prefetched = st.session_state.get('advice_prefetch')
+    if prefetched and key in prefetched["keys"]:
+        # Someone is waiting on it now: the prefetch's submission becomes the question's, so a
+        # later discard must not release it
+        prefetched["keys"].remove(key)
+        job = get_job(key)
+        if job and job["status"] != "failed":
+            _count("hits")
+            return key
+    _count("misses")
+    snapshot = dict(project, team=list(project.get('team', [])))
+    return submit(key, get_ai_advice, snapshot, question)
+
+def mark_advisor_used():
+    """Allow prefetching for this session: it has picked a project or asked a question in the advisor"""
+    st.session_state.advisor_used = True
+
+def prefetch_suggestions(project, suggestions, missing_skills):
+    """Start background answers for the first suggested questions of the current gap state.
+    Prefetches made for an earlier state of the project (e.g. before the team changed) are released:
+    cancelled unless another session has joined them or they already started.
+    Does nothing until mark_advisor_used: the advisor tab also renders while other tabs are in use."""
+    if not st.session_state.get('advisor_used'):
+        return
+    state = advice_key(project, "", missing_skills)
+    previous = st.session_state.get('advice_prefetch')
+    if previous and previous["state"] != state:
+        for key in previous["keys"]:
+            release(key)
+        _count("discarded", len(previous["keys"]))
+        previous = None
+    if not missing_skills or not LLM_ENABLED or not PREFETCH_ENABLED:
+        st.session_state.advice_prefetch = {"state": state, "keys": []}
+        return
+    keys = previous["keys"] if previous else []
+    st.session_state.advice_prefetch = {"state": state, "keys": keys}
+    snapshot = dict(project, team=list(project.get('team', [])))
+    for question in suggestions[:PREFETCH_PER_PROJECT]:
+        key = advice_key(project, question, missing_skills)
+        if key in keys or get_job(key) is not None:
+            continue
+        # Never compete with jobs users are waiting for, nor hammer a failing model
+        if get_queue_metrics()["pending"] or gemini_client.get_metrics()["breaker_state"] == "open":
+            _count("skipped_busy")
+            return
+        if not _budget.acquire(0):
+            _count("skipped_budget")
+            return
+        submit(key, get_ai_advice, snapshot, question)
+        keys.append(key)
+        _count("prefetched")
+
+def get_prefetch_metrics():
+    with _metrics_lock:
+        return dict(_metrics, per_project=PREFETCH_PER_PROJECT, per_minute=PREFETCH_PER_MINUTE)
@@ -0,0 +1,238 @@
+# advice_replay.py
+"""Replay every chat-history question through the advisor pipeline (get_ai_advice).
+
+Every department's chat history is replayed (see shard_store), archived entries included. Each
+record's project is rebuilt from its department's projects.json (by id or name) or, for projects
+that no longer exist, from the missing skills saved with the record. Per-stage latency is measured
+(gaps, prompt, llm, fallback, save) along with throughput at the chosen concurrency; saves go
+to scratch copies of the chat history shards. Then every record is rendered once more with the model
+disabled and compared with a golden file of fallback outputs, so changes to the advisor path
+can be checked against real traffic.
+
+Run:  python advice_replay.py --llm local --concurrency 8
+      python advice_replay.py --update-golden   (after an intended change to the fallback text)
+"""
+import argparse
+import hashlib
+import json
+import os
+import re
+import shutil
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from shard_store import DEPARTMENT_FIELD, read_json, shard_files, shard_path
+
+APP_DIR = os.path.dirname(os.path.abspath(__file__))
+CHAT_FILE = "chat_history.json"
+PROJ_FILE = "projects.json"
+GOLDEN_FILE = "advice_replay_golden.json"
+STAGES = ["gaps", "prompt", "llm", "fallback", "save", "total"]
+_MISSING_LINE = re.compile(r"\*\*Missing Skills:\*\*\s*(.+)")
+
+def _percentile(values, pct):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+def _stats(latencies):
+    ms = [latency * 1000 for latency in latencies]
+    return {"count": len(ms), "p50_ms": round(_percentile(ms, 50), 2), "p95_ms": round(_percentile(ms, 95), 2),
+            "p99_ms": round(_percentile(ms, 99), 2), "mean_ms": round(statistics.mean(ms), 2),
+            "max_ms": round(max(ms), 2)}
+
+def record_key(record):
+    if record.get("id"):
+        return record["id"]
+    parts = [record.get("timestamp", ""), record.get("project", ""), record.get("question", "")]
+    if record.get(DEPARTMENT_FIELD):
+        parts.append(record[DEPARTMENT_FIELD])  # unsharded records keep their original keys
+    raw = "|".join(parts)
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+def recorded_text(record):
+    """The answer saved with a record, if it is a usable model/advisor response"""
+    body = record.get("advice") or record.get("response")
+    if isinstance(body, dict):
+        body = body.get("answer")
+    if not isinstance(body, str) or not body.strip() or body.startswith("_"):
+        return None
+    return body
+
+def load_records(chat_file):
+    """Every shard's records (archived first, then the hot tier), tagged with their department"""
+    from chat_store import iter_archive
+    records = []
+    for department, shard in shard_files(chat_file):
+        with open(shard, "r", encoding="utf-8") as f:
+            hot = json.load(f)
+        records.extend(dict(record, **{DEPARTMENT_FIELD: department}) for record in list(iter_archive(shard)) + hot)
+    return records
+
+def load_projects(proj_file):
+    """Saved projects of every shard, by id and by (department, name)"""
+    projects = {}
+    for department, shard in shard_files(proj_file):
+        for project in read_json(shard, []):
+            projects[(department, project["name"])] = project
+            if project.get("id"):
+                projects[project["id"]] = project
+    return projects
+
+def rebuild_project(record, projects):
+    """Project dict for a record: the saved project if it still exists, else one built from the
+    missing skills stored with the record (or listed in its saved advice)"""
+    project = (projects.get(record.get("project_id"))
+               or projects.get((record.get(DEPARTMENT_FIELD, ""), record.get("project"))))
+    project = dict(project) if project else {"name": record.get("project") or "Unknown project"}
+    missing = record.get("missing_skills")
+    if missing is None and "team" not in project:
+        match = _MISSING_LINE.search(recorded_text(record) or "")
+        missing = [s.strip() for s in match.group(1).split(",") if s.strip()] if match else []
+    if missing is not None:
+        project["skill_gaps"] = {"missing_skills": list(missing)}
+    return project
+
+class RecordedModel:
+    """Answers an advice prompt with the response saved for the same project and question"""
+
+    def __init__(self, records):
+        from prompt_builder import compact_text, QUESTION_TOKEN_LIMIT
+        self.answers = {}
+        for record in records:
+            text = recorded_text(record)
+            if text:
+                question = compact_text(record.get("question", ""), QUESTION_TOKEN_LIMIT)
+                self.answers[(record.get("project"), question)] = text
+
+    def generate_content(self, prompt, request_options=None, **kwargs):
+        from local_llm import LocalResponse
+        project = re.search(r"^PROJECT: (.*)$", prompt, re.MULTILINE)
+        question = re.search(r"^QUESTION: (.*?)\n\nAnswer the question", prompt, re.MULTILINE | re.DOTALL)
+        key = (project and project.group(1), question and question.group(1))
+        return LocalResponse(self.answers.get(key, ""))
+
+def replay_one(record, project, chat_file):
+    """Replay a record, saving the advice to chat_file (the scratch copy of its shard)"""
+    from ai_functions import get_ai_advice
+    from chat_store import append_entry
+    timings = {}
+    start = time.perf_counter()
+    advice = get_ai_advice(project, record.get("question", ""), timings)
+    save_start = time.perf_counter()
+    append_entry(chat_file, {
+        "project": project["name"],
+        "question": record.get("question", ""),
+        "advice": advice,
+        "timestamp": time.strftime("%Y-%m-%d %H:%M"),
+        "missing_skills": project.get("skill_gaps", {}).get("missing_skills", []),
+    })
+    timings["save"] = time.perf_counter() - save_start
+    timings["total"] = time.perf_counter() - start
+    return timings
+
+def fallback_digests(records, projects):
+    """sha256 of the advice each record gets with the model disabled, by record key"""
+    import ai_functions
+    enabled, ai_functions.LLM_ENABLED = ai_functions.LLM_ENABLED, False
+    try:
+        return {record_key(r): hashlib.sha256(ai_functions.get_ai_advice(
+                    rebuild_project(r, projects), r.get("question", "")).encode("utf-8")).hexdigest()
+                for r in records}
+    finally:
+        ai_functions.LLM_ENABLED = enabled
+
+def check_golden(digests, golden_path, update):
+    """Compare with the golden file; returns (status, mismatched keys)"""
+    if update or not os.path.exists(golden_path):
+        with open(golden_path, "w", encoding="utf-8") as f:
+            json.dump(digests, f, indent=2, sort_keys=True)
+        return ("updated" if update else "created"), []
+    with open(golden_path, "r", encoding="utf-8") as f:
+        golden = json.load(f)
+    mismatched = [key for key, digest in digests.items() if key in golden and golden[key] != digest]
+    return ("identical" if not mismatched else "changed"), mismatched
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay chat history through the advisor pipeline")
+    parser.add_argument("--llm", choices=["local", "recorded", "off"], default="local",
+                        help="local stand-in model, the responses saved in the history, or fallback only")
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--rounds", type=int, default=1, help="times the whole history is replayed")
+    parser.add_argument("--llm-latency-ms", type=float, default=300, help="stand-in model latency (--llm local)")
+    parser.add_argument("--golden", default=os.path.join(APP_DIR, GOLDEN_FILE))
+    parser.add_argument("--update-golden", action="store_true")
+    parser.add_argument("--output", help="write the results as JSON")
+    args = parser.parse_args()
+
+    # Must be set before ai_functions/gemini_client are imported
+    os.environ["MODE"] = "off" if args.llm == "off" else "local"
+    os.environ["LOCAL_LLM_LATENCY_MS"] = str(args.llm_latency_ms)
+    os.environ["GEMINI_RPM"] = "1000000"
+    os.environ["GEMINI_BURST"] = str(max(5, args.concurrency))
+    sys.path.insert(0, APP_DIR)
+    import gemini_client
+    import ai_functions
+
+    records = load_records(os.path.join(APP_DIR, CHAT_FILE))
+    projects = load_projects(os.path.join(APP_DIR, PROJ_FILE))
+    if args.llm == "recorded":
+        gemini_client.use_model("advice", RecordedModel(records))
+    ai_functions.render_fallback_advice.cache_clear()
+
+    workdir = tempfile.mkdtemp(prefix="advice_replay_")
+    scratch_chats = {}
+    for department, shard in shard_files(os.path.join(APP_DIR, CHAT_FILE)):
+        scratch_chats[department] = shard_path(os.path.join(workdir, CHAT_FILE), department)
+        os.makedirs(os.path.dirname(scratch_chats[department]), exist_ok=True)
+        shutil.copy(shard, scratch_chats[department])
+    if os.path.exists(os.path.join(APP_DIR, "knowledge_base.json")):
+        shutil.copy(os.path.join(APP_DIR, "knowledge_base.json"), workdir)
+    os.chdir(workdir)
+
+    jobs = [(r, rebuild_project(r, projects)) for _ in range(args.rounds) for r in records]
+    stage_times = {stage: [] for stage in STAGES}
+    lock = threading.Lock()
+
+    def run(job):
+        timings = replay_one(job[0], job[1], scratch_chats[job[0][DEPARTMENT_FIELD]])
+        with lock:
+            for stage, seconds in timings.items():
+                stage_times[stage].append(seconds)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+        list(pool.map(run, jobs))
+    elapsed = time.perf_counter() - start
+
+    status, mismatched = check_golden(fallback_digests(records, projects), args.golden, args.update_golden)
+    shutil.rmtree(workdir, ignore_errors=True)
+
+    results = {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "config": {k: v for k, v in vars(args).items() if k not in ("golden", "update_golden", "output")},
+        "records": len(records),
+        "replayed": len(jobs),
+        "wall_seconds": round(elapsed, 3),
+        "throughput_per_s": round(len(jobs) / elapsed, 1),
+        "stages": {stage: _stats(times) for stage, times in stage_times.items() if times},
+        "llm_metrics": gemini_client.get_metrics(),
+        "golden": {"status": status, "mismatched": mismatched},
+    }
+    print(f"{len(jobs)} replays ({len(records)} records x {args.rounds}, --llm {args.llm}, "
+          f"concurrency {args.concurrency}) in {elapsed:.2f}s: {results['throughput_per_s']}/s")
+    print(f"{'stage':<10}{'count':>7}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'max ms':>10}")
+    for stage, stats in results["stages"].items():
+        print(f"{stage:<10}{stats['count']:>7}{stats['p50_ms']:>10.2f}{stats['p95_ms']:>10.2f}"
+              f"{stats['p99_ms']:>10.2f}{stats['max_ms']:>10.2f}")
+    print(f"Fallback outputs vs {os.path.basename(args.golden)}: {status}"
+          + (f" ({len(mismatched)} changed: {', '.join(mismatched[:5])})" if mismatched else ""))
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+    return 1 if mismatched else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
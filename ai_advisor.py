@@ -1,9 +1,12 @@
 # ai_advisor.py
 import streamlit as st
 from datetime import datetime
-from utils import save_json
-from ai_functions import get_ai_advice
+from chat_store import append_entry, project_history
 from core_functions import score_employee
+from knowledge_base import find_skill_solution
+from job_queue import pickup
+from advice_prefetch import mark_advisor_used, prefetch_suggestions, submit_advice
+from utils import data_path
 
 CHAT_FILE = "chat_history.json"
 
@@ -15,7 +18,8 @@ def render_ai_advisor():
     else:
         project_options = [p['name'] for p in st.session_state.projects]
         if project_options:
-            selected_project_name = st.selectbox("Select Project for Advice", options=project_options)
+            selected_project_name = st.selectbox("Select Project for Advice", options=project_options,
+                                                 key="advisor_project", on_change=mark_advisor_used)
             selected_project = next((p for p in st.session_state.projects if p['name'] == selected_project_name), None)
             
             if selected_project:
@@ -59,8 +63,8 @@ def render_ai_advisor():
                             # Show immediate solutions
                             st.subheader("🛠 Immediate Solutions")
                             for skill in missing_skills:
-                                if skill in st.session_state.knowledge_base.get("skill_solutions", {}):
-                                    solution_data = st.session_state.knowledge_base["skill_solutions"][skill]
+                                solution_data = find_skill_solution(skill)
+                                if solution_data:
                                     with st.expander(f"Solutions for {skill}", expanded=True):
                                         for i, solution in enumerate(solution_data.get("solutions", [])[:3]):
                                             st.write(f"**{i+1}. {solution}**")
@@ -96,12 +100,21 @@ def render_ai_advisor():
                         "What emerging technologies should we consider?"
                     ]
                 
+                # Answer the first suggestions in the background so clicking them is instant (only once
+                # the advisor has been used: every tab runs on every rerun)
+                prefetch_suggestions(selected_project, dynamic_suggestions, missing_skills)
+                
                 st.write("**Suggested Questions:**")
                 cols = st.columns(2)
                 for i, suggestion in enumerate(dynamic_suggestions):
                     with cols[i % 2]:
                         if st.button(suggestion, key=f"suggest_{i}", use_container_width=True):
+                            mark_advisor_used()
                             st.session_state.current_question = suggestion
+                            st.session_state.advice_job = {
+                                "key": submit_advice(selected_project, suggestion, missing_skills),
+                                "context": {"project": selected_project['name'], "question": suggestion,
+                                            "missing_skills": missing_skills}}
                             st.rerun()
                 
                 question = st.text_area(
@@ -118,34 +131,24 @@ def render_ai_advisor():
                 with col1:
                     if st.button("🚀 Get Detailed AI Analysis", type="primary", use_container_width=True):
                         if question.strip():
+                            mark_advisor_used()
                             import os
-                            # Verify API configuration
-                            if not os.getenv("GEMINI_API_KEY"):
+                            # Verify API configuration (MODE=local uses the offline stand-in model)
+                            mode = os.getenv("MODE", "gemini")
+                            if mode != "local" and not os.getenv("GEMINI_API_KEY"):
                                 st.error("⚠ Gemini API key not found. Please set GEMINI_API_KEY in your .env file.")
                                 st.info("Using enhanced fallback recommendations instead...")
-                            elif os.getenv("MODE", "gemini") != "gemini":
+                            elif mode not in ("gemini", "local"):
                                 st.warning(f"⚠ MODE is set to '{os.getenv('MODE', 'gemini')}'. Change to 'gemini' in .env file to use AI.")
                                 st.info("Using enhanced fallback recommendations instead...")
                             
-                            with st.spinner("🤔 AI is analyzing your project..."):
-                                advice = get_ai_advice(selected_project, question)
-                                
-                                # Display results
-                                st.subheader("🎯 AI Recommendations")
-                                st.markdown(advice)
-                                
-                                # Save to history
-                                chat_entry = {
-                                    "project": selected_project['name'],
-                                    "question": question,
-                                    "advice": advice,
-                                    "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M"),
-                                    "missing_skills": missing_skills
-                                }
-                                st.session_state.chat_history.append(chat_entry)
-                                save_json(CHAT_FILE, st.session_state.chat_history)
-                                
-                                st.session_state.current_question = ""
+                            # Runs on the shared worker pool; identical questions share one job
+                            key = submit_advice(selected_project, question, missing_skills)
+                            st.session_state.advice_job = {"key": key, "context": {
+                                "project": selected_project['name'],
+                                "question": question,
+                                "missing_skills": missing_skills
+                            }}
                         else:
                             st.warning("Please enter a question or select a suggestion.")
                 
@@ -166,16 +169,37 @@ def render_ai_advisor():
                             if missing_skills:
                                 st.write(f"**Critical Gaps:** {len(missing_skills)} skills")
                 
+                job = pickup("advice_job", "🤔 AI is analyzing your project...")
+                if job and job["status"] == "failed":
+                    st.error(f"AI analysis failed: {job['error']}")
+                elif job:
+                    advice = job["result"]
+                    
+                    # Display results
+                    st.subheader("🎯 AI Recommendations")
+                    st.markdown(advice)
+                    
+                    # Save to history
+                    chat_entry = {
+                        "project": job["context"]["project"],
+                        "question": job["context"]["question"],
+                        "advice": advice,
+                        "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M"),
+                        "missing_skills": job["context"]["missing_skills"]
+                    }
+                    st.session_state.chat_history = append_entry(data_path(CHAT_FILE), chat_entry)
+                    
+                    st.session_state.current_question = ""
+                
                 # Enhanced chat history
-                if st.session_state.chat_history:
-                    project_chats = [chat for chat in st.session_state.chat_history if chat.get('project') == selected_project['name']]
-                    if project_chats:
-                        st.subheader("📝 Conversation History")
-                        for i, chat in enumerate(reversed(project_chats[-5:])):  # Show last 5 chats
-                            with st.expander(f"💬 {chat.get('question', 'No question')[:70]}... ({chat.get('timestamp', 'No date')})", expanded=False):
-                                advice_text = chat.get('advice') or chat.get('response', 'No advice available')
-                                st.markdown(advice_text)
-                                
-                                # Show missing skills context
-                                if chat.get('missing_skills'):
-                                    st.caption(f"*Context: Missing skills - {', '.join(chat['missing_skills'])}*")
\ No newline at end of file
+                project_chats = project_history(data_path(CHAT_FILE), st.session_state.chat_history, selected_project['name'], limit=5)
+                if project_chats:
+                    st.subheader("📝 Conversation History")
+                    for i, chat in enumerate(reversed(project_chats)):  # Show last 5 chats
+                        with st.expander(f"💬 {chat.get('question', 'No question')[:70]}... ({chat.get('timestamp', 'No date')})", expanded=False):
+                            advice_text = chat.get('advice') or chat.get('response', 'No advice available')
+                            st.markdown(advice_text)
+                            
+                            # Show missing skills context
+                            if chat.get('missing_skills'):
+                                st.caption(f"*Context: Missing skills - {', '.join(chat['missing_skills'])}*")
\ No newline at end of file
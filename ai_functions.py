@@ -1,26 +1,34 @@
 # ai_functions.py
-import streamlit as st
-import json
-import re
 import os
+import time
+from functools import lru_cache
 from dotenv import load_dotenv
 import google.generativeai as genai
+import gemini_client
+from job_queue import notify
+from prompt_builder import fit_prompt, build_advice_prompt
+from structured_output import parse_structured
+from knowledge_base import find_skill_solution, get_knowledge_version
 
 load_dotenv()
 MODE = os.getenv("MODE", "gemini")
 GEMINI_KEY = os.getenv("GEMINI_API_KEY")
+# MODE=local swaps in the offline stand-in model (local_llm.py), no key needed
+LLM_ENABLED = MODE == "local" or (MODE == "gemini" and bool(GEMINI_KEY))
 
 # Configure API
 if GEMINI_KEY:
     genai.configure(api_key=GEMINI_KEY)
 
-def call_gemini(prompt):
-    """Return raw text from Gemini or error text"""
-    if not GEMINI_KEY or MODE != "gemini":
+def call_gemini(prompt, call_type="default"):
+    """Return raw text from Gemini or a sentinel string starting with "_" (see llm_failed).
+    call_type selects the generation config (see gemini_client.CALL_TYPE_CONFIGS)."""
+    if not LLM_ENABLED:
+        notify("Gemini is not configured (MODE / GEMINI_API_KEY): used the built-in fallback", "error")
         return "_NO_GEMINI_"
     try:
-        model = genai.GenerativeModel("gemini-2.5-flash")  # Updated model name
-        resp = model.generate_content(prompt)
+        model = gemini_client.get_model(call_type)
+        resp = gemini_client.generate(model, prompt)
         
         # Check if response has text
         if hasattr(resp, 'text') and resp.text:
@@ -28,45 +36,46 @@ def call_gemini(prompt):
         elif hasattr(resp, 'parts') and resp.parts:
             return resp.parts[0].text
         else:
+            notify("Gemini returned no text: used the built-in fallback")
             return "_ERROR_ No text in response"
+    except gemini_client.CircuitOpen:
+        # Gemini is failing repeatedly: go straight to the keyword-based fallbacks
+        notify("Gemini is unavailable after repeated failures: used the built-in fallback", "error")
+        return "_CIRCUIT_OPEN_"
+    except gemini_client.RateLimited:
+        notify("Gemini rate limit reached: used the built-in fallback")
+        return "_RATE_LIMITED_"
     except Exception as e:
-        st.error(f"Gemini API Error: {str(e)}")
+        notify(f"Gemini API Error: {str(e)}", "error")
         return f"_ERROR_ Gemini call failed: {e}"
 
-def parse_json_or_try_fix(raw_str):
-    try:
-        return json.loads(raw_str)
-    except Exception:
-        m = re.search(r"\{.*\}", raw_str, re.S)
-        if m:
-            candidate = m.group(0)
-            try:
-                return json.loads(candidate)
-            except Exception:
-                pass
-        return None
+def llm_failed(response):
+    """True when call_gemini returned no usable text (error, breaker open, rate limited, no key)"""
+    return not response or response.startswith("_")
 
-def call_gemini_json(prompt):
+def call_gemini_json(prompt, call_type="default"):
     """Ask Gemini and try to parse JSON reply. Return parsed_obj or None plus raw text."""
-    raw = call_gemini(prompt)
-    parsed = parse_json_or_try_fix(raw)
+    raw = call_gemini(prompt, call_type)
+    if llm_failed(raw):
+        return None, raw
+    parsed = parse_structured(raw, call_type)
     return parsed, raw
 
 def predict_project_summary(project_description):
     """AI predicts project summary"""
-    prompt = f"""
+    prompt = fit_prompt("summary", lambda description: f"""
     Create a concise 2-3 sentence summary of this project description. 
     Return ONLY the summary text without any additional commentary.
     
-    Project: {project_description}
+    Project: {description}
     
     Focus on the main goal, key features, and intended outcome.
-    """
+    """, project_description)
     
-    if MODE == "gemini" and GEMINI_KEY:
-        response = call_gemini(prompt)
+    if LLM_ENABLED:
+        response = call_gemini(prompt, "summary")
         # Clean the response
-        if response and not response.startswith("_"):
+        if not llm_failed(response):
             return response.strip()
     
     # Fallback summary
@@ -113,11 +122,11 @@ def extract_technologies_from_text(text):
 
 def predict_project_parameters(project_description):
     """AI predicts complexity, team size, and budget based on project description"""
-    prompt = f"""
+    prompt = fit_prompt("parameters", lambda description: f"""
     Analyze this project description and predict realistic parameters.
     Return ONLY valid JSON without any additional text.
     
-    Project: {project_description}
+    Project: {description}
     
     Consider factors like technical complexity, scope size, industry standards, and typical team sizes for similar projects.
     
@@ -143,15 +152,14 @@ def predict_project_parameters(project_description):
       "risk_level": "low/medium/high",
       "key_technologies": ["tech1", "tech2", "tech3"]
     }}
-    """
+    """, project_description)
     
-    if MODE == "gemini" and GEMINI_KEY:
-        parsed, raw = call_gemini_json(prompt)
+    if LLM_ENABLED:
+        parsed, raw = call_gemini_json(prompt, "parameters")
         if parsed:
-            # Validate the parsed data
-            if "recommended_team_size" in parsed:
-                # Ensure team size is within reasonable bounds
-                parsed["recommended_team_size"] = max(1, min(10, parsed["recommended_team_size"]))
+            # Schema already checked by parse_structured; ensure team size is within reasonable bounds
+            parsed["recommended_team_size"] = int(max(1, min(10, parsed["recommended_team_size"])))
+            parsed["estimated_budget"] = int(max(1000, parsed["estimated_budget"]))
             return parsed
     
     # Fallback predictions with better logic
@@ -197,24 +205,21 @@ def predict_project_parameters(project_description):
 
 def predict_required_skills(project_description):
     """Predict required skills for a project using AI"""
-    prompt = f"""
+    prompt = fit_prompt("skills", lambda description: f"""
     Analyze this project description and extract ALL required technical skills. 
     Return ONLY a JSON array of skill names without any additional text.
     
-    Project: {project_description}
+    Project: {description}
     
     Return format: ["Skill1", "Skill2", "Skill3", "Skill4", "Skill5", "Skill6"...]
-    """
+    """, project_description)
     
-    if MODE == "gemini" and GEMINI_KEY:
-        raw = call_gemini(prompt)
-        try:
-            skills_match = re.search(r'\[.*\]', raw)
-            if skills_match:
-                skills = json.loads(skills_match.group())
+    if LLM_ENABLED:
+        raw = call_gemini(prompt, "skills")
+        if not llm_failed(raw):
+            skills = parse_structured(raw, "skills")
+            if skills:
                 return skills
-        except:
-            pass
     
     # Fallback: Extract skills using keyword matching
     return extract_skills_from_text(project_description)
@@ -246,8 +251,17 @@ def extract_skills_from_text(text):
     
     return list(detected_skills)
 
-def get_ai_advice(project, question):
-    """Get AI advice for skill gaps and project challenges - FIXED VERSION"""
+def _lap(timings, stage, start):
+    """Add the time since start to timings[stage] (when timings is a dict); returns the new start"""
+    now = time.perf_counter()
+    if timings is not None:
+        timings[stage] = timings.get(stage, 0.0) + now - start
+    return now
+
+def get_ai_advice(project, question, timings=None):
+    """Get AI advice for skill gaps and project challenges - FIXED VERSION
+    timings, if given, receives seconds per stage: gaps, prompt, llm, fallback (see advice_replay.py)"""
+    started = time.perf_counter()
     # Calculate current skill gaps
     missing_skills = []
     
@@ -261,82 +275,39 @@ def get_ai_advice(project, question):
                 team_skills.update(emp.get('skills', []))
             required_skills_set = set(project['required_skills'])
             missing_skills = list(required_skills_set - team_skills)
+    started = _lap(timings, "gaps", started)
     
     if not missing_skills:
         return "## AI Analysis\n\nNo significant skill gaps identified for this project. The current team appears to have all the necessary skills for successful project delivery."
     
-    # Build comprehensive project context
-    project_context = f"""
-Project Name: {project['name']}
-Description: {project.get('description', 'No description')}
-Summary: {project.get('summary', 'No summary')}
-
-CRITICAL MISSING SKILLS: {', '.join(missing_skills)}
-Available Team Skills: {', '.join([s for emp in project.get('team', []) for s in emp.get('skills', [])])}
-Required Skills: {', '.join(project.get('required_skills', []))}
-
-Team Size: {len(project.get('team', []))} members
-Budget: ${project.get('budget', 0):,}
-Estimated Cost: ${project.get('estimated_cost', 0):,}
-Timeline: {project.get('timeline', 0)} days
-Complexity: {project.get('complexity', 'Unknown')}
-Risk Level: {project.get('risk_level', 'Unknown')}
-
-User Question: {question}
-"""
-    
-    prompt = f"""You are a senior project management consultant with 15+ years of experience in technology consulting and team building.
-
-CONTEXT:
-{project_context}
-
-TASK: Provide SPECIFIC, ACTIONABLE advice for handling the missing skills and answering the user's question.
-
-Your response MUST include:
-
-1. **Immediate Action Items** (What to do THIS WEEK)
-   - Specific steps to address each missing skill
-   - Who to contact, what to post, where to search
-
-2. **Cost-Effective Solutions** (with actual numbers)
-   - Hiring costs (hourly rates, total estimates)
-   - Training costs (programs, duration, pricing)
-   - Outsourcing options (vendors, pricing models)
-
-3. **Timeline Impact Analysis**
-   - How each solution affects the delivery date
-   - Critical path items
-   - Dependencies and risks
-
-4. **Risk Assessment**
-   - Specific risks for each missing skill
-   - Mitigation strategies
-   - Contingency plans
-
-5. **Recommended Approach**
-   - Your #1 recommended solution with full justification
-   - Step-by-step implementation plan
-   - Success metrics
-
-Format your response in clear markdown with headers (##) and bullet points.
-Be SPECIFIC - avoid generic advice. Give actual numbers, timelines, and actionable steps.
-"""
+    prompt = build_advice_prompt(project, missing_skills, question)
+    started = _lap(timings, "prompt", started)
     
     # Try to get AI response
-    if MODE == "gemini" and GEMINI_KEY:
+    if LLM_ENABLED:
         try:
-            response = call_gemini(prompt)
+            response = call_gemini(prompt, "advice")
             
             # Check if we got a valid response
-            if response and not response.startswith("_ERROR_") and not response.startswith("_NO_GEMINI_"):
+            if not llm_failed(response):
                 # Clean up the response
                 response = response.strip()
                 if len(response) > 100:  # Valid response should be substantial
+                    _lap(timings, "llm", started)
                     return response
         except Exception as e:
-            st.error(f"Error calling Gemini API: {str(e)}")
+            notify(f"Error calling Gemini API: {str(e)}", "error")
+        started = _lap(timings, "llm", started)
     
     # Enhanced fallback advice
+    advice = render_fallback_advice(tuple(missing_skills), get_knowledge_version())
+    _lap(timings, "fallback", started)
+    return advice
+
+@lru_cache(maxsize=256)
+def render_fallback_advice(missing_skills, knowledge_version):
+    """Keyword/knowledge-base advice used when Gemini is unavailable.
+    Memoized per missing-skill tuple; knowledge_version invalidates it when the knowledge base reloads."""
     fallback_advice = ["## AI Project Advisor - Comprehensive Solutions\n"]
     
     if missing_skills:
@@ -350,11 +321,7 @@ Be SPECIFIC - avoid generic advice. Give actual numbers, timelines, and actionab
         
         for skill in missing_skills:
             # Find matching solution data
-            solution_data = None
-            for skill_key in [skill, skill.lower(), skill.capitalize()]:
-                if skill_key in st.session_state.knowledge_base.get("skill_solutions", {}):
-                    solution_data = st.session_state.knowledge_base["skill_solutions"][skill_key]
-                    break
+            solution_data = find_skill_solution(skill)
             
             if solution_data:
                 fallback_advice.append(f"#### {skill} Solutions\n")
@@ -1,40 +1,138 @@
 # analytics.py
+import math
 import streamlit as st
+import pandas as pd
 import plotly.express as px
+import numpy as np
+from portfolio_summary import get_summary, get_all_departments_summary, cost_bucket_label
+from shard_store import list_departments, load_all
+from risk_simulation import simulate_portfolio, simulation_key
+from portfolio_gaps import SkillGapEngine, STATUS_LABELS, MISSING, ON_TEAM
+from roster_store import get_roster
+
+PROJ_FILE = "projects.json"
+PROJECTS_PER_PAGE = 10
+MAX_PROJECT_BARS = 25  # above this the cost chart switches to bucketed counts
 
 def render_analytics():
     st.header("📈 Analytics Dashboard")
-    
-    if st.session_state.projects:
+
+    # Portfolio-level view across every department's shard (read-only)
+    all_departments = bool(list_departments()) and st.radio(
+        "Scope", ["This department", "All departments"], horizontal=True, key="analytics_scope") == "All departments"
+    projects = load_all(PROJ_FILE) if all_departments else st.session_state.projects
+
+    if projects:
+        summary = get_all_departments_summary(projects) if all_departments else get_summary()
+
         # Project metrics
         st.subheader("Project Overview")
         col1, col2, col3 = st.columns(3)
         with col1:
-            st.metric("Total Projects", len(st.session_state.projects))
+            st.metric("Total Projects", summary["count"])
         with col2:
-            total_cost = sum(p.get('estimated_cost', 0) for p in st.session_state.projects)
-            st.metric("Total Estimated Cost", f"${total_cost:,.0f}")
+            st.metric("Total Estimated Cost", f"${summary['total_cost']:,.0f}")
         with col3:
-            avg_team_size = sum(p.get('team_size', 0) for p in st.session_state.projects) / len(st.session_state.projects)
+            avg_team_size = summary["total_team_size"] / summary["count"] if summary["count"] else 0
             st.metric("Avg Team Size", round(avg_team_size, 1))
-        
-        # Project list
+
+        # Project list (one page at a time)
         st.subheader("Projects")
-        for i, project in enumerate(st.session_state.projects):
-            with st.expander(f"{i+1}. {project['name']} - ${project.get('estimated_cost', 0):,.0f}"):
+        page_count = max(1, math.ceil(len(projects) / PROJECTS_PER_PAGE))
+        page = 1
+        if page_count > 1:
+            page = st.number_input(f"Page (of {page_count})", min_value=1, max_value=page_count, value=1, step=1, key="analytics_page")
+        start = (page - 1) * PROJECTS_PER_PAGE
+        for i, project in enumerate(projects[start:start + PROJECTS_PER_PAGE], start):
+            department = f" [{project.get('department') or 'Shared'}]" if all_departments else ""
+            with st.expander(f"{i+1}. {project['name']}{department} - ${project.get('estimated_cost', 0):,.0f}"):
                 st.write(f"**Summary:** {project.get('summary', 'No summary')}")
                 st.write(f"**Team:** {', '.join([e['name'] for e in project.get('team', [])])}")
                 st.write(f"**Timeline:** {project.get('timeline', 0)} days")
                 st.write(f"**Complexity:** {project.get('complexity', 'Unknown')}")
                 if project.get('skill_gaps'):
                     st.write(f"**Skill Coverage:** {project['skill_gaps'].get('coverage_percentage', 0)}%")
-        
+
         # Cost comparison chart
         st.subheader("Project Cost Comparison")
-        project_names = [p['name'] for p in st.session_state.projects]
-        project_costs = [p.get('estimated_cost', 0) for p in st.session_state.projects]
-        if project_costs:
+        if summary["count"] <= MAX_PROJECT_BARS:
+            project_names = [p['name'] for p in projects]
+            project_costs = [p.get('estimated_cost', 0) for p in projects]
             fig = px.bar(x=project_names, y=project_costs, title="Project Costs")
-            st.plotly_chart(fig, use_container_width=True)
+        else:
+            buckets = sorted(summary["cost_buckets"].items())
+            fig = px.bar(x=[cost_bucket_label(b) for b, _ in buckets], y=[n for _, n in buckets],
+                         title="Projects by Estimated Cost", labels={'x': 'Cost Range', 'y': 'Projects'})
+        st.plotly_chart(fig, use_container_width=True)
+
+        render_skill_gaps(projects)
+        render_risk_simulation(projects)
     else:
-        st.info("No projects yet. Analyze a project to see analytics here.")
\ No newline at end of file
+        st.info("No projects yet. Analyze a project to see analytics here.")
+
+def render_risk_simulation(projects):
+    st.subheader("🎲 Schedule & Cost Risk")
+    if not st.checkbox("Run Monte Carlo risk simulation", key="risk_simulation_on"):
+        return
+    # Re-simulated only when a project (or the knowledge base) changes
+    key = simulation_key(projects)
+    cached = st.session_state.get('risk_simulation')
+    if not cached or cached["key"] != key:
+        cached = {"key": key, "result": simulate_portfolio(projects)}
+        st.session_state.risk_simulation = cached
+    result = cached["result"]
+    portfolio = result["portfolio"]
+
+    col1, col2, col3, col4 = st.columns(4)
+    with col1:
+        st.metric("Portfolio Cost P50", f"${portfolio['cost_p50']:,.0f}")
+    with col2:
+        st.metric("Portfolio Cost P90", f"${portfolio['cost_p90']:,.0f}")
+    with col3:
+        st.metric("Longest Timeline P50", f"{portfolio['timeline_p50']} days")
+    with col4:
+        st.metric("Longest Timeline P90", f"{portfolio['timeline_p90']} days")
+
+    table = pd.DataFrame(result["projects"]).rename(columns={
+        "name": "Project", "complexity": "Complexity", "missing_skills": "Missing Skills",
+        "timeline": "Timeline (est.)", "timeline_p50": "Timeline P50", "timeline_p90": "Timeline P90",
+        "estimated_cost": "Cost (est.)", "cost_p50": "Cost P50", "cost_p90": "Cost P90"})
+    st.dataframe(table, use_container_width=True, hide_index=True)
+    fig = px.histogram(x=result["total_cost_samples"], nbins=50, title="Simulated Portfolio Cost",
+                       labels={'x': 'Total Cost ($)'})
+    st.plotly_chart(fig, use_container_width=True)
+    st.caption(f"{result['samples']:,} samples per project in {result['seconds'] * 1000:.0f} ms. "
+               "Timelines vary with complexity and each missing skill adds the knowledge base's timeline/cost impact.")
+
+def render_skill_gaps(projects):
+    st.subheader("🧩 Portfolio Skill Gaps")
+    # Kept for the session: each rerun only re-encodes projects whose skills or team changed
+    engine = st.session_state.get('portfolio_gaps')
+    if engine is None:
+        engine = st.session_state.portfolio_gaps = SkillGapEngine()
+    engine.sync(projects, get_roster())
+    table = engine.skill_table()
+    if not table:
+        st.info("No required skills recorded for these projects yet.")
+        return
+
+    names, skills, status = engine.heatmap()
+    # Repeated project names would be merged into one heatmap row
+    seen = {}
+    labels = []
+    for name in names:
+        seen[name] = seen.get(name, 0) + 1
+        labels.append(name if seen[name] == 1 else f"{name} ({seen[name]})")
+    hover = np.vectorize(lambda v: "" if np.isnan(v) else STATUS_LABELS[int(v)], otypes=[str])(status)
+    fig = px.imshow(status, x=skills, y=labels, zmin=MISSING, zmax=ON_TEAM, aspect="auto",
+                    color_continuous_scale=[[0, "#d62728"], [0.5, "#ffbf00"], [1, "#2ca02c"]],
+                    title="Required skills by project (red: nobody on the roster, amber: not on the team, green: covered)")
+    fig.update_traces(customdata=hover, hovertemplate="%{y}<br>%{x}: %{customdata}<extra></extra>")
+    fig.update_coloraxes(showscale=False)
+    fig.update_layout(height=max(300, 28 * len(labels) + 150))
+    st.plotly_chart(fig, use_container_width=True)
+
+    gaps = pd.DataFrame(table).rename(columns={
+        "skill": "Skill", "demand": "Projects Needing", "covered": "Covered by Team",
+        "shortfall": "Shortfall", "employees": "Employees with Skill"})
+    st.dataframe(gaps, use_container_width=True, hide_index=True)
@@ -0,0 +1,100 @@
+# api_load_test.py
+"""Load test for api_server.py.
+
+Run the server, then:  python api_load_test.py --concurrency 16 --requests 2000 --batch-size 50
+"""
+import argparse
+import http.client
+import json
+import random
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlparse
+
+SKILL_POOL = ["Python", "AI/ML", "React", "JavaScript", "Database", "DevOps", "Blockchain",
+              "Security", "Cloud", "Design", "Go", "SQL", "Docker", "Kubernetes"]
+COMPLEXITIES = ["low", "medium", "high", "very high"]
+DESCRIPTIONS = [
+    "A React dashboard backed by a Python API and a SQL database",
+    "Blockchain supply chain tracking with smart contracts and cloud hosting",
+    "Machine learning recommendations deployed with Docker and Kubernetes on AWS",
+]
+
+_local = threading.local()
+
+def _connection(url):
+    # One keep-alive connection per worker thread
+    if not hasattr(_local, "conn"):
+        parsed = urlparse(url)
+        _local.conn = http.client.HTTPConnection(parsed.hostname, parsed.port or 80, timeout=30)
+    return _local.conn
+
+def _random_project(i):
+    return {"id": f"p{i}", "required_skills": random.sample(SKILL_POOL, random.randint(2, 6)),
+            "team_size": random.randint(1, 8), "complexity": random.choice(COMPLEXITIES)}
+
+def _request_for(i, batch_size):
+    kind = i % 5
+    if kind == 0:
+        return "/batch/score", {"projects": [_random_project(j) for j in range(batch_size)]}
+    if kind == 1:
+        project = _random_project(i)
+        return "/team", {"required_skills": project["required_skills"], "team_size": project["team_size"]}
+    if kind == 2:
+        return "/skill-gaps", {"required_skills": random.sample(SKILL_POOL, 4)}
+    if kind == 3:
+        project = _random_project(i)
+        return "/estimate", project
+    return "/extract-skills", {"description": random.choice(DESCRIPTIONS)}
+
+def _call(url, path, body):
+    conn = _connection(url)
+    data = json.dumps(body)
+    start = time.perf_counter()
+    try:
+        conn.request("POST", path, body=data, headers={"Content-Type": "application/json"})
+        resp = conn.getresponse()
+        resp.read()
+        ok = resp.status == 200
+    except (OSError, http.client.HTTPException):
+        conn.close()
+        del _local.conn
+        ok = False
+    return path, time.perf_counter() - start, ok
+
+def _percentile(values, pct):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test the allocation API")
+    parser.add_argument("--url", default="http://127.0.0.1:8600")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--requests", type=int, default=1000)
+    parser.add_argument("--batch-size", type=int, default=50, help="projects per /batch/score request")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+    random.seed(args.seed)
+
+    jobs = [_request_for(i, args.batch_size) for i in range(args.requests)]
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+        results = list(pool.map(lambda job: _call(args.url, *job), jobs))
+    elapsed = time.perf_counter() - start
+
+    by_path = {}
+    for path, latency, ok in results:
+        by_path.setdefault(path, []).append((latency, ok))
+    print(f"{args.requests} requests in {elapsed:.2f}s -> {args.requests / elapsed:.0f} req/s "
+          f"(concurrency {args.concurrency}, batch size {args.batch_size})")
+    print(f"{'endpoint':<16}{'count':>7}{'errors':>8}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'mean ms':>9}")
+    for path, rows in sorted(by_path.items()):
+        latencies = [latency * 1000 for latency, _ in rows]
+        errors = sum(1 for _, ok in rows if not ok)
+        print(f"{path:<16}{len(rows):>7}{errors:>8}{_percentile(latencies, 50):>9.1f}{_percentile(latencies, 95):>9.1f}"
+              f"{_percentile(latencies, 99):>9.1f}{statistics.mean(latencies):>9.1f}")
+
+if __name__ == "__main__":
+    main()
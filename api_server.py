@@ -0,0 +1,162 @@
+# api_server.py
+"""Headless JSON API over the allocation functions.
+
+Run:  python api_server.py --port 8600
+Endpoints (all POST bodies are JSON):
+  GET  /health
+  POST /team            {"required_skills": [...], "team_size": 3}
+  POST /skill-gaps      {"required_skills": [...], "team_ids": [...]}   (team_ids optional: whole roster)
+  POST /estimate        {"complexity": "medium", "team_ids": [...]} or {"complexity", "required_skills", "team_size"}
+  POST /extract-skills  {"description": "...", "use_llm": false}
+  POST /batch/score     {"projects": [{"id", "required_skills", "team_size", "complexity"}, ...]}
+"""
+import argparse
+import json
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from core_functions import analyze_skill_gaps, calculate_project_timeline, estimate_project_cost
+from ai_functions import extract_skills_from_text, predict_required_skills
+from roster_store import get_roster
+
+# The roster snapshot (and its ranking cache) is reloaded by roster_store when employees.json changes
+EMP_FILE = "employees.json"
+MAX_BATCH_PROJECTS = 1000
+
+def _public(emp, score=None):
+    row = {"id": emp.get("id"), "name": emp.get("name"), "skills": list(emp.get("skills", [])), "experience": emp.get("experience", 1)}
+    if score is not None:
+        row["score"] = score
+    return row
+
+def team_request(body):
+    """(required_skills, team_size) from a request body or batch project, checked before anything is
+    scored (a bare string would be ranked as its characters). Raises ValueError, answered with a 400."""
+    required_skills = body.get("required_skills", [])
+    if not isinstance(required_skills, list) or not all(isinstance(s, str) and s.strip() for s in required_skills):
+        raise ValueError("required_skills must be a list of non-empty strings")
+    team_size = body.get("team_size", 3)
+    if isinstance(team_size, bool) or not isinstance(team_size, int) or team_size < 0:
+        raise ValueError("team_size must be a non-negative integer")
+    team_ids = body.get("team_ids", [])
+    if not isinstance(team_ids, list) or not all(isinstance(i, str) for i in team_ids):
+        raise ValueError("team_ids must be a list of employee ids")
+    return required_skills, team_size
+
+def build_team(required_skills, team_size):
+    roster = get_roster(EMP_FILE)
+    ranked, scores = roster.ranking(required_skills)
+    return [(roster[pos], int(scores[pos])) for pos in ranked[:team_size]]
+
+def roster_skill_gaps(required_skills):
+    # The snapshot already knows every skill held by anyone, no need to walk the roster
+    return analyze_skill_gaps(required_skills, [{"skills": get_roster(EMP_FILE).skill_names}])
+
+def score_project(project):
+    required_skills, team_size = team_request(project)
+    team = build_team(required_skills, team_size)
+    members = [emp for emp, _ in team]
+    timeline = calculate_project_timeline(project.get("complexity", "medium"), len(members))
+    return {
+        "id": project.get("id"),
+        "team": [_public(emp, score) for emp, score in team],
+        # Same meaning as a saved project's skill_gaps (against the whole roster), plus the team's own gaps
+        "skill_gaps": roster_skill_gaps(required_skills),
+        "team_skill_gaps": analyze_skill_gaps(required_skills, members),
+        "timeline": timeline,
+        "estimated_cost": estimate_project_cost(members, timeline),
+    }
+
+def handle_team(body):
+    team = build_team(*team_request(body))
+    return {"team": [_public(emp, score) for emp, score in team]}
+
+def handle_skill_gaps(body):
+    required_skills, _ = team_request(body)
+    if "team_ids" in body:
+        return analyze_skill_gaps(required_skills, get_roster(EMP_FILE).by_ids(body["team_ids"]))
+    return roster_skill_gaps(required_skills)
+
+def handle_estimate(body):
+    required_skills, team_size = team_request(body)
+    if "team_ids" in body:
+        team = get_roster(EMP_FILE).by_ids(body["team_ids"])
+    else:
+        team = [emp for emp, _ in build_team(required_skills, team_size)]
+    timeline = calculate_project_timeline(body.get("complexity", "medium"), len(team))
+    return {"timeline": timeline, "estimated_cost": estimate_project_cost(team, timeline), "team_size": len(team)}
+
+def handle_extract_skills(body):
+    description = body.get("description", "")
+    skills = predict_required_skills(description) if body.get("use_llm") else extract_skills_from_text(description)
+    return {"skills": skills}
+
+def handle_batch_score(body):
+    projects = body.get("projects", [])
+    if not isinstance(projects, list) or not all(isinstance(project, dict) for project in projects):
+        raise ValueError("projects must be a list of objects")
+    if len(projects) > MAX_BATCH_PROJECTS:
+        raise ValueError(f"at most {MAX_BATCH_PROJECTS} projects per batch")
+    for i, project in enumerate(projects):
+        try:
+            team_request(project)
+        except ValueError as e:
+            raise ValueError(f"projects[{i}]: {e}")
+    return {"results": [score_project(project) for project in projects]}
+
+ROUTES = {
+    "/team": handle_team,
+    "/skill-gaps": handle_skill_gaps,
+    "/estimate": handle_estimate,
+    "/extract-skills": handle_extract_skills,
+    "/batch/score": handle_batch_score,
+}
+
+class ApiHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive, so clients don't pay a TCP handshake per request
+    disable_nagle_algorithm = True  # headers and body are separate writes; avoid the delayed-ACK stall
+
+    def _send(self, status, payload):
+        data = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self):
+        if self.path == "/health":
+            self._send(200, {"status": "ok", "employees": len(get_roster(EMP_FILE))})
+        else:
+            self._send(404, {"error": "not found"})
+
+    def do_POST(self):
+        handler = ROUTES.get(self.path)
+        length = int(self.headers.get("Content-Length") or 0)
+        raw = self.rfile.read(length) if length else b"{}"
+        if handler is None:
+            self._send(404, {"error": "not found"})
+            return
+        try:
+            body = json.loads(raw or b"{}")
+            if not isinstance(body, dict):
+                raise ValueError("request body must be a JSON object")
+            self._send(200, handler(body))
+        except (ValueError, TypeError) as e:
+            self._send(400, {"error": str(e)})
+        except Exception as e:
+            self._send(500, {"error": str(e)})
+
+    def log_message(self, format, *args):
+        pass  # per-request logging would dominate at high request rates
+
+def main():
+    parser = argparse.ArgumentParser(description="Resource allocation HTTP API")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8600)
+    args = parser.parse_args()
+    server = ThreadingHTTPServer((args.host, args.port), ApiHandler)
+    server.daemon_threads = True
+    print(f"Serving on http://{args.host}:{args.port} ({len(get_roster(EMP_FILE))} employees)")
+    server.serve_forever()
+
+if __name__ == "__main__":
+    main()
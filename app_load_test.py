@@ -0,0 +1,269 @@
+# app_load_test.py
+"""Multi-session load test for the Streamlit app.
+
+Drives N concurrent headless sessions (streamlit.testing AppTest) through a planner's routine:
+analyze a project, add and remove a team member, ask the advisor, browse analytics and the
+employee database. LLM calls go to the local stand-in model (MODE=local, see local_llm.py).
+The app runs against a scratch copy of the data files, so the real ones are never touched.
+
+Run:  python app_load_test.py --sessions 20 --rounds 2 --output load_results.json
+"""
+import argparse
+import json
+import logging
+import os
+import resource
+import shutil
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+APP_DIR = os.path.dirname(os.path.abspath(__file__))
+DATA_FILES = ["employees.json", "projects.json", "chat_history.json", "knowledge_base.json"]
+JOB_POLL_SECONDS = 0.25
+JOB_TIMEOUT_SECONDS = 120
+DESCRIPTIONS = [
+    "A React dashboard backed by a Python API and a SQL database for warehouse analytics.",
+    "Blockchain supply chain tracking with smart contracts and cloud hosting.",
+    "Machine learning recommendations deployed with Docker and Kubernetes on AWS.",
+    "Customer portal with authentication, payments and a mobile-friendly design.",
+]
+QUESTIONS = [
+    "How can we cover the missing skills within budget?",
+    "What is the fastest way to staff this project?",
+    "Which risks should we mitigate first?",
+]
+
+def _percentile(values, pct):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+def _stats(latencies):
+    ms = [latency * 1000 for latency in latencies]
+    return {"count": len(ms), "p50_ms": round(_percentile(ms, 50), 1), "p95_ms": round(_percentile(ms, 95), 1),
+            "p99_ms": round(_percentile(ms, 99), 1), "mean_ms": round(statistics.mean(ms), 1),
+            "max_ms": round(max(ms), 1)}
+
+def _peak_rss_mb():
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)  # bytes on macOS, KiB on Linux
+
+class Recorder:
+    """Thread-safe collection of rerun latencies (per tab), job times and exceptions"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.reruns = {}
+        self.jobs = {}
+        self.exceptions = {}
+        self.timeouts = 0
+
+    def add(self, table, name, seconds):
+        with self.lock:
+            getattr(self, table).setdefault(name, []).append(seconds)
+
+    def exception(self, message):
+        with self.lock:
+            self.exceptions[message] = self.exceptions.get(message, 0) + 1
+
+def _make_apptest_thread_safe():
+    """AppTest assumes one test runs at a time; patch the process-wide bits it touches on every run:
+    - it installs a mock Runtime as a global and clears it afterwards: fall back to the last mock;
+    - it switches the global.appTest option on and back off: keep it on for the whole load test;
+    - CPython 3.11's parser is not safe to run from several threads ("AST constructor recursion
+      depth mismatch") and every AppTest compiles the script itself: compile one at a time."""
+    from streamlit import config
+    from streamlit.runtime import Runtime
+    from streamlit.runtime.scriptrunner import magic
+    last = {}
+
+    def instance(cls):
+        if cls._instance is not None:
+            last["runtime"] = cls._instance
+            return cls._instance
+        if "runtime" not in last:
+            raise RuntimeError("Runtime hasn't been created!")
+        return last["runtime"]
+
+    Runtime.instance = classmethod(instance)
+    Runtime.exists = classmethod(lambda cls: cls._instance is not None or "runtime" in last)
+    config.set_option("global.appTest", True)
+
+    add_magic = magic.add_magic
+    compile_lock = threading.Lock()
+
+    def locked_add_magic(code, script_path):
+        with compile_lock:
+            return add_magic(code, script_path)
+
+    magic.add_magic = locked_add_magic
+
+class PlannerSession:
+    """One simulated user; every rerun is timed and attributed to the tab being used"""
+
+    def __init__(self, number, recorder, timeout):
+        from streamlit.testing.v1 import AppTest
+        self.number = number
+        self.recorder = recorder
+        self.at = AppTest.from_file(os.path.join(APP_DIR, "main_app.py"), default_timeout=timeout)
+
+    def rerun(self, tab):
+        start = time.perf_counter()
+        self.at.run()
+        self.recorder.add("reruns", tab, time.perf_counter() - start)
+        for exc in self.at.exception:
+            self.recorder.exception(str(exc.value).splitlines()[0][:200])
+
+    def wait_for(self, tab, job, done, start):
+        """Rerun (as the progress poller would) until done() is true; records the job's wall time since start"""
+        while not done():
+            if time.perf_counter() - start > JOB_TIMEOUT_SECONDS:
+                with self.recorder.lock:
+                    self.recorder.timeouts += 1
+                return
+            time.sleep(JOB_POLL_SECONDS)
+            self.rerun(tab)
+        self.recorder.add("jobs", job, time.perf_counter() - start)
+
+    def _button(self, predicate):
+        return next((b for b in self.at.button if predicate(b)), None)
+
+    def _widget(self, kind, key):
+        return next((w for w in getattr(self.at, kind) if w.key == key), None)
+
+    def analyze_project(self, round_no):
+        self.at.text_area[0].set_value(DESCRIPTIONS[(self.number + round_no) % len(DESCRIPTIONS)])
+        self.rerun("Project Analysis")
+        button = self._button(lambda b: "Analyze Project" in b.label)
+        if button is None:
+            return
+        projects_before = len(self.at.session_state.projects)
+        start = time.perf_counter()
+        button.click()
+        self.rerun("Project Analysis")
+        self.wait_for("Project Analysis", "analysis", lambda: len(self.at.session_state.projects) > projects_before, start)
+
+    def edit_team(self):
+        add = self._button(lambda b: b.key and b.key.startswith("add_"))
+        if add is None:
+            return
+        add.click()
+        self.rerun("Team Builder")
+        remove = self._button(lambda b: b.key and b.key.startswith("remove_"))
+        if remove is not None:
+            remove.click()
+            self.rerun("Team Builder")
+
+    def ask_advisor(self, round_no):
+        question = self._widget("text_area", "question_input")
+        if question is None:
+            return
+        question.set_value(QUESTIONS[(self.number + round_no) % len(QUESTIONS)])
+        self.rerun("AI Advisor")
+        button = self._button(lambda b: "Detailed AI" in b.label)
+        if button is None:
+            return
+        history_before = len(self.at.session_state.chat_history)
+        start = time.perf_counter()
+        button.click()
+        self.rerun("AI Advisor")
+        self.wait_for("AI Advisor", "advice", lambda: len(self.at.session_state.chat_history) > history_before, start)
+
+    def browse(self):
+        page = self._widget("number_input", "analytics_page")
+        if page is not None:
+            page.set_value(min(2, page.max_value))
+        self.rerun("Analytics")
+        for query in ("a", ""):
+            search = self._widget("text_input", "emp_db_search")
+            if search is None:
+                break
+            search.set_value(query)
+            self.rerun("Employee Database")
+
+    def run(self, rounds):
+        self.rerun("Startup")
+        for round_no in range(rounds):
+            self.analyze_project(round_no)
+            self.edit_team()
+            self.ask_advisor(round_no)
+            self.browse()
+
+def _session_worker(number, recorder, rounds, timeout, ramp):
+    time.sleep(ramp * number)
+    try:
+        PlannerSession(number, recorder, timeout).run(rounds)
+    except Exception as e:  # a broken session should not stop the others
+        recorder.exception(f"{type(e).__name__}: {e}"[:200])
+
+def _print_table(title, rows):
+    print(f"{title:<20}{'count':>7}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'max ms':>9}")
+    for name, stats in rows.items():
+        print(f"{name:<20}{stats['count']:>7}{stats['p50_ms']:>9.1f}{stats['p95_ms']:>9.1f}{stats['p99_ms']:>9.1f}{stats['max_ms']:>9.1f}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test the Streamlit app with concurrent headless sessions")
+    parser.add_argument("--sessions", type=int, default=10)
+    parser.add_argument("--rounds", type=int, default=1, help="times each session repeats its routine")
+    parser.add_argument("--ramp", type=float, default=0.1, help="seconds between session starts")
+    parser.add_argument("--llm-latency-ms", type=float, default=300, help="simulated model latency")
+    parser.add_argument("--rpm", type=float, default=6000, help="model rate limit (GEMINI_RPM)")
+    parser.add_argument("--timeout", type=float, default=60, help="per-rerun timeout in seconds")
+    parser.add_argument("--output", default="load_results.json")
+    parser.add_argument("--keep-workdir", action="store_true")
+    args = parser.parse_args()
+
+    # Must be set before the app's modules are first imported by a session
+    os.environ["MODE"] = "local"
+    os.environ["LOCAL_LLM_LATENCY_MS"] = str(args.llm_latency_ms)
+    os.environ["GEMINI_RPM"] = str(args.rpm)
+    os.environ["GEMINI_BURST"] = str(max(5, args.sessions))
+    output = os.path.abspath(args.output)
+    sys.path.insert(0, APP_DIR)
+    # Sessions are driven from plain worker threads, which Streamlit warns about on every run.
+    # (A filter rather than a level: Streamlit resets its loggers' levels when it reads its config.)
+    logging.getLogger("streamlit.runtime.scriptrunner_utils.script_run_context").addFilter(
+        lambda record: "missing ScriptRunContext" not in record.getMessage())
+    _make_apptest_thread_safe()
+
+    workdir = tempfile.mkdtemp(prefix="app_load_test_")
+    for name in DATA_FILES:
+        if os.path.exists(os.path.join(APP_DIR, name)):
+            shutil.copy(os.path.join(APP_DIR, name), workdir)
+    os.chdir(workdir)
+
+    recorder = Recorder()
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.sessions) as pool:
+        for number in range(args.sessions):
+            pool.submit(_session_worker, number, recorder, args.rounds, args.timeout, args.ramp)
+    elapsed = time.perf_counter() - start
+
+    results = {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "config": {k: v for k, v in vars(args).items() if k not in ("output", "keep_workdir")},
+        "wall_seconds": round(elapsed, 2),
+        "reruns": sum(len(v) for v in recorder.reruns.values()),
+        "tabs": {tab: _stats(v) for tab, v in sorted(recorder.reruns.items())},
+        "jobs": {job: _stats(v) for job, v in sorted(recorder.jobs.items())},
+        "job_timeouts": recorder.timeouts,
+        "peak_rss_mb": _peak_rss_mb(),
+        "exceptions": recorder.exceptions,
+    }
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2)
+    if not args.keep_workdir:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    print(f"{args.sessions} sessions x {args.rounds} rounds: {results['reruns']} reruns in {elapsed:.1f}s, "
+          f"peak RSS {results['peak_rss_mb']} MB, {sum(recorder.exceptions.values())} exceptions, "
+          f"{recorder.timeouts} job timeouts")
+    _print_table("rerun latency", results["tabs"])
+    _print_table("job wall time", results["jobs"])
+    print(f"Results written to {output}")
+
+if __name__ == "__main__":
+    main()
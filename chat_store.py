@@ -0,0 +1,194 @@
+# chat_store.py
+import gzip
+import hashlib
+import json
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+from functools import lru_cache
+from shard_store import write_json
+
+# chat_history.json is the hot tier: the newest entries, uncompressed, loaded by every session.
+# Older entries are moved in batches to gzip'd JSONL segments under chat_archive/, with their
+# advice/response bodies stored once per distinct content (sha256) in chat_archive/blobs/.
+HOT_ENTRIES = 100
+ARCHIVE_BATCH = 50  # archive once the hot tier exceeds HOT_ENTRIES + ARCHIVE_BATCH
+ARCHIVE_DIR = "chat_archive"
+BODY_FIELDS = ("advice", "response")
+SEGMENT_CACHE_SIZE = 16  # decoded archive segments kept in memory for per-project lookups
+BLOB_CACHE_SIZE = 256
+
+_lock = threading.Lock()
+
+def _archive_dir(chat_file):
+    return os.path.join(os.path.dirname(os.path.abspath(chat_file)), ARCHIVE_DIR)
+
+def _read_json(path, default):
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return default
+
+def _write_json(path, data, indent=None):
+    # Atomic, with a unique temp file: _lock only serialises writers within this process
+    write_json(path, data, indent=indent)
+
+_index_cache = {}
+
+def _index_path(archive_dir):
+    return os.path.join(archive_dir, "index.json")
+
+def _load_index(archive_dir):
+    """Archive index for readers, cached in memory until index.json changes on disk"""
+    path = _index_path(archive_dir)
+    try:
+        mtime = os.stat(path).st_mtime_ns
+    except OSError:
+        return {"segments": [], "by_project": {}}
+    cached = _index_cache.get(path)
+    if cached and cached[0] == mtime:
+        return cached[1]
+    index = _read_json(path, {"segments": [], "by_project": {}})
+    _index_cache[path] = (mtime, index)
+    return index
+
+def _store_blob(archive_dir, body):
+    encoded = json.dumps(body, sort_keys=True, ensure_ascii=False).encode("utf-8")
+    digest = hashlib.sha256(encoded).hexdigest()
+    path = os.path.join(archive_dir, "blobs", digest[:2], digest + ".json.gz")
+    if not os.path.exists(path):
+        # Blobs are never rewritten once present, so a crash must not leave a truncated one behind
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as raw, gzip.GzipFile(fileobj=raw, mode="wb") as f:
+                f.write(encoded)
+            os.replace(tmp_path, path)
+        except BaseException:
+            try:
+                os.unlink(tmp_path)
+            except OSError:
+                pass
+            raise
+    return digest
+
+@lru_cache(maxsize=BLOB_CACHE_SIZE)  # content-addressed, so a blob never changes
+def _load_blob(archive_dir, digest):
+    with gzip.open(os.path.join(archive_dir, "blobs", digest[:2], digest + ".json.gz"), "rb") as f:
+        return json.loads(f.read().decode("utf-8"))
+
+def _archive(chat_file, entries):
+    """Append entries (oldest first) to a new compressed segment and index them"""
+    archive_dir = _archive_dir(chat_file)
+    os.makedirs(archive_dir, exist_ok=True)
+    # Fresh copy from disk: the cached index may be in use by readers
+    index = _read_json(_index_path(archive_dir), {"segments": [], "by_project": {}})
+    segment_no = len(index["segments"])
+    segment_file = f"segment-{segment_no:05d}.jsonl.gz"
+    with gzip.open(os.path.join(archive_dir, segment_file), "wt", encoding="utf-8") as f:
+        for line_no, entry in enumerate(entries):
+            record = dict(entry)
+            for field in BODY_FIELDS:
+                if field in record:
+                    record[field] = {"blob": _store_blob(archive_dir, record[field])}
+            f.write(json.dumps(record, ensure_ascii=False) + "\n")
+            index["by_project"].setdefault(entry.get("project", ""), []).append(
+                [entry.get("timestamp", ""), segment_no, line_no])
+    timestamps = [e.get("timestamp", "") for e in entries]
+    index["segments"].append({"file": segment_file, "count": len(entries),
+                              "first_timestamp": min(timestamps), "last_timestamp": max(timestamps)})
+    _write_json(_index_path(archive_dir), index)
+
+def _split_hot(chat_file, history):
+    """Move the oldest entries to the archive when the hot tier is over its limit"""
+    if len(history) <= HOT_ENTRIES + ARCHIVE_BATCH:
+        return history
+    cut = len(history) - HOT_ENTRIES
+    _archive(chat_file, history[:cut])
+    return history[cut:]
+
+def load_recent(chat_file):
+    """Hot-tier entries only; archives older entries first if the file has grown past its limit"""
+    with _lock:
+        history = _read_json(chat_file, [])
+        hot = _split_hot(chat_file, history)
+        if len(hot) != len(history):
+            _write_json(chat_file, hot, indent=2)
+        return hot
+
+def append_entry(chat_file, entry):
+    """Append an entry to the hot tier (re-read from disk so concurrent sessions don't clobber
+    each other), archiving overflow. Returns the new hot-tier list."""
+    with _lock:
+        history = _read_json(chat_file, [])
+        history.append(entry)
+        history = _split_hot(chat_file, history)
+        _write_json(chat_file, history, indent=2)
+        return history
+
+def _read_segment(archive_dir, segment_file):
+    with gzip.open(os.path.join(archive_dir, segment_file), "rt", encoding="utf-8") as f:
+        return [json.loads(line) for line in f]
+
+_segment_cache = OrderedDict()
+_segment_cache_lock = threading.Lock()
+
+def _cached_segment(archive_dir, segment_file):
+    """Decoded segment for readers, cached (least recently used out) until the file changes on
+    disk; treat the records as read-only"""
+    path = os.path.join(archive_dir, segment_file)
+    key = (path, os.stat(path).st_mtime_ns)
+    with _segment_cache_lock:
+        records = _segment_cache.get(key)
+        if records is not None:
+            _segment_cache.move_to_end(key)
+            return records
+    records = _read_segment(archive_dir, segment_file)
+    with _segment_cache_lock:
+        _segment_cache[key] = records
+        if len(_segment_cache) > SEGMENT_CACHE_SIZE:
+            _segment_cache.popitem(last=False)
+    return records
+
+def _restore(archive_dir, record, blob_cache):
+    for field in BODY_FIELDS:
+        ref = record.get(field)
+        if isinstance(ref, dict) and "blob" in ref and len(ref) == 1:
+            if ref["blob"] not in blob_cache:
+                blob_cache[ref["blob"]] = _load_blob(archive_dir, ref["blob"])
+            record[field] = blob_cache[ref["blob"]]
+    return record
+
+def archived_project_history(chat_file, project, limit):
+    """Newest `limit` archived entries for a project (oldest first), via the index"""
+    archive_dir = _archive_dir(chat_file)
+    index = _load_index(archive_dir)
+    refs = index["by_project"].get(project, [])[-limit:]
+    segments = index["segments"]
+    loaded, blob_cache, entries = {}, {}, []
+    for _, segment_no, line_no in refs:
+        if segment_no not in loaded:
+            loaded[segment_no] = _cached_segment(archive_dir, segments[segment_no]["file"])
+        entries.append(_restore(archive_dir, dict(loaded[segment_no][line_no]), blob_cache))
+    return entries
+
+def iter_archive(chat_file, since=None):
+    """Yield archived entries oldest first, skipping whole segments older than `since` (timestamp)"""
+    archive_dir = _archive_dir(chat_file)
+    blob_cache = {}
+    for segment in _load_index(archive_dir)["segments"]:
+        if since and segment["last_timestamp"] <= since:
+            continue
+        for record in _read_segment(archive_dir, segment["file"]):
+            if since and record.get("timestamp", "") <= since:
+                continue
+            yield _restore(archive_dir, record, blob_cache)
+
+def project_history(chat_file, hot_history, project, limit=5):
+    """Last `limit` entries for a project: hot tier first, topped up from the archive"""
+    hot = [chat for chat in hot_history if chat.get('project') == project][-limit:]
+    if len(hot) >= limit:
+        return hot
+    return archived_project_history(chat_file, project, limit - len(hot)) + hot
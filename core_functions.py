@@ -1,28 +1,41 @@
 # core_functions.py
+from bisect import bisect_left, bisect_right, insort
+import numpy as np
+from skill_similarity import skill_id_matrix, match_scores
+
+BULK_MERGE_SIZE = 64  # more changed employees than this are merged with one sort instead of insorts
+
+def _combine_scores(match, experience):
+    """Match fraction(s) in [0, 1] plus experience bonus, as 0-100 scores"""
+    base = np.rint(np.asarray(match, dtype=np.float64) * 100)
+    experience_bonus = np.minimum(np.asarray(experience, dtype=np.float64) * 5, 20)
+    return np.minimum(base + experience_bonus, 100).astype(int)
+
 def score_employee(emp_skills, req_skills, emp_experience=1):
+    """0-100 match score; related skills ("Node" for "JavaScript") earn partial credit"""
     if not req_skills:
         return 0
-    
-    emp_lower = [s.lower() for s in emp_skills]
-    req_lower = [s.lower() for s in req_skills]
-    
-    match_count = 0
-    for req_skill in req_lower:
-        for emp_skill in emp_lower:
-            if req_skill in emp_skill or emp_skill in req_skill:
-                match_count += 1
-                break
-    
-    base_score = round(match_count / len(req_lower) * 100)
-    experience_bonus = min(emp_experience * 5, 20)
-    return min(base_score + experience_bonus, 100)
+    match = match_scores(req_skills, skill_id_matrix([emp_skills]))
+    return int(_combine_scores(match, [emp_experience])[0])
+
+def score_employees(employees, required_skills):
+    """score_employee for a list of employees in one similarity lookup"""
+    if not required_skills:
+        return [0] * len(employees)
+    match = match_scores(required_skills, skill_id_matrix([emp.get("skills", []) for emp in employees]))
+    return _combine_scores(match, [emp.get("experience", 1) for emp in employees]).tolist()
+
+def score_roster(roster, required_skills):
+    """Scores for a roster_store.RosterSnapshot as an array, computed from its column arrays"""
+    if not required_skills:
+        return np.zeros(len(roster), dtype=int)
+    return _combine_scores(match_scores(required_skills, roster.skill_id_matrix()), roster.experience)
 
 def build_optimal_team(required_skills, employees, team_size=3):
     """Build optimal team based on required skills"""
     scored_employees = []
     
-    for emp in employees:
-        score = score_employee(emp.get("skills", []), required_skills, emp.get("experience", 1))
+    for emp, score in zip(employees, score_employees(employees, required_skills)):
         scored_employees.append({
             "employee": emp,
             "score": score,
@@ -34,6 +47,50 @@ def build_optimal_team(required_skills, employees, team_size=3):
     
     return selected_team, scored_employees
 
+def _rank_key(item):
+    # Same order as build_optimal_team's sort
+    return (-item["score"], -item["experience"])
+
+def _same_employee(a, b):
+    if a.get("id") and b.get("id"):
+        return a["id"] == b["id"]
+    return a.get("name") == b.get("name")  # rankings saved before employees had ids
+
+def merge_rescored(scored_employees, changed, removed, required_skills):
+    """Patch a build_optimal_team ranking in place: drop the `removed` employee records and
+    insert freshly scored `changed` ones. Only those employees are scored; the rest of the
+    ranking is located by binary search instead of being rescored."""
+    for emp, score in zip(removed, score_employees(removed, required_skills)):
+        key = _rank_key({"score": score, "experience": emp.get("experience", 1)})
+        lo = bisect_left(scored_employees, key, key=_rank_key)
+        hi = bisect_right(scored_employees, key, lo=lo, key=_rank_key)
+        candidates = range(lo, hi)
+        if not any(_same_employee(scored_employees[i]["employee"], emp) for i in candidates):
+            # Stored score differs from today's (e.g. saved under older scoring rules)
+            candidates = range(len(scored_employees))
+        pos = next((i for i in candidates if _same_employee(scored_employees[i]["employee"], emp)), None)
+        if pos is not None:
+            scored_employees.pop(pos)
+    scored = [{"employee": emp, "score": score, "experience": emp.get("experience", 1)}
+              for emp, score in zip(changed, score_employees(changed, required_skills))]
+    if len(scored) > BULK_MERGE_SIZE:
+        # Bulk imports: one stable sort places new entries after equal ones, exactly like insort
+        scored_employees.extend(scored)
+        scored_employees.sort(key=_rank_key)
+    else:
+        for item in scored:
+            insort(scored_employees, item, key=_rank_key)
+    return scored_employees
+
+def rescore_projects(projects, changed, removed=()):
+    """Bring every saved project's all_scored_employees up to date after a roster change.
+    `changed` are new/updated employee records, `removed` the old records they replace or
+    that left the roster. No LLM calls; cost grows with the number of changed employees."""
+    removed = list(removed)
+    for project in projects:
+        if "all_scored_employees" in project:
+            merge_rescored(project["all_scored_employees"], changed, removed, project.get("required_skills", []))
+
 def calculate_project_timeline(complexity, team_size):
     base_days = {"low": 15, "medium": 30, "high": 60, "very high": 90}
     adjustment = max(1, 5 - team_size * 0.5)
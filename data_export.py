@@ -0,0 +1,268 @@
+# data_export.py
+"""Streaming export of projects, team assignments, scores, skill gaps and chat history to flat
+CSV or Parquet tables for BI tools, across every department shard.
+
+projects.json is parsed one project at a time and rows are written in chunks, so memory stays
+bounded however large the files get. With --since-last only rows created since the previous
+export (created_at / timestamp) are written, into new timestamped files.
+
+Run:  python data_export.py --format parquet --out exports
+      python data_export.py --since-last        (nightly incremental job)
+"""
+import argparse
+import csv
+import json
+import os
+import time
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # Parquet output is optional
+    pa = None
+
+from chat_store import iter_archive
+from shard_store import DEPARTMENT_FIELD, shard_files, write_json
+
+PROJ_FILE = "projects.json"
+CHAT_FILE = "chat_history.json"
+STATE_FILE = "export_state.json"  # kept in the output directory
+CHUNK_ROWS = 5000       # rows buffered per table before a write (one Parquet row group)
+READ_CHUNK_BYTES = 1 << 20
+TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M"  # created_at / timestamp format used by the app
+LIST_SEPARATOR = "; "
+
+TABLES = {
+    "projects": [("project_id", "str"), ("name", "str"), ("department", "str"), ("created_at", "str"), ("complexity", "str"),
+                 ("team_size", "int"), ("timeline_days", "int"), ("estimated_cost", "float"), ("budget", "float"),
+                 ("coverage_percentage", "float"), ("required_skills", "str"), ("missing_skills", "str"),
+                 ("summary", "str")],
+    "team_assignments": [("project_id", "str"), ("created_at", "str"), ("employee_id", "str"),
+                         ("employee_name", "str"), ("skills", "str"), ("experience", "float"), ("workload", "float")],
+    "scores": [("project_id", "str"), ("created_at", "str"), ("rank", "int"), ("employee_id", "str"),
+               ("employee_name", "str"), ("score", "float"), ("experience", "float")],
+    "skill_gaps": [("project_id", "str"), ("created_at", "str"), ("skill", "str"), ("status", "str")],
+    "chat_history": [("chat_id", "str"), ("timestamp", "str"), ("department", "str"), ("project", "str"), ("project_id", "str"),
+                     ("question", "str"), ("missing_skills", "str"), ("advice", "str")],
+}
+
+def iter_json_array(path, chunk_bytes=READ_CHUNK_BYTES):
+    """Yield the elements of a top-level JSON array one at a time, reading the file in chunks"""
+    decoder = json.JSONDecoder()
+    with open(path, "r", encoding="utf-8") as f:
+        buffer, pos, eof, started = "", 0, False, False
+        while True:
+            # Skip whitespace and the separators between elements
+            while pos < len(buffer) and buffer[pos] in " \t\r\n,[]":
+                if buffer[pos] == "[":
+                    started = True
+                pos += 1
+            if pos >= len(buffer):
+                if eof:
+                    return
+                buffer, pos = f.read(chunk_bytes), 0
+                eof = not buffer
+                continue
+            if not started:
+                raise ValueError(f"{path} does not contain a JSON array")
+            try:
+                element, end = decoder.raw_decode(buffer, pos)
+                if end == len(buffer) and not eof:
+                    raise json.JSONDecodeError("element may continue in the next chunk", buffer, end)
+            except json.JSONDecodeError:
+                if eof:
+                    raise
+                # Element continues past the buffer: keep the unparsed tail and read more
+                more = f.read(chunk_bytes)
+                eof = not more
+                buffer, pos = buffer[pos:] + more, 0
+                continue
+            yield element
+            pos = end
+
+def _joined(values):
+    return LIST_SEPARATOR.join(str(v) for v in values or [])
+
+def _project_rows(project, department):
+    """(table, row) pairs for one project"""
+    project_id = _project_id(project)
+    created_at = project.get("created_at", "")
+    gaps = project.get("skill_gaps") or {}
+    yield "projects", {
+        "project_id": project_id, "name": project.get("name", ""),
+        "department": project.get(DEPARTMENT_FIELD) or department, "created_at": created_at,
+        "complexity": project.get("complexity", ""), "team_size": project.get("team_size"),
+        "timeline_days": project.get("timeline"), "estimated_cost": project.get("estimated_cost"),
+        "budget": project.get("budget"), "coverage_percentage": gaps.get("coverage_percentage"),
+        "required_skills": _joined(project.get("required_skills")),
+        "missing_skills": _joined(gaps.get("missing_skills")), "summary": project.get("summary", ""),
+    }
+    for emp in project.get("team", []):
+        yield "team_assignments", {
+            "project_id": project_id, "created_at": created_at, "employee_id": emp.get("id", ""),
+            "employee_name": emp.get("name", ""), "skills": _joined(emp.get("skills")),
+            "experience": emp.get("experience"), "workload": emp.get("workload"),
+        }
+    for rank, scored in enumerate(project.get("all_scored_employees", []), 1):
+        emp = scored.get("employee", {})
+        yield "scores", {
+            "project_id": project_id, "created_at": created_at, "rank": rank, "employee_id": emp.get("id", ""),
+            "employee_name": emp.get("name", ""), "score": scored.get("score"),
+            "experience": scored.get("experience", emp.get("experience")),
+        }
+    for status in ("covered", "missing"):
+        for skill in gaps.get(f"{status}_skills", []):
+            yield "skill_gaps", {"project_id": project_id, "created_at": created_at, "skill": skill, "status": status}
+
+def _project_id(project):
+    return project.get("id") or project.get("name", "")
+
+def _chat_row(entry, department, project_ids):
+    advice = entry.get("advice") or entry.get("response") or ""
+    if isinstance(advice, dict):
+        advice = advice.get("answer") or json.dumps(advice, ensure_ascii=False)
+    return {
+        "chat_id": entry.get("id", ""), "timestamp": entry.get("timestamp", ""), "department": department,
+        "project": entry.get("project", ""),
+        # Chat entries only name their project: resolve it within the department, as the advisor does
+        "project_id": entry.get("project_id") or project_ids.get((department, entry.get("project", "")), ""),
+        "question": entry.get("question", ""),
+        "missing_skills": _joined(entry.get("missing_skills")), "advice": advice,
+    }
+
+def _coerce(value, kind):
+    if value is None or value == "":
+        return None if kind != "str" else ""
+    try:
+        return {"str": str, "int": int, "float": float}[kind](value)
+    except (TypeError, ValueError):
+        return None
+
+class _CsvWriter:
+    def __init__(self, path, columns):
+        self.file = open(path, "w", encoding="utf-8", newline="")
+        self.writer = csv.DictWriter(self.file, fieldnames=[name for name, _ in columns])
+        self.writer.writeheader()
+
+    def write(self, rows):
+        self.writer.writerows(rows)
+
+    def close(self):
+        self.file.close()
+
+class _ParquetWriter:
+    TYPES = {"str": "string", "int": "int64", "float": "float64"}
+
+    def __init__(self, path, columns):
+        self.columns = columns
+        self.schema = pa.schema([(name, getattr(pa, self.TYPES[kind])()) for name, kind in columns])
+        self.writer = pq.ParquetWriter(path, self.schema)
+
+    def write(self, rows):
+        data = {name: [_coerce(row.get(name), kind) for row in rows] for name, kind in self.columns}
+        self.writer.write_table(pa.Table.from_pydict(data, schema=self.schema))
+
+    def close(self):
+        self.writer.close()
+
+class TableSink:
+    """Buffers rows per table and writes them CHUNK_ROWS at a time"""
+
+    def __init__(self, out_dir, fmt, suffix=""):
+        writer_class = _ParquetWriter if fmt == "parquet" else _CsvWriter
+        self.paths = {name: os.path.join(out_dir, f"{name}{suffix}.{fmt}") for name in TABLES}
+        self.writers = {name: writer_class(self.paths[name], columns) for name, columns in TABLES.items()}
+        self.buffers = {name: [] for name in TABLES}
+        self.counts = dict.fromkeys(TABLES, 0)
+
+    def add(self, table, row):
+        buffer = self.buffers[table]
+        buffer.append(row)
+        self.counts[table] += 1
+        if len(buffer) >= CHUNK_ROWS:
+            self.writers[table].write(buffer)
+            buffer.clear()
+
+    def close(self):
+        for name, writer in self.writers.items():
+            if self.buffers[name]:
+                writer.write(self.buffers[name])
+            writer.close()
+
+def _read_state(out_dir):
+    try:
+        with open(os.path.join(out_dir, STATE_FILE), "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def _write_state(out_dir, state):
+    # Atomic, with a unique temp file, so concurrent exports never share one
+    write_json(os.path.join(out_dir, STATE_FILE), state, indent=2)
+
+def export(out_dir="exports", fmt="csv", since_last=False, proj_file=PROJ_FILE, chat_file=CHAT_FILE):
+    """Write every table to out_dir; returns {table: rows written} plus the file paths.
+
+    Incremental runs export rows stamped after the previous run's watermark and before the current
+    minute (timestamps have minute resolution, so the current minute may still get new rows);
+    the watermark then moves to the newest exported stamp."""
+    if fmt == "parquet" and pa is None:
+        raise RuntimeError("Parquet export needs pyarrow (pip install pyarrow); use --format csv instead")
+    os.makedirs(out_dir, exist_ok=True)
+    state = _read_state(out_dir) if since_last else {}
+    cutoff = time.strftime(TIMESTAMP_FORMAT) if since_last else None
+    since_projects, since_chat = state.get("projects_created_at"), state.get("chat_timestamp")
+
+    def wanted(stamp, since):
+        if cutoff is None:
+            return True
+        return (not since or stamp > since) and stamp < cutoff
+
+    sink = TableSink(out_dir, fmt, suffix=f"-{time.strftime('%Y%m%dT%H%M%S')}" if since_last else "")
+    newest_project, newest_chat = since_projects, since_chat
+    project_ids = {}  # (department, project name) -> project_id, from every project (exported or not)
+    try:
+        # Every department shard (see shard_store), the unsharded files first
+        for department, shard in shard_files(proj_file):
+            for project in iter_json_array(shard):
+                project_ids.setdefault((department, project.get("name", "")), _project_id(project))
+                stamp = project.get("created_at", "")
+                if not wanted(stamp, since_projects):
+                    continue
+                newest_project = max(newest_project or "", stamp)
+                for table, row in _project_rows(project, department):
+                    sink.add(table, row)
+        # Per shard: archived chat segments first (whole segments older than the watermark are
+        # skipped), then the hot tier
+        for department, shard in shard_files(chat_file):
+            with open(shard, "r", encoding="utf-8") as f:
+                hot = json.load(f)
+            for entry in (e for source in (iter_archive(shard, since_chat), hot) for e in source):
+                stamp = entry.get("timestamp", "")
+                if not wanted(stamp, since_chat):
+                    continue
+                newest_chat = max(newest_chat or "", stamp)
+                sink.add("chat_history", _chat_row(entry, department, project_ids))
+    finally:
+        sink.close()
+
+    if since_last:
+        _write_state(out_dir, {"projects_created_at": newest_project, "chat_timestamp": newest_chat,
+                               "last_export": time.strftime("%Y-%m-%d %H:%M:%S")})
+    return {"rows": sink.counts, "files": sink.paths}
+
+def main():
+    parser = argparse.ArgumentParser(description="Export projects, teams, scores, skill gaps and chat history")
+    parser.add_argument("--out", default="exports", help="output directory")
+    parser.add_argument("--format", choices=["csv", "parquet"], default="csv")
+    parser.add_argument("--since-last", action="store_true",
+                        help=f"only rows newer than the previous --since-last run (watermark in <out>/{STATE_FILE})")
+    args = parser.parse_args()
+    start = time.perf_counter()
+    result = export(args.out, args.format, args.since_last)
+    print(f"Exported in {time.perf_counter() - start:.2f}s:")
+    for table, count in result["rows"].items():
+        print(f"  {table:<18}{count:>9} rows  {result['files'][table]}")
+
+if __name__ == "__main__":
+    main()
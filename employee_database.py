@@ -1,34 +1,66 @@
 # employee_database.py
+import math
 import streamlit as st
 import pandas as pd
 import plotly.express as px
+from roster_store import get_roster
+
+EMPLOYEES_PER_PAGE = 50
+TOP_SKILLS_CHARTED = 25
 
 def render_employee_database():
     st.header("📊 Employee Database")
-    
-    if st.session_state.employees:
-        # Convert to DataFrame for better display
+
+    roster = get_roster()
+    if roster:
+        index = roster.index
+
+        # Filters run against the index; only the visible page becomes a DataFrame
+        col1, col2, col3, col4 = st.columns([2, 2, 1, 1])
+        with col1:
+            name_query = st.text_input("Search by name", key="emp_db_search")
+        with col2:
+            skill_filter = st.multiselect("Has skills", index.all_skills(), key="emp_db_skills")
+        with col3:
+            min_experience = st.number_input("Min experience", min_value=0, max_value=50, value=0, key="emp_db_min_exp")
+        with col4:
+            max_workload = st.number_input("Max workload %", min_value=0, max_value=100, value=100, key="emp_db_max_load")
+
+        filters = (name_query.strip(), tuple(skill_filter), min_experience, max_workload, index.version)
+        cached = st.session_state.get('employee_db_filter')
+        if not cached or cached[0] != filters:
+            positions = index.filter(skill_filter, min_experience or None,
+                                     max_workload if max_workload < 100 else None, name_query.strip())
+            st.session_state.employee_db_filter = (filters, positions)
+        else:
+            positions = cached[1]
+
+        page_count = max(1, math.ceil(len(positions) / EMPLOYEES_PER_PAGE))
+        page = st.number_input(f"Page (of {page_count})", min_value=1, max_value=page_count, value=1, step=1, key="emp_db_page") if page_count > 1 else 1
+        start = (page - 1) * EMPLOYEES_PER_PAGE
         emp_data = []
-        for emp in st.session_state.employees:
+        for pos in positions[start:start + EMPLOYEES_PER_PAGE]:
+            emp = roster[pos]
             emp_data.append({
                 "Name": emp['name'],
                 "Skills": ", ".join(emp['skills']),
                 "Experience": f"{emp.get('experience', 1)} years",
                 "Workload": f"{emp.get('workload', 0)}%"
             })
-        
-        df = pd.DataFrame(emp_data)
-        st.dataframe(df, use_container_width=True)
-        
+
+        st.caption(f"Showing {len(emp_data)} of {len(positions)} matching employees ({len(roster)} total)")
+        if emp_data:
+            df = pd.DataFrame(emp_data)
+            st.dataframe(df, use_container_width=True, hide_index=True)
+
         # Skills visualization
         st.subheader("Skills Distribution")
-        all_skills = [skill for emp in st.session_state.employees for skill in emp['skills']]
-        if all_skills:
-            skill_counts = pd.Series(all_skills).value_counts()
-            fig = px.bar(skill_counts, title="Skills Across Employees", 
+        if index.skill_counts:
+            skill_counts = pd.Series(dict(index.skill_counts.most_common(TOP_SKILLS_CHARTED)))
+            fig = px.bar(skill_counts, title="Skills Across Employees",
                         labels={'index': 'Skill', 'value': 'Count'})
             st.plotly_chart(fig, use_container_width=True)
         else:
             st.info("No skills data available for visualization")
     else:
-        st.info("No employees in database. Add some employees first.")
\ No newline at end of file
+        st.info("No employees in database. Add some employees first.")
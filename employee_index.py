@@ -0,0 +1,84 @@
+# employee_index.py
+import copy
+from collections import Counter
+
+WORKLOAD_BUCKET = 10  # workload postings are grouped in 10% steps
+
+class EmployeeIndex:
+    """Inverted indexes over the roster so filters never scan every employee"""
+
+    def __init__(self, employees=()):
+        self.rebuild(employees)
+
+    def rebuild(self, employees):
+        self.employees = []
+        self.by_id = {}
+        self.by_skill = {}
+        self.by_experience = {}
+        self.by_workload = {}
+        self.skill_counts = Counter()
+        self.fingerprint = 0  # order-independent hash of the roster contents (stable within a process)
+        self.version = getattr(self, "version", 0) + 1
+        self._shared = set()  # postings still shared with the index this one was copied from
+        for emp in employees:
+            self._insert(emp)
+
+    def _insert(self, emp):
+        pos = len(self.employees)
+        self.employees.append(emp)
+        self.by_id[emp.get("id")] = pos
+        self.fingerprint ^= hash((emp.get("id"), emp.get("name"), tuple(emp.get("skills", [])), emp.get("experience", 1)))
+        for skill in set(emp.get("skills", [])):
+            self._postings("by_skill", skill.lower()).add(pos)
+            self.skill_counts[skill] += 1
+        self._postings("by_experience", emp.get("experience", 1)).add(pos)
+        self._postings("by_workload", emp.get("workload", 0) // WORKLOAD_BUCKET).add(pos)
+
+    def _postings(self, table_name, key):
+        table = getattr(self, table_name)
+        if (table_name, key) in self._shared:
+            table[key] = set(table[key])
+            self._shared.discard((table_name, key))
+        return table.setdefault(key, set())
+
+    def extended(self, employees):
+        """Copy-on-write: a new index with employees appended. Posting sets are shared with this
+        index until the new one has to change them, so this index stays valid for its readers."""
+        new = copy.copy(self)
+        new.employees = list(self.employees)
+        new.by_id = dict(self.by_id)
+        new.skill_counts = Counter(self.skill_counts)
+        new._shared = set()
+        for table_name in ("by_skill", "by_experience", "by_workload"):
+            table = dict(getattr(self, table_name))
+            setattr(new, table_name, table)
+            new._shared.update((table_name, key) for key in table)
+        new.version = self.version + 1
+        for emp in employees:
+            new._insert(emp)
+        return new
+
+    def all_skills(self):
+        return sorted(self.skill_counts)
+
+    def filter(self, skills=(), min_experience=None, max_workload=None, name_query=""):
+        """Return sorted roster positions matching every given filter"""
+        candidates = None
+        for skill in skills:
+            postings = self.by_skill.get(skill.lower(), set())
+            candidates = set(postings) if candidates is None else candidates & postings
+        if min_experience is not None:
+            matching = set().union(*[p for exp, p in self.by_experience.items() if exp >= min_experience])
+            candidates = matching if candidates is None else candidates & matching
+        if max_workload is not None:
+            edge_bucket = max_workload // WORKLOAD_BUCKET
+            matching = set().union(*[p for bucket, p in self.by_workload.items() if bucket < edge_bucket])
+            # Only the bucket containing the limit needs a per-employee check
+            matching.update(pos for pos in self.by_workload.get(edge_bucket, ())
+                            if self.employees[pos].get("workload", 0) <= max_workload)
+            candidates = matching if candidates is None else candidates & matching
+        positions = range(len(self.employees)) if candidates is None else sorted(candidates)
+        if name_query:
+            query = name_query.lower()
+            positions = [pos for pos in positions if query in self.employees[pos]["name"].lower()]
+        return positions  # a range when nothing is filtered, so callers don't hold a copy of every position
@@ -0,0 +1,211 @@
+# gemini_client.py
+import os
+import random
+import threading
+import time
+import google.generativeai as genai
+from google.api_core import exceptions as google_exceptions
+from local_llm import LocalModel
+
+MODEL_NAME = os.getenv("GEMINI_MODEL", "gemini-2.5-flash")
+USE_LOCAL_MODEL = os.getenv("MODE", "gemini") == "local"  # offline stand-in, see local_llm.py
+
+# Generation settings per kind of prompt. Short structured answers get tight output caps,
+# which is where most of the latency goes. (2.5 models count thinking tokens against the cap,
+# so these leave some headroom.)
+CALL_TYPE_CONFIGS = {
+    "summary": {"max_output_tokens": 512, "temperature": 0.3},
+    "skills": {"max_output_tokens": 512, "temperature": 0.1, "response_mime_type": "application/json"},
+    "parameters": {"max_output_tokens": 1024, "temperature": 0.2, "response_mime_type": "application/json"},
+    "advice": {"max_output_tokens": 4096, "temperature": 0.7},
+    "default": {},
+}
+
+# Shared by every Streamlit session in this process
+RATE_LIMIT_PER_MINUTE = float(os.getenv("GEMINI_RPM", "60"))
+RATE_LIMIT_BURST = int(os.getenv("GEMINI_BURST", "5"))
+RATE_LIMIT_MAX_WAIT = float(os.getenv("GEMINI_MAX_QUEUE_SECONDS", "5"))
+REQUEST_TIMEOUT = float(os.getenv("GEMINI_TIMEOUT_SECONDS", "30"))
+MAX_RETRIES = int(os.getenv("GEMINI_MAX_RETRIES", "3"))
+BACKOFF_BASE = 0.5
+BACKOFF_CAP = 8.0
+BREAKER_FAILURE_THRESHOLD = int(os.getenv("GEMINI_BREAKER_THRESHOLD", "5"))
+BREAKER_RESET_SECONDS = float(os.getenv("GEMINI_BREAKER_RESET_SECONDS", "30"))
+
+TRANSIENT_ERRORS = (
+    google_exceptions.ResourceExhausted,
+    google_exceptions.TooManyRequests,
+    google_exceptions.ServiceUnavailable,
+    google_exceptions.DeadlineExceeded,
+    google_exceptions.InternalServerError,
+    TimeoutError,
+    ConnectionError,
+)
+
+class RateLimited(Exception):
+    pass
+
+class CircuitOpen(Exception):
+    pass
+
+class TokenBucket:
+    """Classic token bucket: `rate` tokens per second, holding at most `capacity`"""
+
+    def __init__(self, rate, capacity):
+        if rate <= 0:
+            raise ValueError(f"token bucket rate must be positive, got {rate}")
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def acquire(self, max_wait):
+        """Take a token, waiting at most max_wait seconds. Returns False if none became available."""
+        deadline = time.monotonic() + max_wait
+        while True:
+            with self.lock:
+                self._refill()
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return True
+                wait = (1 - self.tokens) / self.rate
+            if time.monotonic() + wait > deadline:
+                return False
+            time.sleep(wait)
+
+class CircuitBreaker:
+    """Opens after consecutive failures, lets one trial call through after the reset period"""
+
+    def __init__(self, failure_threshold, reset_seconds):
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self.state = "closed"
+        self.failures = 0
+        self.opened_at = 0.0
+        self.times_opened = 0
+        self.lock = threading.Lock()
+
+    def allow(self):
+        with self.lock:
+            if self.state == "open" and time.monotonic() - self.opened_at >= self.reset_seconds:
+                self.state = "half_open"
+                return True
+            return self.state == "closed"
+
+    def cancel_trial(self):
+        """A half-open trial that never reached the API: reopen without counting a failure, so the
+        next call may try again instead of the breaker staying half-open forever"""
+        with self.lock:
+            if self.state == "half_open":
+                self.state = "open"
+
+    def record_success(self):
+        with self.lock:
+            self.state = "closed"
+            self.failures = 0
+
+    def record_failure(self):
+        with self.lock:
+            self.failures += 1
+            if self.state == "half_open" or self.failures >= self.failure_threshold:
+                if self.state != "open":
+                    self.times_opened += 1
+                self.state = "open"
+                self.opened_at = time.monotonic()
+
+_models = {}
+_models_lock = threading.Lock()
+
+def get_model(call_type="default"):
+    """Process-wide GenerativeModel handle for a call type, built once and reused by every session"""
+    model = _models.get(call_type)
+    if model is None:
+        with _models_lock:
+            model = _models.get(call_type)
+            if model is None:
+                config = CALL_TYPE_CONFIGS.get(call_type, CALL_TYPE_CONFIGS["default"])
+                if USE_LOCAL_MODEL:
+                    model = LocalModel(call_type)
+                else:
+                    model = genai.GenerativeModel(MODEL_NAME, generation_config=config or None)
+                _models[call_type] = model
+    return model
+
+def use_model(call_type, model):
+    """Replace the model for a call type (e.g. recorded responses in advice_replay.py)"""
+    with _models_lock:
+        _models[call_type] = model
+
+_bucket = TokenBucket(RATE_LIMIT_PER_MINUTE / 60.0, RATE_LIMIT_BURST)
+_breaker = CircuitBreaker(BREAKER_FAILURE_THRESHOLD, BREAKER_RESET_SECONDS)
+_metrics_lock = threading.Lock()
+_metrics = {
+    "calls": 0,
+    "successes": 0,
+    "failures": 0,
+    "retries": 0,
+    "rate_limited": 0,
+    "short_circuited": 0,
+    "last_error": None,
+}
+
+def _count(name, amount=1):
+    with _metrics_lock:
+        _metrics[name] += amount
+
+def _backoff(attempt):
+    # "Full jitter" exponential backoff
+    return random.uniform(0, min(BACKOFF_CAP, BACKOFF_BASE * 2 ** attempt))
+
+def generate(model, prompt, timeout=REQUEST_TIMEOUT, **kwargs):
+    """Run model.generate_content behind the shared rate limiter, retry policy and circuit breaker.
+    Raises CircuitOpen / RateLimited without calling the API, or the last error once retries are exhausted."""
+    _count("calls")
+    if not _breaker.allow():
+        _count("short_circuited")
+        raise CircuitOpen("Gemini circuit breaker is open")
+
+    for attempt in range(MAX_RETRIES + 1):
+        if not _bucket.acquire(RATE_LIMIT_MAX_WAIT):
+            _count("rate_limited")
+            _breaker.cancel_trial()
+            raise RateLimited("Gemini rate limit reached")
+        try:
+            resp = model.generate_content(prompt, request_options={"timeout": timeout}, **kwargs)
+        except TRANSIENT_ERRORS as e:
+            with _metrics_lock:
+                _metrics["last_error"] = str(e)
+            if attempt < MAX_RETRIES and _breaker.state != "half_open":
+                _count("retries")
+                time.sleep(_backoff(attempt))
+                continue
+            _count("failures")
+            _breaker.record_failure()
+            raise
+        except Exception as e:
+            # Bad request, auth error, ... - retrying will not help
+            with _metrics_lock:
+                _metrics["last_error"] = str(e)
+            _count("failures")
+            _breaker.record_failure()
+            raise
+        _count("successes")
+        _breaker.record_success()
+        return resp
+
+def get_metrics():
+    """Snapshot of client counters and breaker state (for the sidebar / monitoring)"""
+    with _metrics_lock:
+        snapshot = dict(_metrics)
+    snapshot["breaker_state"] = _breaker.state
+    snapshot["breaker_failures"] = _breaker.failures
+    snapshot["breaker_times_opened"] = _breaker.times_opened
+    snapshot["tokens_available"] = round(_bucket.tokens, 2)
+    snapshot["cached_models"] = sorted(_models)
+    return snapshot
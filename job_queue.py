@@ -0,0 +1,135 @@
+# job_queue.py
+import hashlib
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+import streamlit as st
+
+# One worker pool and job registry per process, shared by all sessions
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "4"))
+JOB_TTL_SECONDS = 600  # finished jobs are kept this long so every waiting session can pick them up
+POLL_SECONDS = 1.0
+
+_executor = ThreadPoolExecutor(max_workers=JOB_WORKERS, thread_name_prefix="job")
+_lock = threading.Lock()
+_jobs = {}
+_current = threading.local()  # the job a worker thread is running, for notify
+
+def job_key(kind, *parts):
+    """Stable key for a unit of work; identical submissions share one job"""
+    payload = json.dumps([kind, parts], sort_keys=True, default=str)
+    return f"{kind}:{hashlib.sha1(payload.encode('utf-8')).hexdigest()}"
+
+def _prune(now):
+    for key in [k for k, job in _jobs.items() if job["finished_at"] and now - job["finished_at"] > JOB_TTL_SECONDS]:
+        del _jobs[key]
+
+def submit(key, fn, *args, **kwargs):
+    """Run fn(*args, **kwargs) on the worker pool unless a live or finished job with this key exists"""
+    with _lock:
+        now = time.monotonic()
+        _prune(now)
+        existing = _jobs.get(key)
+        # Failed jobs are retried on resubmission; running and successful ones are shared
+        if existing and (not existing["future"].done() or existing["future"].exception() is None):
+            existing["submitters"] += 1
+            return key
+        job = {"submitted_at": now, "finished_at": None, "submitters": 1, "notices": []}
+        job["future"] = _executor.submit(_run, job, fn, args, kwargs)
+        _jobs[key] = job
+    return key
+
+def _run(job, fn, args, kwargs):
+    _current.job = job
+    try:
+        return fn(*args, **kwargs)
+    finally:
+        _current.job = None
+        job["finished_at"] = time.monotonic()
+
+NOTICE_LEVELS = {"error": st.error, "warning": st.warning}
+
+def notify(message, level="warning"):
+    """Show the user a message from code that may run as a job (e.g. why a fallback was used);
+    level is "error" for hard failures, "warning" otherwise. Worker threads have no Streamlit
+    context, so inside a job the (level, message) notice is kept with the job and shown by
+    pickup; anywhere else it is shown right away."""
+    job = getattr(_current, "job", None)
+    if job is None:
+        show_notice((level, message))
+    elif (level, message) not in job["notices"]:
+        job["notices"].append((level, message))
+
+def show_notice(notice):
+    level, message = notice
+    NOTICE_LEVELS.get(level, st.warning)(message)
+
+def release(key):
+    """Withdraw one submission of a job (keys are shared, so other sessions may have joined it).
+    The job is cancelled only when nobody else submitted it and it has not started yet; otherwise
+    it runs on and expires like any other job."""
+    with _lock:
+        job = _jobs.get(key)
+        if job is None:
+            return
+        job["submitters"] -= 1
+        if job["submitters"] <= 0 and job["future"].cancel():
+            del _jobs[key]
+
+def get_job(key):
+    """{"status": "pending"|"running"|"done"|"failed", "result", "error", "notices", "elapsed"} or None if unknown"""
+    with _lock:
+        job = _jobs.get(key)
+    if job is None:
+        return None
+    future = job["future"]
+    elapsed = (job["finished_at"] or time.monotonic()) - job["submitted_at"]
+    notices = list(job["notices"])
+    if not future.done():
+        return {"status": "running" if future.running() else "pending", "result": None, "error": None,
+                "notices": notices, "elapsed": elapsed}
+    error = future.exception()
+    if error is not None:
+        return {"status": "failed", "result": None, "error": error, "notices": notices, "elapsed": elapsed}
+    return {"status": "done", "result": future.result(), "error": None, "notices": notices, "elapsed": elapsed}
+
+def get_queue_metrics():
+    with _lock:
+        futures = [job["future"] for job in _jobs.values()]
+    return {
+        "workers": JOB_WORKERS,
+        "running": sum(1 for f in futures if f.running()),
+        "pending": sum(1 for f in futures if not f.done() and not f.running()),
+        "finished": sum(1 for f in futures if f.done()),
+    }
+
+@st.fragment(run_every=POLL_SECONDS)
+def show_job_progress(key, label):
+    """Poll a job without blocking the page; reruns the whole app once the job has finished"""
+    job = get_job(key)
+    if job is None or job["status"] in ("done", "failed"):
+        st.rerun()
+    st.info(f"⏳ {label} ({job['elapsed']:.0f}s)")
+    for notice in job["notices"]:  # e.g. a first call fell back while the job runs on
+        show_notice(notice)
+
+def pickup(session_key, label):
+    """Check the job referenced by st.session_state[session_key] ({"key", "context"}).
+    Returns the finished job plus its context (and clears the reference), or None while it is
+    still in flight, in which case a progress poller is rendered. The job's notices are shown
+    when it is picked up."""
+    pending = st.session_state.get(session_key)
+    if not pending:
+        return None
+    job = get_job(pending["key"])
+    if job is None:
+        job = {"status": "failed", "result": None, "error": "job expired", "notices": [], "elapsed": 0}
+    if job["status"] in ("done", "failed"):
+        del st.session_state[session_key]
+        for notice in job["notices"]:
+            show_notice(notice)
+        return dict(job, context=pending.get("context", {}))
+    show_job_progress(pending["key"], label)
+    return None
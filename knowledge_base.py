@@ -1,4 +1,11 @@
 # knowledge_base.py
+import json
+import os
+import threading
+import time
+
+KNOWLEDGE_FILE = "knowledge_base.json"
+RELOAD_CHECK_SECONDS = 1.0  # how often the file's mtime is checked
 ADVANCED_KNOWLEDGE = {
     "company_context": {
         "industry": "Technology Consulting",
@@ -106,4 +113,52 @@ ADVANCED_KNOWLEDGE = {
             "Gradual skill development"
         ]
     }
-}
\ No newline at end of file
+}
+
+# ---- Process-wide, hot-reloadable knowledge base ----
+_lock = threading.Lock()
+_state = {"path": None, "mtime": None, "checked_at": 0.0, "data": ADVANCED_KNOWLEDGE, "skill_index": None, "version": 0}
+
+def normalize_skill(skill):
+    return " ".join(skill.lower().split())
+
+def _index_skills(data):
+    return {normalize_skill(name): solution for name, solution in data.get("skill_solutions", {}).items()}
+
+def _reload_if_changed(path):
+    try:
+        mtime = os.stat(path).st_mtime
+    except OSError:
+        mtime = None
+    if _state["skill_index"] is not None and path == _state["path"] and mtime == _state["mtime"]:
+        return
+    data = ADVANCED_KNOWLEDGE
+    if mtime is not None:
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except Exception:
+            # Keep serving the last good copy while the file is being edited
+            if _state["skill_index"] is not None:
+                return
+    _state.update(path=path, mtime=mtime, data=data, skill_index=_index_skills(data), version=_state["version"] + 1)
+
+def get_knowledge_base(path=KNOWLEDGE_FILE):
+    """Shared knowledge base: knowledge_base.json if present (reloaded when its mtime changes),
+    otherwise ADVANCED_KNOWLEDGE. Treat the returned dict as read-only."""
+    now = time.monotonic()
+    if _state["skill_index"] is None or path != _state["path"] or now - _state["checked_at"] >= RELOAD_CHECK_SECONDS:
+        with _lock:
+            _reload_if_changed(path)
+            _state["checked_at"] = now
+    return _state["data"]
+
+def get_knowledge_version():
+    """Bumped on every reload; use it in cache keys for anything rendered from the knowledge base"""
+    get_knowledge_base(_state["path"] or KNOWLEDGE_FILE)
+    return _state["version"]
+
+def find_skill_solution(skill):
+    """Solution entry for a skill, matched case- and whitespace-insensitively, or None"""
+    get_knowledge_base(_state["path"] or KNOWLEDGE_FILE)
+    return _state["skill_index"].get(normalize_skill(skill))
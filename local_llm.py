@@ -0,0 +1,104 @@
+# local_llm.py
+"""Offline stand-in for the Gemini model, used when MODE=local (demos, load tests, replays).
+
+Answers are deterministic per prompt and shaped like what each call type expects; latency is
+simulated so the rest of the pipeline (rate limiter, breaker, job queue) behaves realistically.
+"""
+import hashlib
+import json
+import os
+import re
+import time
+
+LATENCY_MS = float(os.getenv("LOCAL_LLM_LATENCY_MS", "300"))
+LATENCY_JITTER = 0.5  # +/- fraction of LATENCY_MS, picked from the prompt hash so replays repeat exactly
+
+SKILL_WORDS = {
+    "Python": ["python", "django", "flask"],
+    "AI/ML": ["machine learning", " ai ", "ai-", " ml ", "recommendation", "prediction"],
+    "React": ["react", "frontend", "dashboard"],
+    "JavaScript": ["javascript", "node", "web app"],
+    "Database": ["sql", "database", "mongodb"],
+    "DevOps": ["devops", "docker", "kubernetes", "ci/cd"],
+    "Blockchain": ["blockchain", "smart contract", "ledger"],
+    "Security": ["security", "encryption", "authentication", "payments"],
+    "Cloud": ["cloud", "aws", "azure", "gcp"],
+    "Design": ["design", "ux", "ui "],
+}
+COMPLEXITIES = ["low", "medium", "high", "very high"]
+
+class LocalResponse:
+    def __init__(self, text):
+        self.text = text
+        self.parts = []
+
+class LocalModel:
+    """Implements the slice of genai.GenerativeModel that gemini_client.generate uses"""
+
+    def __init__(self, call_type="default"):
+        self.call_type = call_type
+
+    def generate_content(self, prompt, request_options=None, **kwargs):
+        digest = hashlib.sha1(prompt.encode("utf-8")).digest()
+        delay = LATENCY_MS / 1000 * (1 + LATENCY_JITTER * (digest[0] / 127.5 - 1))
+        timeout = (request_options or {}).get("timeout")
+        if timeout is not None and delay > timeout:
+            time.sleep(timeout)
+            raise TimeoutError("local model timed out")
+        time.sleep(delay)
+        responder = RESPONDERS.get(self.call_type, _respond_default)
+        return LocalResponse(responder(prompt, digest))
+
+def _field(prompt, label):
+    match = re.search(rf"^\s*{label}:\s*(.*)$", prompt, re.MULTILINE)
+    return match.group(1).strip() if match else ""
+
+def _skills_in(text):
+    text = f" {text.lower()} "
+    return [skill for skill, words in SKILL_WORDS.items() if any(word in text for word in words)] or ["Python"]
+
+def _respond_summary(prompt, digest):
+    description = _field(prompt, "Project")
+    sentences = [s.strip() for s in description.split(".") if s.strip()]
+    return ". ".join(sentences[:2]) + "." if sentences else "A software delivery project."
+
+def _respond_skills(prompt, digest):
+    return json.dumps(_skills_in(_field(prompt, "Project")))
+
+def _respond_parameters(prompt, digest):
+    description = _field(prompt, "Project")
+    skills = _skills_in(description)
+    level = min(len(COMPLEXITIES) - 1, len(skills) // 2 + digest[1] % 2)
+    return "```json\n" + json.dumps({
+        "summary": _respond_summary(prompt, digest),
+        "complexity": COMPLEXITIES[level],
+        "recommended_team_size": 2 + level * 2,
+        "estimated_budget": [10000, 25000, 75000, 150000][level],
+        "timeline_weeks": [4, 8, 16, 24][level],
+        "risk_level": ["low", "medium", "high", "high"][level],
+        "key_technologies": skills,
+    }, indent=2) + "\n```"
+
+def _respond_advice(prompt, digest):
+    missing = [s.strip() for s in _field(prompt, "MISSING SKILLS").split(",") if s.strip()]
+    question = _field(prompt, "QUESTION")
+    lines = ["## Local Advisor Response", "", f"**Question:** {question or 'n/a'}", ""]
+    for skill in missing:
+        weeks = 1 + (digest[len(lines) % len(digest)] % 6)
+        lines += [f"### {skill}",
+                  f"- Immediate action: shortlist two contractors with {skill} experience this week",
+                  f"- Option: train an existing developer ({weeks} weeks, ${weeks * 2500:,})",
+                  f"- Risk: delivery slips {weeks} weeks if {skill} is not covered by the next milestone",
+                  ""]
+    lines.append("## Recommendation\n1. Cover the highest-risk skill with a contractor\n2. Pair them with the team\n3. Review coverage weekly")
+    return "\n".join(lines)
+
+def _respond_default(prompt, digest):
+    return "Local model response."
+
+RESPONDERS = {
+    "summary": _respond_summary,
+    "skills": _respond_skills,
+    "parameters": _respond_parameters,
+    "advice": _respond_advice,
+}
@@ -7,7 +7,16 @@ from team_builder import render_team_builder
 from employee_database import render_employee_database
 from analytics import render_analytics
 from ai_advisor import render_ai_advisor
-from utils import load_json_if_exists, save_json, initialize_session_state
+from utils import load_json_if_exists, save_json, data_path, initialize_session_state
+from core_functions import rescore_projects
+from roster_store import get_roster, add_employees, replace_employees, ensure_employee_ids
+from roster_import import import_upload
+from shard_store import list_departments, valid_department, shard_files, read_json
+from gemini_client import get_metrics as get_gemini_metrics
+from prompt_builder import get_prompt_metrics
+from structured_output import get_parse_metrics
+from job_queue import get_queue_metrics
+from advice_prefetch import get_prefetch_metrics
 
 # Load env variables
 load_dotenv()
@@ -27,9 +36,62 @@ st.caption("Intelligent Employee → Project Assignment System with AI-Powered I
 initialize_session_state(EMP_FILE, PROJ_FILE, CHAT_FILE, KNOWLEDGE_FILE)
 
 # ------------------ Sidebar ------------------
+def update_project_rankings(changed, removed=()):
+    """Fold roster changes into the saved projects' employee rankings, in every department's shard:
+    the roster is shared, so other departments' rankings would otherwise go stale"""
+    if not (changed or removed):
+        return
+    current = data_path(PROJ_FILE)
+    if st.session_state.projects:
+        rescore_projects(st.session_state.projects, changed, removed)
+        save_json(current, st.session_state.projects)
+    for _, file in shard_files(PROJ_FILE):
+        projects = read_json(file, []) if file != current else None
+        if projects:
+            rescore_projects(projects, changed, removed)
+            save_json(file, projects)
+
+# Session state that belongs to one department's shards and is reloaded when switching
+DEPARTMENT_STATE = ["projects", "chat_history", "project_summary", "risk_simulation", "selected_employees",
+                    "analysis_job", "advice_job", "advice_prefetch", "advisor_used", "portfolio_gaps"]
+
+def switch_department(department):
+    """Point the session at another department's shards. Called from widget callbacks, which run
+    before the script, so initialize_session_state reloads the new shards on this same run."""
+    st.session_state.department = department
+    st.query_params["department"] = department
+    for name in DEPARTMENT_STATE:
+        st.session_state.pop(name, None)
+    st.session_state.department_picker = department
+    st.session_state.new_department = ""
+
+def _on_department_picked():
+    switch_department(st.session_state.department_picker)
+
+def _on_department_entered():
+    department = st.session_state.new_department.strip()
+    if not department:
+        return
+    if valid_department(department):
+        switch_department(department)
+    else:
+        st.session_state.department_error = f"Invalid department name: {department!r}"
+
+def render_department_picker():
+    departments = [""] + list_departments()
+    if st.session_state.department not in departments:
+        departments.append(st.session_state.department)
+    st.session_state.setdefault("department_picker", st.session_state.department)
+    st.sidebar.selectbox("Department", departments, key="department_picker",
+                         format_func=lambda d: d or "Shared (no department)", on_change=_on_department_picked)
+    st.sidebar.text_input("Or start a new department", key="new_department", on_change=_on_department_entered)
+    if st.session_state.get('department_error'):
+        st.sidebar.error(st.session_state.pop('department_error'))
+
 def render_sidebar():
     st.sidebar.header("Settings")
     st.sidebar.write("Mode: " + os.getenv("MODE", "gemini"))
+    render_department_picker()
 
     # Debug section
     st.sidebar.markdown("---")
@@ -39,6 +101,18 @@ def render_sidebar():
     else:
         st.sidebar.error("API Key: Missing")
     st.sidebar.info(f"Mode: {os.getenv('MODE', 'gemini')}")
+    with st.sidebar.expander("Gemini Client Metrics"):
+        metrics = get_gemini_metrics()
+        st.write(f"**Circuit Breaker:** {metrics['breaker_state']}")
+        st.json(metrics)
+    with st.sidebar.expander("Prompt Size Metrics"):
+        st.json(get_prompt_metrics())
+    with st.sidebar.expander("JSON Parse Metrics"):
+        st.json(get_parse_metrics())
+    with st.sidebar.expander("Background Jobs"):
+        st.json(get_queue_metrics())
+    with st.sidebar.expander("Advisor Prefetch"):
+        st.json(get_prefetch_metrics())
 
     st.sidebar.markdown("#### Employee Management")
     if st.sidebar.button("Load Default Employees"):
@@ -51,8 +125,14 @@ def render_sidebar():
             {"name": "Frank", "skills": ["Node", "React", "MongoDB"], "experience": 3, "workload": 0},
             {"name": "Grace", "skills": ["Data Science", "Python", "SQL"], "experience": 4, "workload": 0}
         ]
-        st.session_state.employees = default_employees
-        save_json(EMP_FILE, st.session_state.employees)
+        old_roster = get_roster(EMP_FILE)
+        ensure_employee_ids(default_employees, {e.name: e.id for e in old_roster})
+        roster = replace_employees(default_employees, EMP_FILE)
+        old_by_id = {e.id: e for e in old_roster}
+        new_by_id = {e.id: e for e in roster}
+        changed = [e for e in roster if old_by_id.get(e.id) != e]
+        removed = [e for e in old_roster if new_by_id.get(e.id) != e]
+        update_project_rankings(changed, removed)
         st.sidebar.success("Loaded default employees")
 
     st.sidebar.markdown("#### Add New Employee")
@@ -63,10 +143,27 @@ def render_sidebar():
         experience = st.slider("Experience (years)", 1, 10, 2)
         submitted = st.form_submit_button("Add Employee")
         if submitted and name:
-            st.session_state.employees.append({"name": name, "skills": skills, "experience": experience, "workload": 0})
-            save_json(EMP_FILE, st.session_state.employees)
+            new_employee = {"name": name, "skills": skills, "experience": experience, "workload": 0}
+            if st.session_state.department:
+                new_employee["department"] = st.session_state.department
+            roster = add_employees([new_employee], EMP_FILE)
+            update_project_rankings(roster[-1:])
             st.sidebar.success(f"Added {name}")
 
+    st.sidebar.markdown("#### Bulk Import")
+    with st.sidebar.form("bulk_import_form", clear_on_submit=True):
+        upload = st.file_uploader("HR export (CSV or JSONL)", type=["csv", "jsonl", "ndjson"])
+        imported = st.form_submit_button("Import Employees")
+    if imported and upload is not None:
+        roster, report = import_upload(upload, st.session_state.department)
+        if report["imported"]:
+            update_project_rankings(roster[len(roster) - report["imported"]:])
+        st.sidebar.success(f"Imported {report['imported']:,} of {report['rows']:,} rows in {report['seconds']:.1f}s")
+        if report["duplicates"] or report["invalid"]:
+            st.sidebar.warning(f"Skipped {report['duplicates']:,} duplicate and {report['invalid']:,} invalid rows")
+            if report["errors"]:
+                st.sidebar.json(report["errors"])
+
 # Render sidebar
 render_sidebar()
 
@@ -0,0 +1,159 @@
+# portfolio_gaps.py
+import numpy as np
+
+# Cell values of the project x skill heatmap (NaN = skill not required by the project)
+MISSING, ON_ROSTER, ON_TEAM = 0, 1, 2
+STATUS_LABELS = {MISSING: "Nobody on the roster", ON_ROSTER: "On the roster, not on the team", ON_TEAM: "Covered by the team"}
+WORD_BITS = 64
+
+def _project_key(project):
+    return project.get('id') or project.get('name')
+
+def _signature(project):
+    return (project.get('name'), tuple(project.get('required_skills', [])),
+            tuple(tuple(e.get('skills', [])) for e in project.get('team', [])))
+
+def _popcount_columns(words):
+    """Per-bit counts over the rows of a (rows x words) uint64 bitset matrix"""
+    bytes_ = np.ascontiguousarray(words, dtype="<u8").view(np.uint8)
+    return np.unpackbits(bytes_, axis=1, bitorder="little").sum(axis=0)
+
+def _unpack(words, width):
+    return np.unpackbits(np.ascontiguousarray(words, dtype="<u8").view(np.uint8), axis=-1, bitorder="little")[..., :width].astype(bool)
+
+class SkillGapEngine:
+    """Portfolio demand vs. supply per skill. Each project's required skills and its team's skills are
+    one row of uint64 bitsets (a bit per skill), and the roster is folded into per-skill employee counts
+    plus one "anyone has it" bitset, so every aggregate is a few vectorized bit operations.
+    sync() only re-encodes the projects whose skills or team changed, and the roster only when its
+    snapshot changes."""
+
+    def __init__(self):
+        self.skills = []    # bit -> skill name
+        self._bits = {}     # skill name -> bit
+        self._rows = {}     # project key -> row
+        self._keys = []     # row -> project key
+        self._signatures = []
+        self.names = []     # row -> project name
+        self.demand = np.zeros((16, 1), dtype=np.uint64)  # required skills per project
+        self.team = np.zeros((16, 1), dtype=np.uint64)    # skills of the project's team
+        self.roster_any = np.zeros(1, dtype=np.uint64)    # skills at least one employee has
+        self.supply = np.zeros(WORD_BITS, dtype=np.int64)  # employees per skill
+        self._roster_version = None
+
+    def _bit(self, skill):
+        bit = self._bits.get(skill)
+        if bit is None:
+            bit = self._bits[skill] = len(self.skills)
+            self.skills.append(skill)
+            if len(self.skills) > self.demand.shape[1] * WORD_BITS:
+                self.demand = np.pad(self.demand, ((0, 0), (0, 1)))
+                self.team = np.pad(self.team, ((0, 0), (0, 1)))
+                self.roster_any = np.pad(self.roster_any, (0, 1))
+                self.supply = np.pad(self.supply, (0, WORD_BITS))
+        return bit
+
+    @staticmethod
+    def _set_bits(matrix, rows, bits):
+        if len(bits):
+            bits = np.asarray(bits, dtype=np.uint64)
+            np.bitwise_or.at(matrix, (np.asarray(rows), (bits >> np.uint64(6)).astype(np.intp)),
+                             np.left_shift(np.uint64(1), bits & np.uint64(WORD_BITS - 1)))
+
+    def _remove_row(self, key):
+        row = self._rows.pop(key)
+        last = len(self.names) - 1
+        if row != last:
+            for matrix in (self.demand, self.team):
+                matrix[row] = matrix[last]
+            self._keys[row], self._signatures[row], self.names[row] = self._keys[last], self._signatures[last], self.names[last]
+            self._rows[self._keys[row]] = row
+        self._keys.pop()
+        self._signatures.pop()
+        self.names.pop()
+
+    def sync_projects(self, projects):
+        """Bring the project rows in line with projects; returns how many rows were re-encoded"""
+        current = {}
+        for project in projects:
+            current.setdefault(_project_key(project), project)
+        for key in [k for k in self._rows if k not in current]:
+            self._remove_row(key)
+        changed, demand_rows, demand_bits, team_rows, team_bits = [], [], [], [], []
+        for key, project in current.items():
+            signature = _signature(project)
+            row = self._rows.get(key)
+            if row is not None and self._signatures[row] == signature:
+                continue
+            if row is None:
+                row = self._rows[key] = len(self.names)
+                self._keys.append(key)
+                self._signatures.append(None)
+                self.names.append(None)
+                if row == len(self.demand):
+                    self.demand = np.vstack([self.demand, np.zeros_like(self.demand)])
+                    self.team = np.vstack([self.team, np.zeros_like(self.team)])
+            self._signatures[row], self.names[row] = signature, project.get('name', '')
+            changed.append(row)
+            for skill in signature[1]:
+                demand_rows.append(row)
+                demand_bits.append(self._bit(skill))
+            for member_skills in signature[2]:
+                for skill in member_skills:
+                    team_rows.append(row)
+                    team_bits.append(self._bit(skill))
+        # Re-encode only the changed rows, all at once
+        if changed:
+            self.demand[changed] = 0
+            self.team[changed] = 0
+            self._set_bits(self.demand, demand_rows, demand_bits)
+            self._set_bits(self.team, team_rows, team_bits)
+        return len(changed)
+
+    def sync_roster(self, roster):
+        """Recount skill supply when the roster snapshot changed"""
+        if self._roster_version == (roster.version, len(roster)):
+            return
+        to_bit = np.array([self._bit(skill) for skill in roster.skill_names] + [-1], dtype=np.int64)
+        bits = to_bit[roster.skill_matrix]  # padding (-1) maps to the trailing -1
+        employees, slots = np.nonzero(bits >= 0)
+        words = np.zeros((len(roster), self.demand.shape[1]), dtype=np.uint64)
+        self._set_bits(words, employees, bits[employees, slots])
+        self.supply = _popcount_columns(words).astype(np.int64)
+        self.roster_any = np.bitwise_or.reduce(words, axis=0) if len(roster) else np.zeros_like(self.roster_any)
+        self._roster_version = (roster.version, len(roster))
+
+    def sync(self, projects, roster):
+        changed = self.sync_projects(projects)
+        self.sync_roster(roster)
+        return changed
+
+    def skill_table(self):
+        """Per required skill: projects needing it, projects whose team covers it, and employees having it"""
+        count = len(self.names)
+        demand, team = self.demand[:count], self.team[:count]
+        needed = _popcount_columns(demand)
+        covered = _popcount_columns(demand & team)
+        rows = []
+        for bit in np.nonzero(needed)[0]:
+            rows.append({"skill": self.skills[bit], "demand": int(needed[bit]), "covered": int(covered[bit]),
+                         "shortfall": int(needed[bit] - covered[bit]), "employees": int(self.supply[bit])})
+        return sorted(rows, key=lambda r: (-r["shortfall"], -r["demand"], r["skill"]))
+
+    def heatmap(self, max_projects=40, max_skills=30):
+        """(project names, skill names, status matrix) for the most gapped projects and skills"""
+        count = len(self.names)
+        demand, team = self.demand[:count], self.team[:count]
+        table = self.skill_table()[:max_skills]
+        if not table or not count:
+            return [], [], np.zeros((0, 0))
+        bits = np.array([self._bits[row["skill"]] for row in table])
+        width = len(self.skills)
+        needed = _unpack(demand, width)[:, bits]
+        on_team = _unpack(team, width)[:, bits]
+        on_roster = _unpack(self.roster_any, width)[bits]
+        gaps = (needed & ~on_team).sum(axis=1)
+        projects = np.argsort(-gaps, kind="stable")[:max_projects]
+        status = np.where(on_team, ON_TEAM, np.where(on_roster, ON_ROSTER, MISSING)).astype(float)
+        status[~needed] = np.nan
+        return [self.names[p] for p in projects], [row["skill"] for row in table], status[projects]
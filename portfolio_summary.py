@@ -0,0 +1,75 @@
+# portfolio_summary.py
+import bisect
+import streamlit as st
+
+# Upper edges of the cost buckets used by the analytics chart (last bucket is open-ended)
+COST_BUCKET_EDGES = [5000, 10000, 25000, 50000, 100000, 250000, 500000, 1000000]
+
+def _project_key(project):
+    return project.get('id') or project.get('name')
+
+def _cost_bucket(cost):
+    return bisect.bisect_right(COST_BUCKET_EDGES, cost)
+
+def cost_bucket_label(bucket):
+    if bucket == 0:
+        return f"< ${COST_BUCKET_EDGES[0]:,}"
+    if bucket >= len(COST_BUCKET_EDGES):
+        return f"≥ ${COST_BUCKET_EDGES[-1]:,}"
+    return f"${COST_BUCKET_EDGES[bucket - 1]:,} - ${COST_BUCKET_EDGES[bucket]:,}"
+
+def _contribution(project):
+    cost = project.get('estimated_cost', 0) or 0
+    return {
+        "cost": cost,
+        "team_size": project.get('team_size', 0) or 0,
+        "bucket": _cost_bucket(cost)
+    }
+
+def _apply(summary, contribution, sign):
+    summary["count"] += sign
+    summary["total_cost"] += sign * contribution["cost"]
+    summary["total_team_size"] += sign * contribution["team_size"]
+    buckets = summary["cost_buckets"]
+    buckets[contribution["bucket"]] = buckets.get(contribution["bucket"], 0) + sign
+    if buckets[contribution["bucket"]] <= 0:
+        del buckets[contribution["bucket"]]
+
+def build_summary(projects):
+    """Build the materialized portfolio summary from scratch (once per session)"""
+    summary = {"count": 0, "total_cost": 0, "total_team_size": 0, "cost_buckets": {}, "contributions": {}}
+    for project in projects:
+        add_project(summary, project)
+    return summary
+
+def add_project(summary, project):
+    contribution = _contribution(project)
+    summary["contributions"][_project_key(project)] = contribution
+    _apply(summary, contribution, 1)
+
+def remove_project(summary, project):
+    contribution = summary["contributions"].pop(_project_key(project), None)
+    if contribution:
+        _apply(summary, contribution, -1)
+
+def update_project(summary, project):
+    """Replace a project's contribution after it was edited or re-teamed"""
+    remove_project(summary, project)
+    add_project(summary, project)
+
+def get_summary():
+    if 'project_summary' not in st.session_state:
+        st.session_state.project_summary = build_summary(st.session_state.projects)
+    return st.session_state.project_summary
+
+_all_departments = (None, None)  # (cross-shard project list, its summary)
+
+def get_all_departments_summary(projects):
+    """Summary of shard_store.load_all's read-only cross-shard list, built once per list and
+    shared by every session (load_all returns the same list until a shard changes)"""
+    global _all_departments
+    cached_projects, summary = _all_departments
+    if cached_projects is not projects:
+        summary = build_summary(projects)
+        _all_departments = (projects, summary)
+    return summary
@@ -3,9 +3,13 @@ import streamlit as st
 import pandas as pd
 from datetime import datetime
 import uuid
-from utils import save_json
+from utils import save_json, data_path
 from ai_functions import predict_project_parameters, predict_project_summary, predict_required_skills
 from core_functions import build_optimal_team, analyze_skill_gaps, calculate_project_timeline, estimate_project_cost
+from portfolio_summary import get_summary, add_project
+from roster_store import get_roster
+from job_queue import job_key, submit, pickup
+from project_similarity import find_similar, index_project, predictions_from_project, REUSE_SIMILARITY
 
 PROJ_FILE = "projects.json"
 
@@ -20,12 +24,23 @@ def render_project_analysis():
         
         if st.button("🤖 AI Predict Parameters"):
             if project_desc.strip():
-                with st.spinner("AI predicting project parameters..."):
-                    predictions = predict_project_parameters(project_desc)
-                    st.session_state.ai_predictions = predictions
-                    st.success("Parameters predicted! Review and adjust below.")
+                # A near-identical past project answers instantly; otherwise ask the AI
+                matches = find_similar(project_desc)
+                st.session_state.similar_projects = {"description": project_desc, "matches": matches}
+                if matches and matches[0]["similarity"] >= REUSE_SIMILARITY:
+                    reuse_analysis(matches[0], project_desc)
+                else:
+                    predict_parameters(project_desc)
             else:
                 st.warning("Please enter project description first")
+        render_similar_projects(project_desc)
+        
+        job = pickup("parameters_job", "AI predicting project parameters...")
+        if job and job["status"] == "done":
+            st.session_state.ai_predictions = job["result"]
+            st.success("Parameters predicted! Review and adjust below.")
+        elif job:
+            st.error(f"Parameter prediction failed: {job['error']}")
     
     with col2:
         if st.session_state.ai_predictions:
@@ -65,118 +80,199 @@ def render_project_analysis():
         if not project_desc.strip():
             st.warning("Please enter a project description first.")
         else:
-            with st.spinner("AI analyzing project and building team..."):
-                # Get summary from AI predictions or generate one
-                if st.session_state.ai_predictions:
-                    summary = st.session_state.ai_predictions.get("summary", predict_project_summary(project_desc))
-                else:
-                    summary = predict_project_summary(project_desc)
-                
-                # Predict required skills
-                required_skills = predict_required_skills(project_desc)
-                
-                # Build optimal team
-                selected_team, all_scored_employees = build_optimal_team(required_skills, st.session_state.employees, team_size)
-                
-                # Analyze skill gaps
-                skill_gaps = analyze_skill_gaps(required_skills, st.session_state.employees)
-                
-                # Calculate project metrics
-                timeline = calculate_project_timeline(project_complexity, len(selected_team))
-                estimated_cost = estimate_project_cost(selected_team, timeline)
-                
-                # Store project data
-                project_data = {
-                    "id": str(uuid.uuid4()),
-                    "name": project_name or f"Project {len(st.session_state.projects) + 1}",
-                    "description": project_desc,
-                    "summary": summary,
-                    "required_skills": required_skills,
-                    "complexity": project_complexity,
-                    "team_size": team_size,
-                    "timeline": timeline,
-                    "estimated_cost": estimated_cost,
-                    "budget": budget,
-                    "team": selected_team,
-                    "skill_gaps": skill_gaps,
-                    "all_scored_employees": all_scored_employees,
-                    "created_at": datetime.now().strftime("%Y-%m-%d %H:%M")
-                }
-                st.session_state.projects.append(project_data)
-                st.session_state.selected_employees = selected_team
-                save_json(PROJ_FILE, st.session_state.projects)
-            
-            # Display results
-            st.subheader("📊 Project Analysis Results")
-            
-            # Project Summary
-            st.subheader("📌 Project Summary")
-            st.info(summary)
-            
-            col1, col2, col3 = st.columns(3)
-            with col1:
-                st.metric("Team Size", len(selected_team))
-            with col2:
-                st.metric("Timeline (days)", timeline)
-            with col3:
-                st.metric("Estimated Cost", f"${estimated_cost:,.0f}")
-            
-            # Required Skills
-            st.subheader("✅ Predicted Required Skills")
-            if required_skills:
-                skills_html = "<div style='display: flex; flex-wrap: wrap; gap: 8px; margin: 10px 0;'>"
-                for skill in required_skills:
-                    skills_html += f"<span style='background-color: #4CAF50; color: white; padding: 5px 12px; border-radius: 15px; font-size: 14px;'>{skill}</span>"
-                skills_html += "</div>"
-                st.markdown(skills_html, unsafe_allow_html=True)
-                
-                # Skill Gap Analysis
-                if skill_gaps["missing_skills"]:
-                    st.subheader("⚠ Skill Gaps Identified")
-                    st.warning(f"Missing skills: {', '.join(skill_gaps['missing_skills'])}")
-                    st.info(f"Skill coverage: {skill_gaps['coverage_percentage']}%")
-                else:
-                    st.success("✅ All required skills are available in your team!")
-            else:
-                st.info("No specific skills identified for this project")
-            
-            # Recommended Team
-            st.subheader("👨‍💻 Recommended Team")
-            if selected_team:
-                team_data = []
-                from core_functions import score_employee
-                for emp in selected_team:
-                    score = score_employee(emp.get("skills", []), required_skills, emp.get("experience", 1))
-                    team_data.append({
-                        "Name": emp['name'],
-                        "Skills": ", ".join(emp['skills']),
-                        "Experience": f"{emp.get('experience', 1)} years",
-                        "Match Score": f"{score}%"
-                    })
-                
-                team_df = pd.DataFrame(team_data)
-                st.dataframe(team_df, use_container_width=True, hide_index=True)
-                
-                # Team member cards
-                st.write("**Team Members:**")
-                cols = st.columns(len(selected_team))
-                for i, (col, emp) in enumerate(zip(cols, selected_team)):
-                    with col:
-                        score = score_employee(emp.get("skills", []), required_skills, emp.get("experience", 1))
-                        st.markdown(f"""
-                        <div style='background-color: #f0f8ff; padding: 15px; border-radius: 10px; border-left: 5px solid #4CAF50; margin-bottom: 15px;'>
-                            <h4 style='margin: 0 0 10px 0;'>{emp['name']}</h4>
-                            <p style='margin: 5px 0;'><strong>Skills:</strong> {', '.join(emp['skills'])}</p>
-                            <p style='margin: 5px 0;'><strong>Experience:</strong> {emp.get('experience', 1)} years</p>
-                            <p style='margin: 5px 0;'><strong>Match:</strong> {score}%</p>
-                        </div>
-                        """, unsafe_allow_html=True)
-            else:
-                st.warning("No suitable employees found for this project.")
-            
-            # Budget analysis
-            st.subheader("💰 Budget Analysis")
-            if estimated_cost <= budget:
-                st.success(f"✅ Estimated cost (${estimated_cost:,.0f}) is within budget (${budget:,.0f})")
-            else:
-                st.error(f"❌ Estimated cost (${estimated_cost:,.0f}) exceeds budget (${budget:,.0f})")
\ No newline at end of file
+            # Summary from AI predictions if available, otherwise the job generates one
+            predictions = st.session_state.ai_predictions or {}
+            summary = predictions.get("summary")
+            # Skills of a reused past analysis, as long as it was reused for this description
+            required_skills = predictions.get("required_skills") if predictions.get("description") == project_desc else None
+            # The snapshot is immutable, so the job can use it without copying
+            roster = get_roster()
+            key = submit(job_key("analysis", project_desc, summary, required_skills, team_size, project_complexity,
+                                 roster.index.fingerprint),
+                         run_project_analysis, project_desc, summary, roster, team_size, project_complexity, required_skills)
+            st.session_state.analysis_job = {"key": key, "context": {"name": project_name, "budget": budget}}
+    
+    job = pickup("analysis_job", "AI analyzing project and building team...")
+    if job and job["status"] == "failed":
+        st.error(f"Project analysis failed: {job['error']}")
+    elif job:
+        # Store project data (the result may be shared with other sessions, so copy the lists)
+        result = job["result"]
+        project_data = {
+            "id": str(uuid.uuid4()),
+            "name": job["context"]["name"] or f"Project {len(st.session_state.projects) + 1}",
+            "description": result["description"],
+            "summary": result["summary"],
+            "required_skills": result["required_skills"],
+            "complexity": result["complexity"],
+            "team_size": result["team_size"],
+            "timeline": result["timeline"],
+            "estimated_cost": result["estimated_cost"],
+            "budget": job["context"]["budget"],
+            "team": list(result["team"]),
+            "skill_gaps": result["skill_gaps"],
+            "all_scored_employees": list(result["all_scored_employees"]),
+            "created_at": datetime.now().strftime("%Y-%m-%d %H:%M"),
+            "department": st.session_state.department
+        }
+        st.session_state.projects.append(project_data)
+        add_project(get_summary(), project_data)
+        st.session_state.selected_employees = project_data["team"]
+        save_json(data_path(PROJ_FILE), st.session_state.projects)
+        index_project(project_data)
+        render_analysis_results(project_data)
+
+def predict_parameters(project_desc):
+    key = submit(job_key("parameters", project_desc), predict_project_parameters, project_desc)
+    st.session_state.parameters_job = {"key": key}
+
+def reuse_analysis(match, project_desc):
+    """Take the predictions (and required skills) from a similar past project instead of the AI"""
+    predictions = predictions_from_project(match)
+    predictions["description"] = project_desc
+    st.session_state.ai_predictions = predictions
+    st.session_state.pop("parameters_job", None)
+
+def render_similar_projects(project_desc):
+    similar = st.session_state.get('similar_projects')
+    if not similar or similar["description"] != project_desc:
+        return
+    predictions = st.session_state.ai_predictions or {}
+    reused = predictions.get("reused_from") if predictions.get("description") == project_desc else None
+    if reused:
+        st.success(f"Reused the analysis of **{reused['name']}** ({reused['similarity']:.0%} similar), no AI call needed.")
+        if st.button("🤖 Predict with AI instead", key="predict_with_ai"):
+            st.session_state.ai_predictions = None
+            predict_parameters(project_desc)
+            st.rerun()
+    if not similar["matches"]:
+        return
+    st.write("**Similar past projects:**")
+    for match in similar["matches"]:
+        project = match["project"]
+        department = f" [{project['department']}]" if project.get("department") else ""
+        col_a, col_b = st.columns([4, 1])
+        with col_a:
+            st.caption(f"{match['similarity']:.0%} · **{project.get('name', '')}**{department} · "
+                       f"{project.get('complexity', '?')} · {', '.join(project.get('required_skills', []))}")
+        with col_b:
+            if (not reused or reused["id"] != project["id"]) and st.button("Reuse", key=f"reuse_{project['id']}"):
+                reuse_analysis(match, project_desc)
+                st.rerun()
+
+def run_project_analysis(project_desc, summary, employees, team_size, project_complexity, required_skills=None):
+    """Background job: LLM calls and team building for one analysis (must not touch session state).
+    required_skills from a reused past analysis skip the skills prediction."""
+    if not summary:
+        summary = predict_project_summary(project_desc)
+    
+    # Predict required skills
+    if required_skills is None:
+        required_skills = predict_required_skills(project_desc)
+    
+    # Build optimal team
+    selected_team, all_scored_employees = build_optimal_team(required_skills, employees, team_size)
+    
+    # Analyze skill gaps
+    skill_gaps = analyze_skill_gaps(required_skills, employees)
+    
+    # Calculate project metrics
+    timeline = calculate_project_timeline(project_complexity, len(selected_team))
+    estimated_cost = estimate_project_cost(selected_team, timeline)
+    
+    return {
+        "description": project_desc,
+        "summary": summary,
+        "required_skills": required_skills,
+        "complexity": project_complexity,
+        "team_size": team_size,
+        "timeline": timeline,
+        "estimated_cost": estimated_cost,
+        "team": selected_team,
+        "skill_gaps": skill_gaps,
+        "all_scored_employees": all_scored_employees
+    }
+
+def render_analysis_results(project):
+    summary = project["summary"]
+    required_skills = project["required_skills"]
+    selected_team = project["team"]
+    skill_gaps = project["skill_gaps"]
+    timeline = project["timeline"]
+    estimated_cost = project["estimated_cost"]
+    budget = project["budget"]
+    
+    # Display results
+    st.subheader("📊 Project Analysis Results")
+    
+    # Project Summary
+    st.subheader("📌 Project Summary")
+    st.info(summary)
+    
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        st.metric("Team Size", len(selected_team))
+    with col2:
+        st.metric("Timeline (days)", timeline)
+    with col3:
+        st.metric("Estimated Cost", f"${estimated_cost:,.0f}")
+    
+    # Required Skills
+    st.subheader("✅ Predicted Required Skills")
+    if required_skills:
+        skills_html = "<div style='display: flex; flex-wrap: wrap; gap: 8px; margin: 10px 0;'>"
+        for skill in required_skills:
+            skills_html += f"<span style='background-color: #4CAF50; color: white; padding: 5px 12px; border-radius: 15px; font-size: 14px;'>{skill}</span>"
+        skills_html += "</div>"
+        st.markdown(skills_html, unsafe_allow_html=True)
+        
+        # Skill Gap Analysis
+        if skill_gaps["missing_skills"]:
+            st.subheader("⚠ Skill Gaps Identified")
+            st.warning(f"Missing skills: {', '.join(skill_gaps['missing_skills'])}")
+            st.info(f"Skill coverage: {skill_gaps['coverage_percentage']}%")
+        else:
+            st.success("✅ All required skills are available in your team!")
+    else:
+        st.info("No specific skills identified for this project")
+    
+    # Recommended Team
+    st.subheader("👨‍💻 Recommended Team")
+    if selected_team:
+        team_data = []
+        from core_functions import score_employee
+        for emp in selected_team:
+            score = score_employee(emp.get("skills", []), required_skills, emp.get("experience", 1))
+            team_data.append({
+                "Name": emp['name'],
+                "Skills": ", ".join(emp['skills']),
+                "Experience": f"{emp.get('experience', 1)} years",
+                "Match Score": f"{score}%"
+            })
+        
+        team_df = pd.DataFrame(team_data)
+        st.dataframe(team_df, use_container_width=True, hide_index=True)
+        
+        # Team member cards
+        st.write("**Team Members:**")
+        cols = st.columns(len(selected_team))
+        for i, (col, emp) in enumerate(zip(cols, selected_team)):
+            with col:
+                score = score_employee(emp.get("skills", []), required_skills, emp.get("experience", 1))
+                st.markdown(f"""
+                <div style='background-color: #f0f8ff; padding: 15px; border-radius: 10px; border-left: 5px solid #4CAF50; margin-bottom: 15px;'>
+                    <h4 style='margin: 0 0 10px 0;'>{emp['name']}</h4>
+                    <p style='margin: 5px 0;'><strong>Skills:</strong> {', '.join(emp['skills'])}</p>
+                    <p style='margin: 5px 0;'><strong>Experience:</strong> {emp.get('experience', 1)} years</p>
+                    <p style='margin: 5px 0;'><strong>Match:</strong> {score}%</p>
+                </div>
+                """, unsafe_allow_html=True)
+    else:
+        st.warning("No suitable employees found for this project.")
+    
+    # Budget analysis
+    st.subheader("💰 Budget Analysis")
+    if estimated_cost <= budget:
+        st.success(f"✅ Estimated cost (${estimated_cost:,.0f}) is within budget (${budget:,.0f})")
+    else:
+        st.error(f"❌ Estimated cost (${estimated_cost:,.0f}) exceeds budget (${budget:,.0f})")
\ No newline at end of file
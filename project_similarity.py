@@ -0,0 +1,122 @@
+# project_similarity.py
+import os
+import re
+import threading
+import zlib
+import numpy as np
+from shard_store import load_all
+
+PROJ_FILE = "projects.json"
+HASH_DIM = 2048
+REUSE_SIMILARITY = float(os.getenv("PROJECT_REUSE_SIMILARITY", "0.9"))  # at or above: reuse without an LLM call
+SUGGEST_SIMILARITY = 0.5  # at or above: shown as a similar past project
+MAX_MATCHES = 3
+# What is kept per indexed project: enough to reuse its analysis, not its rankings
+ANALYSIS_FIELDS = ("id", "name", "department", "description", "summary", "required_skills", "complexity",
+                   "team_size", "timeline", "estimated_cost", "budget", "created_at")
+
+_TOKEN = re.compile(r"[a-z0-9][a-z0-9+#/.-]*")
+_STOPWORDS = frozenset("""a an and are as at be build by for from has have in into is it its of on or our that the their
+this to we will with using use create develop platform system project application app""".split())
+
+def _terms(text):
+    words = [w.rstrip(".-/") for w in _TOKEN.findall(text.lower())]
+    words = [w for w in words if w and w not in _STOPWORDS]
+    return words + [f"{a} {b}" for a, b in zip(words, words[1:])]
+
+def vectorize(text):
+    """Unit-length signed hashed vector of the description's words and word pairs (log-scaled counts)"""
+    counts = np.zeros(HASH_DIM, dtype=np.float32)
+    for term in _terms(text):
+        h = zlib.crc32(term.encode("utf-8"))
+        counts[h % HASH_DIM] += 1.0 if h & 0x80000000 else -1.0
+    vector = np.sign(counts) * np.log1p(np.abs(counts))
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm else vector
+
+def _indexable(project):
+    return bool(project.get("id") and project.get("description") and project.get("required_skills"))
+
+class ProjectIndex:
+    """Nearest-neighbour index over past project descriptions, kept in memory: one row per project
+    in a preallocated matrix, so adding a project and searching never re-vectorize the others"""
+
+    def __init__(self, projects=()):
+        self._lock = threading.Lock()
+        self._vectors = np.zeros((max(16, len(projects)), HASH_DIM), dtype=np.float32)
+        self._rows = {}      # project id -> row
+        self._projects = []  # row -> ANALYSIS_FIELDS of the project
+        for project in projects:
+            self.add(project)
+
+    def __len__(self):
+        return len(self._projects)
+
+    def add(self, project):
+        """Index a saved project (or re-index it if its description changed)"""
+        if not _indexable(project):
+            return
+        entry = {field: project[field] for field in ANALYSIS_FIELDS if field in project}
+        vector = vectorize(project["description"])
+        with self._lock:
+            row = self._rows.get(project["id"])
+            if row is None:
+                row = len(self._projects)
+                if row == len(self._vectors):
+                    self._vectors = np.vstack([self._vectors, np.zeros_like(self._vectors)])
+                self._rows[project["id"]] = row
+                self._projects.append(entry)
+            else:
+                self._projects[row] = entry
+            self._vectors[row] = vector
+
+    def search(self, description, limit=MAX_MATCHES, min_similarity=SUGGEST_SIMILARITY):
+        """[{"similarity", "project"}] for the most similar past projects, best first"""
+        query = vectorize(description)
+        with self._lock:
+            similarities = self._vectors[:len(self._projects)] @ query
+            matches, seen = [], set()
+            # Re-analysed copies of one description would crowd out the other matches
+            for row in np.argsort(-similarities):
+                if similarities[row] < min_similarity or len(matches) == limit:
+                    break
+                project = self._projects[row]
+                if project["description"] not in seen:
+                    seen.add(project["description"])
+                    matches.append({"similarity": float(similarities[row]), "project": project})
+            return matches
+
+_index = None
+_index_lock = threading.Lock()
+
+def get_project_index():
+    """Process-wide index over every department's saved projects, built on first use and then kept
+    up to date by index_project as projects are saved and re-teamed"""
+    global _index
+    with _index_lock:
+        if _index is None:
+            _index = ProjectIndex(load_all(PROJ_FILE))
+        return _index
+
+def index_project(project):
+    get_project_index().add(project)
+
+def find_similar(description, limit=MAX_MATCHES):
+    return get_project_index().search(description, limit)
+
+def predictions_from_project(match):
+    """ai_predictions (the shape predict_project_parameters returns) taken from a past project's analysis,
+    plus its required skills so the team analysis can skip that LLM call too"""
+    project = match["project"]
+    complexity = project.get("complexity", "medium")
+    return {
+        "summary": project.get("summary", ""),
+        "complexity": complexity,
+        "recommended_team_size": int(max(1, min(10, project.get("team_size", 3)))),
+        "estimated_budget": int(max(1000, project.get("budget") or project.get("estimated_cost") or 10000)),
+        "timeline_weeks": max(1, round(project.get("timeline", 28) / 7)),
+        "risk_level": {"low": "low", "high": "high", "very high": "high"}.get(complexity, "medium"),
+        "key_technologies": list(project.get("required_skills", [])),
+        "required_skills": list(project.get("required_skills", [])),
+        "reused_from": {"id": project["id"], "name": project.get("name", ""), "similarity": match["similarity"]},
+    }
@@ -0,0 +1,111 @@
+# prompt_builder.py
+import re
+import threading
+from functools import lru_cache
+
+# Approximate token budget for a whole prompt, per call type
+PROMPT_TOKEN_BUDGETS = {
+    "summary": 600,
+    "skills": 600,
+    "parameters": 900,
+    "advice": 1200,
+    "default": 1500,
+}
+QUESTION_TOKEN_LIMIT = 200
+SUMMARY_TOKEN_LIMIT = 150
+MAX_CONTEXT_SKILLS = 40
+MIN_TEXT_TOKENS = 50
+
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s+")
+_stats_lock = threading.Lock()
+_stats = {}
+
+def estimate_tokens(text):
+    """Cheap token estimate (~4 characters per token for English prose), no API call"""
+    return (len(text) + 3) // 4
+
+def dedupe(items):
+    """Drop case-insensitive duplicates, keeping the first spelling and order"""
+    seen = set()
+    unique = []
+    for item in items:
+        key = item.strip().lower()
+        if key and key not in seen:
+            seen.add(key)
+            unique.append(item.strip())
+    return unique
+
+@lru_cache(maxsize=1024)
+def compact_text(text, max_tokens):
+    """Collapse whitespace and cut text to max_tokens at a sentence (or word) boundary.
+    Cached, so a long description is only shortened once per budget."""
+    text = " ".join(text.split())
+    if estimate_tokens(text) <= max_tokens:
+        return text
+    max_chars = max_tokens * 4
+    kept = ""
+    for sentence in _SENTENCE_END.split(text):
+        candidate = f"{kept} {sentence}".strip()
+        if len(candidate) > max_chars:
+            break
+        kept = candidate
+    if not kept:
+        kept = text[:max_chars].rsplit(" ", 1)[0]
+    return kept + " …"
+
+def fit_prompt(call_type, build, text):
+    """Render build(text), shortening text so the prompt stays within the call type's budget"""
+    budget = PROMPT_TOKEN_BUDGETS.get(call_type, PROMPT_TOKEN_BUDGETS["default"])
+    overhead = estimate_tokens(build(""))
+    prompt = build(compact_text(text, max(budget - overhead, MIN_TEXT_TOKENS)))
+    record_prompt(call_type, estimate_tokens(build(text)), estimate_tokens(prompt))
+    return prompt
+
+def record_prompt(call_type, uncompacted_tokens, sent_tokens):
+    with _stats_lock:
+        stats = _stats.setdefault(call_type, {"prompts": 0, "tokens_sent": 0, "tokens_before_compaction": 0, "max_tokens_sent": 0})
+        stats["prompts"] += 1
+        stats["tokens_sent"] += sent_tokens
+        stats["tokens_before_compaction"] += uncompacted_tokens
+        stats["max_tokens_sent"] = max(stats["max_tokens_sent"], sent_tokens)
+
+def get_prompt_metrics():
+    """Per call type: prompt count, estimated tokens sent vs. before compaction"""
+    with _stats_lock:
+        metrics = {call_type: dict(stats) for call_type, stats in _stats.items()}
+    for stats in metrics.values():
+        stats["avg_tokens_sent"] = round(stats["tokens_sent"] / stats["prompts"])
+        stats["tokens_saved"] = stats["tokens_before_compaction"] - stats["tokens_sent"]
+    return metrics
+
+def build_advice_prompt(project, missing_skills, question):
+    """Compact advisor prompt: deduplicated skills, bounded question, summary and description"""
+    team_skills = dedupe([s for emp in project.get('team', []) for s in emp.get('skills', [])])
+    required_skills = dedupe(project.get('required_skills', []))
+    summary = compact_text(project.get('summary') or '', SUMMARY_TOKEN_LIMIT)
+    question = compact_text(question, QUESTION_TOKEN_LIMIT)
+
+    def build(description):
+        overview = f"Description: {description or 'No description'}"
+        if summary:
+            overview += f"\nSummary: {summary}"
+        return f"""You are a senior technology project consultant.
+
+PROJECT: {project['name']}
+{overview}
+MISSING SKILLS: {', '.join(missing_skills)}
+Team skills: {', '.join(team_skills[:MAX_CONTEXT_SKILLS]) or 'none'}
+Required skills: {', '.join(required_skills[:MAX_CONTEXT_SKILLS])}
+Team: {len(project.get('team', []))} | Budget: ${project.get('budget', 0):,} | Est. cost: ${project.get('estimated_cost', 0):,} | Timeline: {project.get('timeline', 0)} days | Complexity: {project.get('complexity', 'Unknown')} | Risk: {project.get('risk_level', 'Unknown')}
+
+QUESTION: {question}
+
+Answer the question and cover, in markdown with ## headers and bullets:
+1. Immediate actions this week per missing skill
+2. Cost-effective options (hire/train/outsource) with real rates and totals
+3. Timeline impact and critical-path risks
+4. Risks and mitigations per missing skill
+5. Your #1 recommendation with a step-by-step plan and success metrics
+Be specific: give numbers, timelines and concrete steps."""
+
+    return fit_prompt("advice", build, project.get('description') or '')
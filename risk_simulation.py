@@ -0,0 +1,138 @@
+# risk_simulation.py
+import re
+import time
+from functools import lru_cache
+import numpy as np
+from knowledge_base import get_knowledge_base, get_knowledge_version, normalize_skill
+
+DEFAULT_SAMPLES = 2000
+SEED = 42  # fixed so P50/P90 don't jitter between reruns
+MAX_CHUNK_CELLS = 2_000_000  # projects x samples simulated per batch, bounds memory on big portfolios
+# Multipliers on the deterministic timeline: (optimistic, most likely, pessimistic) per complexity
+COMPLEXITY_SPREAD = {
+    "low": (0.9, 1.0, 1.3),
+    "medium": (0.85, 1.0, 1.5),
+    "high": (0.8, 1.0, 1.8),
+    "very high": (0.8, 1.05, 2.2),
+}
+# Used for skills the knowledge base has no entry for (same figures as the fallback advice)
+DEFAULT_TIMELINE_IMPACT = "2-4 weeks"
+DEFAULT_COST_IMPACT = "$10k-25k"
+DAYS_PER_UNIT = {"day": 1, "week": 7, "month": 30}
+
+_RANGE = re.compile(r"\$?(\d+(?:\.\d+)?)\s*(k)?\s*(?:-|to)\s*\$?(\d+(?:\.\d+)?)\s*(k)?\s*(day|week|month)?", re.IGNORECASE)
+
+def parse_impact_range(text, default):
+    """(low, high) from knowledge-base impact text: "High (+4-8 weeks)" -> (28, 56) days,
+    "Medium (+$15k-30k)" -> (15000, 30000) dollars. Falls back to default when unparseable."""
+    match = _RANGE.search(text or "") or _RANGE.search(default)
+    low, low_k, high, high_k, unit = match.groups()
+    scale = DAYS_PER_UNIT[unit.lower()] if unit else 1
+    factor = scale * (1000 if (low_k or high_k) else 1)  # "$20k-50k": the k applies to both ends
+    low, high = float(low) * factor, float(high) * factor
+    return min(low, high), max(low, high)
+
+@lru_cache(maxsize=4)
+def _impact_table(knowledge_version):
+    """Normalized skill -> (delay low, delay high, cost low, cost high), rebuilt when the knowledge base reloads"""
+    table = {}
+    for skill, data in get_knowledge_base().get("skill_solutions", {}).items():
+        table[normalize_skill(skill)] = (parse_impact_range(data.get("timeline_impact"), DEFAULT_TIMELINE_IMPACT)
+                                         + parse_impact_range(data.get("cost_impact"), DEFAULT_COST_IMPACT))
+    return table
+
+def _skill_impact(table, skill):
+    return table.get(normalize_skill(skill)) or (parse_impact_range(DEFAULT_TIMELINE_IMPACT, DEFAULT_TIMELINE_IMPACT)
+                                                 + parse_impact_range(DEFAULT_COST_IMPACT, DEFAULT_COST_IMPACT))
+
+def _missing_skills(project):
+    return (project.get("skill_gaps") or {}).get("missing_skills") or []
+
+def _percentiles(values, axis):
+    p50, p90 = np.percentile(values, [50, 90], axis=axis)
+    return p50, p90
+
+def _triangular(rng, low, mode, high, size):
+    """Triangular draws via the inverse CDF on float32 uniforms (Generator.triangular is float64 only)"""
+    u = rng.random(size, dtype=np.float32)
+    span = high - low
+    split = (mode - low) / span
+    return np.where(u < split, low + np.sqrt(u * span * (mode - low)),
+                    high - np.sqrt((1 - u) * span * (high - mode)))
+
+def _simulate_chunk(projects, table, samples, rng):
+    """(days, costs) arrays of shape (len(projects), samples)"""
+    spreads = np.array([COMPLEXITY_SPREAD.get(p.get("complexity"), COMPLEXITY_SPREAD["medium"]) for p in projects],
+                       dtype=np.float32)
+    base_days = np.array([max(p.get("timeline", 0) or 0, 1) for p in projects], dtype=np.float32)
+    daily_burn = np.array([(p.get("estimated_cost", 0) or 0) for p in projects], dtype=np.float32) / base_days
+
+    days = base_days[:, None] * _triangular(rng, spreads[:, 0:1], spreads[:, 1:2], spreads[:, 2:3],
+                                            (len(projects), samples))
+    gap_costs = np.zeros_like(days)
+    # One row per (project, missing skill); rows are grouped by project so reduceat can sum them
+    owners, impacts = [], []
+    for pos, project in enumerate(projects):
+        for skill in _missing_skills(project):
+            owners.append(pos)
+            impacts.append(_skill_impact(table, skill))
+    if owners:
+        impacts = np.array(impacts, dtype=np.float32)
+        # One draw per gap sets both its delay and its cost: a gap that takes longer to close costs more
+        u = rng.random((len(owners), samples), dtype=np.float32)
+        owners = np.array(owners)
+        starts = np.flatnonzero(np.r_[True, owners[1:] != owners[:-1]])
+        for column, target in ((0, days), (2, gap_costs)):
+            low, span = impacts[:, column:column + 1], impacts[:, column + 1:column + 2] - impacts[:, column:column + 1]
+            target[owners[starts]] += np.add.reduceat(low + span * u, starts, axis=0)
+    # The team is paid for every extra day, plus whatever closing each gap costs
+    return days, daily_burn[:, None] * days + gap_costs
+
+def simulate_portfolio(projects, samples=DEFAULT_SAMPLES, seed=SEED):
+    """Monte Carlo timeline/cost outcomes for every project, sampled in NumPy batches.
+    Each project's timeline is its deterministic estimate scaled by a triangular complexity factor,
+    plus a delay per missing skill drawn from the knowledge base's timeline_impact range; cost is
+    the team's daily burn over that timeline plus each gap's cost_impact draw. Projects are
+    treated as independent and running in parallel."""
+    start = time.perf_counter()
+    table = _impact_table(get_knowledge_version())
+    rng = np.random.default_rng(seed)
+    chunk = max(1, MAX_CHUNK_CELLS // samples)
+    rows = []
+    total_cost = np.zeros(samples)
+    longest = np.zeros(samples, dtype=np.float32)
+    for offset in range(0, len(projects), chunk):
+        batch = projects[offset:offset + chunk]
+        days, costs = _simulate_chunk(batch, table, samples, rng)
+        total_cost += costs.sum(axis=0)
+        np.maximum(longest, days.max(axis=0), out=longest)
+        days_p50, days_p90 = _percentiles(days, axis=1)
+        cost_p50, cost_p90 = _percentiles(costs, axis=1)
+        for i, project in enumerate(batch):
+            rows.append({
+                "name": project.get("name", ""),
+                "complexity": project.get("complexity", "Unknown"),
+                "missing_skills": len(_missing_skills(project)),
+                "timeline": project.get("timeline", 0),
+                "timeline_p50": round(days_p50[i]),
+                "timeline_p90": round(days_p90[i]),
+                "estimated_cost": project.get("estimated_cost", 0),
+                "cost_p50": round(cost_p50[i]),
+                "cost_p90": round(cost_p90[i]),
+            })
+    cost_p50, cost_p90 = _percentiles(total_cost, axis=0) if projects else (0, 0)
+    days_p50, days_p90 = _percentiles(longest, axis=0) if projects else (0, 0)
+    return {
+        "projects": rows,
+        "portfolio": {"cost_p50": round(cost_p50), "cost_p90": round(cost_p90),
+                      "timeline_p50": round(days_p50), "timeline_p90": round(days_p90)},
+        "total_cost_samples": total_cost,
+        "samples": samples,
+        "seconds": time.perf_counter() - start,
+    }
+
+def simulation_key(projects, samples=DEFAULT_SAMPLES):
+    """Changes whenever anything the simulation reads changes (projects or knowledge base)"""
+    return (samples, get_knowledge_version(), tuple(
+        (p.get("id") or p.get("name"), p.get("complexity"), p.get("timeline"), p.get("estimated_cost"),
+         tuple(_missing_skills(p))) for p in projects))
@@ -0,0 +1,231 @@
+# roster_import.py
+"""Streaming bulk import of employees from CSV or JSONL HR exports.
+
+Rows are parsed, validated and canonicalized one at a time and fed straight into a staging snapshot
+(skill matrix and experience/workload columns), so no intermediate list of rows is kept. All of that
+happens without the roster lock; roster_store.import_snapshot then merges the staged columns into the
+current roster, skipping ids it already has. The import is all-or-nothing: the roster is only saved
+once every row has been read.
+
+CSV columns: id (or employee_id), name (or employee_name), skills (separated by ; , or |),
+experience, workload, department. JSONL: one object per line with the same fields, skills may be
+a list. Rows without an id get one; ids already in the roster or seen earlier in the file are skipped.
+
+Run:  python roster_import.py hr_export.csv --department Sales
+      python roster_import.py --benchmark --rows 100000
+"""
+import argparse
+import csv
+import io
+import json
+import os
+import random
+import re
+import tempfile
+import time
+import tracemalloc
+import uuid
+
+from roster_store import EMP_FILE, RosterSnapshot, get_roster, import_snapshot
+from shard_store import DEPARTMENT_FIELD, valid_department
+from skill_similarity import ALIAS_GROUPS, normalize
+
+MAX_NAME_LENGTH = 100
+MAX_SKILL_LENGTH = 50
+MAX_EXPERIENCE = 60
+MAX_REPORTED_ERRORS = 20  # invalid rows listed in the report; the rest are only counted
+COLUMN_ALIASES = {"employee_id": "id", "employee_name": "name", "skill": "skills"}  # data_export's column names
+SKILL_SEPARATORS = re.compile(r"[;,|]")
+
+class RowError(ValueError):
+    pass
+
+def detect_format(filename):
+    return "jsonl" if os.path.splitext(filename)[1].lower() in (".jsonl", ".ndjson") else "csv"
+
+def iter_rows(stream, fmt):
+    """(line number, raw row dict) for every row of a text stream, read lazily"""
+    if fmt == "jsonl":
+        for line_no, line in enumerate(stream, 1):
+            if not line.strip():
+                continue
+            try:
+                row = json.loads(line)
+            except ValueError:
+                yield line_no, RowError("invalid JSON")
+                continue
+            yield line_no, row if isinstance(row, dict) else RowError("not a JSON object")
+    else:
+        reader = csv.DictReader(stream)
+        reader.fieldnames = [(name or "").strip().lower() for name in reader.fieldnames or []]
+        for row in reader:
+            yield reader.line_num, row
+
+class SkillCanonicalizer:
+    """Maps spelling variants ("python", " PYTHON ") to one canonical spelling: the alias group
+    names first, then the roster's existing skills, then the first spelling seen in the import"""
+
+    def __init__(self, known_skills=()):
+        self.canonical = {}
+        for skill in list(ALIAS_GROUPS) + list(known_skills):
+            self.canonical.setdefault(normalize(skill), skill)
+
+    def __call__(self, skill):
+        cleaned = " ".join(str(skill).split())
+        if not cleaned:
+            return None
+        if len(cleaned) > MAX_SKILL_LENGTH:
+            raise RowError(f"skill longer than {MAX_SKILL_LENGTH} characters")
+        return self.canonical.setdefault(cleaned.lower(), cleaned)
+
+def _number(value, field, default, maximum):
+    if value is None or (isinstance(value, str) and not value.strip()):
+        return default
+    try:
+        number = float(value)
+    except (TypeError, ValueError):
+        raise RowError(f"{field} is not a number")
+    if not 0 <= number <= maximum:
+        raise RowError(f"{field} outside 0-{maximum}")
+    return int(number) if number.is_integer() else number
+
+def clean_row(row, canonicalize, default_department=""):
+    """Validated employee dict in the roster's shape, or raises RowError"""
+    row = {COLUMN_ALIASES.get(key, key): value for key, value in row.items() if key}
+    name = " ".join(str(row.get("name") or "").split())
+    if not name:
+        raise RowError("missing name")
+    if len(name) > MAX_NAME_LENGTH:
+        raise RowError(f"name longer than {MAX_NAME_LENGTH} characters")
+    skills = row.get("skills") or []
+    if isinstance(skills, str):
+        skills = SKILL_SEPARATORS.split(skills)
+    elif not isinstance(skills, list):
+        raise RowError("skills must be a list or a separated string")
+    canonical = []
+    for skill in skills:
+        skill = canonicalize(skill)
+        if skill and skill not in canonical:
+            canonical.append(skill)
+    emp = {
+        "id": str(row.get("id") or "").strip() or str(uuid.uuid4()),
+        "name": name,
+        "skills": canonical,
+        "experience": _number(row.get("experience"), "experience", 1, MAX_EXPERIENCE),
+        "workload": _number(row.get("workload"), "workload", 0, 100),
+    }
+    department = str(row.get(DEPARTMENT_FIELD) or "").strip() or default_department
+    if not valid_department(department):
+        raise RowError("invalid department name")
+    if department:
+        emp[DEPARTMENT_FIELD] = department
+    return emp
+
+def new_report():
+    return {"rows": 0, "imported": 0, "duplicates": 0, "invalid": 0, "errors": [], "seconds": 0.0}
+
+def iter_valid(stream, fmt, canonicalize, report, default_department=""):
+    """Cleaned employees, first row per id; rejected and repeated rows are counted in report"""
+    seen = set()
+    for line_no, row in iter_rows(stream, fmt):
+        report["rows"] += 1
+        try:
+            if isinstance(row, RowError):
+                raise row
+            emp = clean_row(row, canonicalize, default_department)
+        except RowError as e:
+            report["invalid"] += 1
+            if len(report["errors"]) < MAX_REPORTED_ERRORS:
+                report["errors"].append({"line": line_no, "error": str(e)})
+            continue
+        if emp["id"] in seen:
+            report["duplicates"] += 1
+            continue
+        seen.add(emp["id"])
+        yield emp
+
+def import_roster(stream, fmt="csv", department="", path=EMP_FILE):
+    """Import employees from a text stream. Returns (new roster snapshot, report)."""
+    start = time.perf_counter()
+    report = new_report()
+    # Parse into a staging snapshot outside the roster lock; its skill names only guide spelling
+    canonicalize = SkillCanonicalizer(get_roster(path).skill_names)
+    staged = RosterSnapshot.from_employees(iter_valid(stream, fmt, canonicalize, report, department))
+    roster, already_present = import_snapshot(staged, path)
+    report["duplicates"] += already_present
+    report["imported"] = len(staged) - already_present
+    # Warm the scoring index too, so the first ranking after an import is not the slow one
+    roster.skill_id_matrix()
+    report["seconds"] = time.perf_counter() - start
+    return roster, report
+
+def import_upload(uploaded_file, department=""):
+    """import_roster for a Streamlit UploadedFile, decoded as it is read"""
+    stream = io.TextIOWrapper(uploaded_file, encoding="utf-8-sig", newline="")
+    return import_roster(stream, detect_format(uploaded_file.name), department)
+
+# ------------- Benchmark ----------------
+BENCHMARK_SKILLS = ["Python", "python", "AI/ML", "React", "JavaScript", "node", "SQL", "Database", "DevOps",
+                    "docker", "Cloud", "AWS", "Design", "Figma", "Go", "Golang", "Security", "Java", "Testing"]
+
+def write_synthetic(path, rows, fmt, seed=42):
+    """A synthetic HR export with a few invalid and duplicate rows mixed in"""
+    rng = random.Random(seed)
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        writer = csv.writer(f) if fmt == "csv" else None
+        if writer:
+            writer.writerow(["employee_id", "name", "skills", "experience", "workload", "department"])
+        for i in range(rows):
+            emp_id = f"emp-{i if rng.random() > 0.01 else max(0, i - 1)}"
+            skills = rng.sample(BENCHMARK_SKILLS, rng.randint(1, 5))
+            experience = rng.randint(0, 15) if rng.random() > 0.005 else "n/a"
+            department = rng.choice(["", "Sales", "Engineering", "Research"])
+            if writer:
+                writer.writerow([emp_id, f"Employee {i}", "; ".join(skills), experience, rng.randint(0, 100), department])
+            else:
+                f.write(json.dumps({"id": emp_id, "name": f"Employee {i}", "skills": skills, "experience": experience,
+                                    "workload": rng.randint(0, 100), "department": department}) + "\n")
+
+def benchmark(rows, fmt, trace_memory=False):
+    with tempfile.TemporaryDirectory() as tmp:
+        source = os.path.join(tmp, f"employees.{fmt}")
+        write_synthetic(source, rows, fmt)
+        size_mb = os.path.getsize(source) / 1e6
+        if trace_memory:
+            tracemalloc.start()
+        with open(source, "r", encoding="utf-8", newline="") as f:
+            roster, report = import_roster(f, fmt, path=os.path.join(tmp, EMP_FILE))
+        peak = tracemalloc.get_traced_memory()[1] / 1e6 if trace_memory else None
+        tracemalloc.stop()
+        ranking_start = time.perf_counter()
+        roster.ranking(["Python", "AI/ML", "Cloud"])
+        ranking_seconds = time.perf_counter() - ranking_start
+    print(f"{rows:,} {fmt.upper()} rows ({size_mb:.1f} MB) in {report['seconds']:.2f}s "
+          f"= {report['rows'] / report['seconds']:,.0f} rows/s (parse, validate, index, save)")
+    print(f"  imported {report['imported']:,}, duplicates {report['duplicates']:,}, invalid {report['invalid']:,}; "
+          f"{len(roster.skill_names)} distinct skills")
+    print(f"  first ranking after import: {ranking_seconds * 1000:.1f} ms")
+    if peak is not None:
+        print(f"  peak traced memory: {peak:.1f} MB")
+
+def main():
+    parser = argparse.ArgumentParser(description="Bulk import employees from a CSV or JSONL export")
+    parser.add_argument("file", nargs="?", help="CSV or JSONL file (.jsonl/.ndjson are read as JSONL)")
+    parser.add_argument("--department", default="", help="department for rows without one")
+    parser.add_argument("--benchmark", action="store_true", help="import a synthetic export into a scratch roster")
+    parser.add_argument("--rows", type=int, default=100000, help="benchmark rows")
+    parser.add_argument("--format", choices=["csv", "jsonl"], default="csv", help="benchmark file format")
+    parser.add_argument("--trace-memory", action="store_true", help="report peak memory (slows the benchmark)")
+    args = parser.parse_args()
+    if args.benchmark:
+        benchmark(args.rows, args.format, args.trace_memory)
+        return
+    if not args.file:
+        parser.error("a file to import is required (or --benchmark)")
+    with open(args.file, "r", encoding="utf-8-sig", newline="") as f:
+        roster, report = import_roster(f, detect_format(args.file), args.department)
+    print(json.dumps(report, indent=2))
+    print(f"Roster now has {len(roster):,} employees")
+
+if __name__ == "__main__":
+    main()
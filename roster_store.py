@@ -0,0 +1,319 @@
+# roster_store.py
+import functools
+import json
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
+import numpy as np
+from employee_index import EmployeeIndex
+from skill_similarity import get_model
+from core_functions import score_roster
+from shard_store import (DEPARTMENT_FIELD, load_shards, run_parallel, shard_files, shard_path, split_by_department,
+                         tag_department, write_json)
+
+EMP_FILE = "employees.json"
+RELOAD_CHECK_SECONDS = 1.0  # how often the file's mtime is checked
+RANKING_CACHE_SIZE = 256    # skill sets whose rankings are kept per snapshot
+MERGE_ATTEMPTS = 3          # optimistic merges tried before import_snapshot merges under the lock
+
+def ensure_employee_ids(employees, known_ids=None):
+    """Give every employee a stable id, reusing ids from known_ids (name -> id) when possible.
+    Returns True if any employee was changed."""
+    changed = False
+    for emp in employees:
+        if not emp.get("id"):
+            emp["id"] = (known_ids or {}).get(emp.get("name")) or str(uuid.uuid4())
+            changed = True
+    return changed
+
+class EmployeeRecord:
+    """Read-only employee row. Supports emp["name"] / emp.get("skills") like the JSON dicts it replaces."""
+    __slots__ = ("id", "name", "skills", "experience", "workload", "extra")
+    FIELDS = ("id", "name", "skills", "experience", "workload")
+
+    def __init__(self, emp, intern):
+        self.id = emp.get("id")
+        self.name = emp.get("name", "")
+        self.skills = tuple(intern(skill) for skill in emp.get("skills", []))
+        self.experience = emp.get("experience", 1)
+        self.workload = emp.get("workload", 0)
+        # Any other fields from the JSON are kept as-is
+        self.extra = {k: v for k, v in emp.items() if k not in self.FIELDS} or None
+
+    def get(self, key, default=None):
+        if key in self.FIELDS:
+            return getattr(self, key)
+        return self.extra.get(key, default) if self.extra else default
+
+    def __getitem__(self, key):
+        if key in self.FIELDS:
+            return getattr(self, key)
+        if self.extra and key in self.extra:
+            return self.extra[key]
+        raise KeyError(key)
+
+    def __contains__(self, key):
+        return key in self.FIELDS or bool(self.extra and key in self.extra)
+
+    def keys(self):
+        return list(self.FIELDS) + list(self.extra or ())
+
+    def to_dict(self):
+        emp = {"id": self.id, "name": self.name, "skills": list(self.skills),
+               "experience": self.experience, "workload": self.workload}
+        emp.update(self.extra or {})
+        return emp
+
+    def __eq__(self, other):
+        if isinstance(other, (EmployeeRecord, dict)):
+            return self.to_dict() == dict(other.to_dict() if isinstance(other, EmployeeRecord) else other)
+        return NotImplemented
+
+    __hash__ = None
+
+    def __repr__(self):
+        return f"EmployeeRecord({self.to_dict()!r})"
+
+class RosterSnapshot:
+    """Immutable roster shared read-only by every session. Columns live in contiguous arrays
+    (experience, workload, padded skill ids); updates build a new snapshot (copy-on-write)."""
+
+    def __init__(self, records, skill_names, skill_lookup, skill_matrix, experience, workload, version, index=None):
+        self.records = records
+        self.skill_names = skill_names    # skill id -> name (interned strings shared with the records)
+        self._skill_lookup = skill_lookup  # name -> skill id
+        self.skill_matrix = skill_matrix  # (employees x max skills) skill ids, -1 marks padding
+        self.experience = experience
+        self.workload = workload
+        self.version = version
+        self._index = index
+        self._similarity_ids = None
+        self._rankings = OrderedDict()
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_employees(cls, employees, version=1):
+        return cls.empty(version).with_added(employees, version)
+
+    @classmethod
+    def empty(cls, version=1):
+        return cls((), (), {}, np.zeros((0, 1), dtype=np.int32), np.zeros(0, dtype=np.float32),
+                   np.zeros(0, dtype=np.float32), version)
+
+    def __len__(self):
+        return len(self.records)
+
+    def __iter__(self):
+        return iter(self.records)
+
+    def __getitem__(self, pos):
+        return self.records[pos]
+
+    def with_added(self, employees, version=None):
+        """New snapshot with employees (dicts) appended; this snapshot is left untouched"""
+        lookup = dict(self._skill_lookup)
+        names = list(self.skill_names)
+
+        def intern(skill):
+            if skill not in lookup:
+                lookup[skill] = len(names)
+                names.append(skill)
+            return names[lookup[skill]]
+
+        added = [EmployeeRecord(emp, intern) for emp in employees]
+        width = max([self.skill_matrix.shape[1]] + [len(rec.skills) for rec in added])
+        new_rows = np.full((len(added), width), -1, dtype=np.int32)
+        for row, rec in enumerate(added):
+            new_rows[row, :len(rec.skills)] = [lookup[skill] for skill in rec.skills]
+        old_rows = self.skill_matrix
+        if old_rows.shape[1] < width:
+            old_rows = np.pad(old_rows, ((0, 0), (0, width - old_rows.shape[1])), constant_values=-1)
+        version = self.version + 1 if version is None else version
+        index = None
+        with self._lock:
+            if self._index is not None:
+                index = self._index.extended(added)
+                index.version = version
+        return RosterSnapshot(
+            self.records + tuple(added), tuple(names), lookup, np.vstack([old_rows, new_rows]),
+            np.concatenate([self.experience, np.array([rec.experience for rec in added], dtype=np.float32)]),
+            np.concatenate([self.workload, np.array([rec.workload for rec in added], dtype=np.float32)]),
+            version, index)
+
+    def with_snapshot(self, other, skip_ids=()):
+        """New snapshot with another snapshot's employees appended, except those whose id is in
+        skip_ids. Its column arrays are reused: only skill ids are remapped."""
+        keep = np.array([pos for pos, rec in enumerate(other.records) if rec.id not in skip_ids], dtype=np.intp)
+        lookup = dict(self._skill_lookup)
+        names = list(self.skill_names)
+        for name in other.skill_names:
+            if name not in lookup:
+                lookup[name] = len(names)
+                names.append(name)
+        to_merged = np.array([lookup[name] for name in other.skill_names] + [-1], dtype=np.int32)
+        new_rows = to_merged[other.skill_matrix[keep]]  # padding (-1) maps to the trailing -1
+        old_rows = self.skill_matrix
+        width = max(old_rows.shape[1], new_rows.shape[1])
+        old_rows = np.pad(old_rows, ((0, 0), (0, width - old_rows.shape[1])), constant_values=-1)
+        new_rows = np.pad(new_rows, ((0, 0), (0, width - new_rows.shape[1])), constant_values=-1)
+        added = [other.records[pos] for pos in keep]
+        version = self.version + 1
+        index = None
+        with self._lock:
+            if self._index is not None:
+                index = self._index.extended(added)
+                index.version = version
+        return RosterSnapshot(
+            self.records + tuple(added), tuple(names), lookup, np.vstack([old_rows, new_rows]),
+            np.concatenate([self.experience, other.experience[keep]]),
+            np.concatenate([self.workload, other.workload[keep]]), version, index)
+
+    @property
+    def index(self):
+        """Inverted indexes for filtering, built on first use"""
+        with self._lock:
+            if self._index is None:
+                self._index = EmployeeIndex(self.records)
+                self._index.version = self.version
+            return self._index
+
+    @property
+    def by_id(self):
+        return self.index.by_id
+
+    def skill_id_matrix(self):
+        """Skill ids translated to skill_similarity vocabulary ids, for match_scores"""
+        if self._similarity_ids is None:
+            to_model = np.array(get_model().skill_ids(list(self.skill_names)) + [-1], dtype=np.int32)
+            self._similarity_ids = to_model[self.skill_matrix]  # padding (-1) maps to the trailing -1
+        return self._similarity_ids
+
+    def ranking(self, required_skills):
+        """(positions best first, scores by position) for a skill set, cached on the snapshot
+        so every session and API request ranking the same skills shares one computation"""
+        key = tuple(sorted(required_skills))
+        with self._lock:
+            cached = self._rankings.get(key)
+            if cached is not None:
+                self._rankings.move_to_end(key)
+                return cached
+        scores = score_roster(self, required_skills)
+        ranked = np.lexsort((-self.experience, -scores))  # stable: ties keep roster order
+        with self._lock:
+            self._rankings[key] = (ranked, scores)
+            if len(self._rankings) > RANKING_CACHE_SIZE:
+                self._rankings.popitem(last=False)
+        return ranked, scores
+
+    def by_ids(self, ids):
+        by_id = self.by_id
+        return [self.records[by_id[i]] for i in ids if i in by_id]
+
+    def to_dicts(self):
+        return [rec.to_dict() for rec in self.records]
+
+_lock = threading.Lock()
+_state = {"path": None, "signature": None, "checked_at": 0.0, "roster": None, "version": 0}
+
+def _signature(path):
+    """mtimes of the roster file and its department shards; changes when any of them changes"""
+    signature = []
+    for department, file in shard_files(path):
+        try:
+            signature.append((department, os.stat(file).st_mtime_ns))
+        except OSError:
+            pass
+    return tuple(signature)
+
+def _write(path, roster, departments=None):
+    """Save the given departments' shards (default: every shard) without touching the others"""
+    groups = split_by_department(roster.records)
+    if departments is None:
+        departments = set(groups) | {department for department, _ in shard_files(path)}
+    write = functools.partial(write_json, indent=2)
+    run_parallel([(write, shard_path(path, department), [rec.to_dict() for rec in groups.get(department, [])])
+                  for department in departments])
+
+def _publish(path, roster, write=True, departments=None):
+    if write:
+        _write(path, roster, departments)
+    _state.update(path=path, signature=_signature(path), checked_at=time.monotonic(), roster=roster, version=roster.version)
+
+def _read_employees(file):
+    with open(file, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+def _reload_if_changed(path):
+    signature = _signature(path)
+    if _state["roster"] is not None and path == _state["path"] and signature == _state["signature"]:
+        return
+    employees, misplaced = [], False
+    try:
+        # Every department shard is read in parallel into the one shared roster
+        for department, shard in load_shards(path, [d for d, _ in signature], _read_employees).items():
+            shard = tag_department(shard, department)
+            misplaced = misplaced or any((emp.get(DEPARTMENT_FIELD) or "") != department for emp in shard)
+            employees.extend(shard)
+    except Exception:
+        # Keep serving the last good copy while a file is being edited
+        if _state["roster"] is not None:
+            return
+        employees = []
+    # Older files have employees without ids, and employees may be filed under the wrong
+    # department: write those back once
+    ids_added = ensure_employee_ids(employees)
+    _publish(path, RosterSnapshot.from_employees(employees, _state["version"] + 1), write=ids_added or misplaced)
+
+def get_roster(path=EMP_FILE):
+    """Process-wide roster snapshot of every department shard, reloaded when a shard's mtime
+    changes. Read-only: use add_employees/replace_employees to change it."""
+    now = time.monotonic()
+    if _state["roster"] is None or path != _state["path"] or now - _state["checked_at"] >= RELOAD_CHECK_SECONDS:
+        with _lock:
+            _reload_if_changed(path)
+            _state["checked_at"] = now
+    return _state["roster"]
+
+def add_employees(employees, path=EMP_FILE):
+    """Append employees (dicts, ids assigned if missing), save, and return the new snapshot.
+    Only the shards of the added employees' departments are rewritten."""
+    ensure_employee_ids(employees)
+    with _lock:
+        _reload_if_changed(path)
+        roster = _state["roster"].with_added(employees)
+        _publish(path, roster, departments=set(split_by_department(employees)))
+    return roster
+
+def _publish_import(path, base, roster, staged):
+    added = roster.records[len(base):]
+    _publish(path, roster, departments={rec.get(DEPARTMENT_FIELD) or "" for rec in added})
+    return roster, len(staged) - len(added)
+
+def import_snapshot(staged, path=EMP_FILE):
+    """Append the employees of a snapshot staged by an import (see roster_import) whose ids are not
+    in the roster yet, save, and return (new snapshot, number skipped as already present).
+    The merge is built outside the lock and swapped in only if no other write happened meanwhile,
+    so a large import does not hold up other roster writes."""
+    for _ in range(MERGE_ATTEMPTS):
+        base = get_roster(path)
+        roster = base.with_snapshot(staged, base.by_id)
+        with _lock:
+            _reload_if_changed(path)
+            if _state["roster"] is base:
+                return _publish_import(path, base, roster, staged)
+    # Other writers kept winning the race: merge under the lock
+    with _lock:
+        _reload_if_changed(path)
+        base = _state["roster"]
+        return _publish_import(path, base, base.with_snapshot(staged, base.by_id), staged)
+
+def replace_employees(employees, path=EMP_FILE):
+    """Replace the whole roster (every department), save, and return the new snapshot"""
+    ensure_employee_ids(employees)
+    with _lock:
+        _reload_if_changed(path)
+        roster = RosterSnapshot.from_employees(employees, _state["version"] + 1)
+        _publish(path, roster)
+    return roster
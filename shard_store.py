@@ -0,0 +1,121 @@
+# shard_store.py
+import json
+import os
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import quote, unquote
+
+# Department shards live next to the original files: shards/<department>/projects.json etc.
+# The original top-level files are the default shard (department ""), so unsharded data keeps working.
+SHARD_DIR = "shards"
+DEPARTMENT_FIELD = "department"
+LOAD_WORKERS = 8
+MAX_DEPARTMENT_LENGTH = 100
+
+_pool = ThreadPoolExecutor(max_workers=LOAD_WORKERS, thread_name_prefix="shard-load")
+_lock = threading.Lock()
+_all_cache = {}
+
+def valid_department(department):
+    """True for "" (the unsharded default) and for names that are safe as one shard directory"""
+    if department == "":
+        return True
+    return (isinstance(department, str) and department == department.strip() and department.isprintable()
+            and len(department) <= MAX_DEPARTMENT_LENGTH and department not in (".", "..")
+            and not any(sep in department for sep in ("/", "\\", os.sep)))
+
+def shard_path(path, department=""):
+    """File holding `department`'s part of the data file at path"""
+    if not department:
+        return path
+    if not valid_department(department):
+        raise ValueError(f"invalid department name: {department!r}")
+    return os.path.join(os.path.dirname(path), SHARD_DIR, quote(department, safe=" "), os.path.basename(path))
+
+def list_departments(base_dir=""):
+    """Departments that have a shard directory, sorted"""
+    root = os.path.join(base_dir, SHARD_DIR)
+    try:
+        names = os.listdir(root)
+    except OSError:
+        return []
+    return sorted(unquote(name) for name in names if os.path.isdir(os.path.join(root, name)))
+
+def shard_files(path):
+    """(department, file) for every existing shard of a data file, the default shard first"""
+    files = [("", path)] if os.path.exists(path) else []
+    for department in list_departments(os.path.dirname(path)):
+        file = shard_path(path, department)
+        if os.path.exists(file):
+            files.append((department, file))
+    return files
+
+def read_json(path, default):
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return default
+
+def write_json(path, data, **dump_options):
+    # Write to a temp file and rename so readers never see a half-written shard. The temp name is
+    # unique, so concurrent writers (other sessions or processes) never share one.
+    directory = os.path.dirname(path) or "."
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=os.path.basename(path) + ".", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False, **dump_options)
+        os.chmod(tmp_path, 0o644)  # mkstemp creates it owner-only
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
+
+def run_parallel(calls):
+    """Run (function, args...) tuples on the shard loading pool; results in call order"""
+    futures = [_pool.submit(call[0], *call[1:]) for call in calls]
+    return [future.result() for future in futures]
+
+def load_shards(path, departments=None, loader=None):
+    """{department: list} for the given departments (default: every existing shard), read in parallel.
+    loader(file) replaces the plain JSON read (e.g. chat_store.load_recent)."""
+    if departments is None:
+        departments = [department for department, _ in shard_files(path)]
+    loader = loader or (lambda file: read_json(file, []))
+    results = run_parallel([(loader, shard_path(path, department)) for department in departments])
+    return dict(zip(departments, results))
+
+def _signature(path):
+    files = shard_files(path)
+    return tuple((department, os.stat(file).st_mtime_ns) for department, file in files)
+
+def load_all(path):
+    """Cross-shard view: every shard's items, each tagged with its department. Cached per process
+    until a shard file changes; treat the returned list as read-only."""
+    signature = _signature(path)
+    cached = _all_cache.get(path)
+    if cached and cached[0] == signature:
+        return cached[1]
+    with _lock:
+        items = []
+        for department, shard in load_shards(path, [department for department, _ in signature]).items():
+            items.extend(tag_department(shard, department))
+        _all_cache[path] = (signature, items)
+    return items
+
+def tag_department(items, department):
+    """Items with their department field filled in from the shard they were read from"""
+    return [item if item.get(DEPARTMENT_FIELD) or not department else dict(item, **{DEPARTMENT_FIELD: department})
+            for item in items]
+
+def split_by_department(items, default=""):
+    """{department: items} for writing items back to their shards"""
+    groups = {}
+    for item in items:
+        groups.setdefault(item.get(DEPARTMENT_FIELD) or default, []).append(item)
+    return groups
@@ -0,0 +1,236 @@
+# skill_similarity.py
+import hashlib
+import os
+import threading
+import zlib
+from collections import namedtuple
+from functools import lru_cache
+import numpy as np
+
+CACHE_FILE = os.getenv("SKILL_SIMILARITY_CACHE", "skill_similarity.npz")
+NGRAM_SIZES = (2, 3)
+HASH_DIM = 512
+ALIAS_CREDIT = 0.8    # similarity of two skills that share every alias group but not their spelling
+MIN_SPELLING = 0.6    # spelling-only matches below this are noise ("django" vs "go")
+MIN_SIMILARITY = 0.4  # below this a pair gets no credit at all
+MODEL_VERSION = 1     # bump when the vectorisation below changes, to invalidate the disk cache
+SAVE_DELAY_SECONDS = 5.0  # new skills are written to the disk cache in one batch, off the request path
+
+# Skills that should count as (partially) interchangeable even though the names share no letters.
+# A skill can sit in several groups.
+SKILL_ALIASES = {
+    "Python": ["python", "django", "flask", "fastapi", "pandas"],
+    "JavaScript": ["javascript", "js", "node", "nodejs", "node.js", "typescript", "react", "vue", "angular", "express"],
+    "React": ["react", "react.js", "react native", "next.js", "redux"],
+    "Frontend": ["frontend", "ui", "react", "vue", "angular", "html", "css", "design"],
+    "Design": ["design", "figma", "ui", "ux", "ui/ux", "sketch"],
+    "Database": ["database", "sql", "mysql", "postgresql", "postgres", "mongodb", "redis", "sqlite"],
+    "DevOps": ["devops", "docker", "kubernetes", "k8s", "ci/cd", "terraform", "ansible", "jenkins"],
+    "Cloud": ["cloud", "aws", "azure", "gcp", "google cloud", "kubernetes", "docker"],
+    "AI/ML": ["ai/ml", "ai", "ml", "machine learning", "data science", "tensorflow", "pytorch", "deep learning", "nlp"],
+    "Security": ["security", "cybersecurity", "encryption", "authentication", "penetration testing"],
+    "Blockchain": ["blockchain", "solidity", "ethereum", "smart contracts", "web3"],
+    "Go": ["go", "golang"],
+    "Java": ["java", "spring", "hibernate", "kotlin"],
+    "Mobile": ["mobile", "ios", "android", "flutter", "swift", "react native", "kotlin"],
+    "Embedded": ["embedded", "c", "c++", "firmware", "rtos"],
+    "Testing": ["testing", "qa", "selenium", "pytest", "test automation"],
+}
+ALIAS_GROUPS = sorted(SKILL_ALIASES)
+
+def normalize(skill):
+    return " ".join(skill.lower().split())
+
+_groups_by_term = {}
+for _group, _terms in SKILL_ALIASES.items():
+    for _term in _terms + [_group]:
+        _groups_by_term.setdefault(normalize(_term), set()).add(ALIAS_GROUPS.index(_group))
+
+def _vector(skill):
+    """Unit hashed character n-gram vector of the name followed by a unit alias-group vector"""
+    name = normalize(skill)
+    padded = f" {name} "
+    ngrams = np.zeros(HASH_DIM, dtype=np.float32)
+    for n in NGRAM_SIZES:
+        for i in range(len(padded) - n + 1):
+            ngrams[zlib.crc32(padded[i:i + n].encode("utf-8")) % HASH_DIM] += 1.0
+    groups = np.zeros(len(ALIAS_GROUPS), dtype=np.float32)
+    for g in _groups_by_term.get(name, ()):
+        groups[g] = 1.0
+    parts = []
+    for part in (ngrams, groups):
+        norm = np.linalg.norm(part)
+        parts.append(part / norm if norm else part)
+    return np.concatenate(parts)
+
+def _similarity(a, b):
+    """Spelling similarity or (discounted) alias-group similarity, whichever is higher"""
+    spelling = a[:, :HASH_DIM] @ b[:, :HASH_DIM].T
+    spelling[spelling < MIN_SPELLING] = 0.0
+    aliases = a[:, HASH_DIM:] @ b[:, HASH_DIM:].T
+    sim = np.maximum(spelling, ALIAS_CREDIT * aliases)
+    sim[sim < MIN_SIMILARITY] = 0.0
+    return sim
+
+def _base_vocabulary():
+    terms = set()
+    for group, aliases in SKILL_ALIASES.items():
+        terms.add(normalize(group))
+        terms.update(normalize(a) for a in aliases)
+    return sorted(terms)
+
+def _fingerprint(vocab):
+    payload = "\n".join([str(MODEL_VERSION), str(HASH_DIM), str(NGRAM_SIZES), str(ALIAS_CREDIT), str(MIN_SPELLING), str(MIN_SIMILARITY), str(SKILL_ALIASES)] + vocab)
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()
+
+# Everything a reader needs, published in one assignment so ids never point past the matrix
+_State = namedtuple("_State", "ids vectors matrix version")
+
+class SimilarityModel:
+    """Skill vocabulary with a dense skill x skill similarity matrix (0 for unrelated skills, 1 on the diagonal)"""
+
+    def __init__(self, cache_file=CACHE_FILE):
+        self.cache_file = cache_file
+        self.lock = threading.Lock()
+        self._save_timer = None
+        # Preallocated buffers; the published state holds views of their first n rows/columns, and new
+        # skills are written beyond those views, so readers of an older state are never disturbed
+        self._vector_buffer = np.zeros((0, HASH_DIM + len(ALIAS_GROUPS)), dtype=np.float32)
+        self._matrix_buffer = np.zeros((0, 0), dtype=np.float32)
+        self._state = _State({}, self._vector_buffer, self._matrix_buffer, 0)
+        if not self._load():
+            self.add_skills(_base_vocabulary(), save=False)
+            self.save()
+
+    ids = property(lambda self: self._state.ids)
+    vectors = property(lambda self: self._state.vectors)
+    matrix = property(lambda self: self._state.matrix)
+    version = property(lambda self: self._state.version)
+
+    def _load(self):
+        try:
+            with np.load(self.cache_file, allow_pickle=False) as data:
+                vocab = [str(s) for s in data["vocab"]]
+                if str(data["fingerprint"]) != _fingerprint(vocab):
+                    return False
+                self._vector_buffer = data["vectors"]
+                self._matrix_buffer = data["matrix"]
+        except (OSError, KeyError, ValueError):
+            return False
+        self._state = _State({skill: i for i, skill in enumerate(vocab)}, self._vector_buffer, self._matrix_buffer, 0)
+        return True
+
+    def save(self):
+        state = self._state
+        vocab = sorted(state.ids, key=state.ids.get)
+        try:
+            tmp_path = self.cache_file + ".tmp.npz"
+            np.savez_compressed(tmp_path, vocab=np.array(vocab), fingerprint=np.array(_fingerprint(vocab)),
+                                vectors=state.vectors, matrix=state.matrix)
+            os.replace(tmp_path, self.cache_file)
+        except OSError:
+            pass  # the cache is only an optimisation
+
+    def _saved(self):
+        with self.lock:
+            self._save_timer = None
+        self.save()
+
+    def _schedule_save(self):
+        # Called with self.lock held: one delayed save covers every skill added until it runs
+        if self._save_timer is None:
+            self._save_timer = threading.Timer(SAVE_DELAY_SECONDS, self._saved)
+            self._save_timer.daemon = True
+            self._save_timer.start()
+
+    def _reserve(self, n):
+        """Make the buffers hold n skills, doubling so the matrix is rarely copied"""
+        capacity = len(self._matrix_buffer)
+        if n <= capacity:
+            return
+        capacity = max(n, 2 * capacity, 64)
+        old = self._state
+        vectors = np.zeros((capacity, self._vector_buffer.shape[1]), dtype=np.float32)
+        vectors[:len(old.ids)] = old.vectors
+        matrix = np.zeros((capacity, capacity), dtype=np.float32)
+        matrix[:len(old.ids), :len(old.ids)] = old.matrix
+        self._vector_buffer, self._matrix_buffer = vectors, matrix
+
+    def add_skills(self, skills, save=True):
+        """Add unseen skills to the vocabulary, writing their rows/columns into the matrix buffer"""
+        with self.lock:
+            old = self._state
+            new = sorted({normalize(s) for s in skills} - set(old.ids))
+            if not new:
+                return
+            old_n, n = len(old.ids), len(old.ids) + len(new)
+            self._reserve(n)
+            vectors, matrix = self._vector_buffer, self._matrix_buffer
+            vectors[old_n:n] = np.stack([_vector(s) for s in new])
+            cross = _similarity(vectors[old_n:n], vectors[:n])
+            matrix[old_n:n, :n] = cross
+            matrix[:n, old_n:n] = cross.T
+            matrix[np.arange(old_n, n), np.arange(old_n, n)] = 1.0
+            ids = dict(old.ids)
+            ids.update((skill, old_n + i) for i, skill in enumerate(new))
+            self._state = _State(ids, vectors[:n], matrix[:n, :n], old.version + 1)
+            if save:
+                self._schedule_save()
+
+    def skill_ids(self, skills):
+        missing = [s for s in skills if normalize(s) not in self._state.ids]
+        if missing:
+            self.add_skills(missing)
+        ids = self._state.ids
+        return [ids[normalize(s)] for s in skills]
+
+    def similarity(self, a, b):
+        ia, ib = self.skill_ids([a, b])
+        return float(self._state.matrix[ia, ib])
+
+_model = None
+_model_lock = threading.Lock()
+
+def get_model():
+    """Process-wide similarity model, loaded from (or written to) the disk cache on first use"""
+    global _model
+    if _model is None:
+        with _model_lock:
+            if _model is None:
+                _model = SimilarityModel()
+    return _model
+
+def skill_id_matrix(skill_lists):
+    """Pad per-employee skill-id lists into an (employees x max_skills) int array; -1 marks padding"""
+    model = get_model()
+    all_skills = {s for skills in skill_lists for s in skills}
+    model.skill_ids(list(all_skills))
+    ids = model.ids  # one state: ids only ever grow, so every skill above is in it
+    width = max((len(skills) for skills in skill_lists), default=0) or 1
+    matrix = np.full((len(skill_lists), width), -1, dtype=np.int32)
+    for row, skills in enumerate(skill_lists):
+        if skills:
+            matrix[row, :len(skills)] = [ids[normalize(s)] for s in skills]
+    return matrix
+
+@lru_cache(maxsize=512)
+def _required_rows(required_skills, model_version):
+    model = get_model()
+    req_ids = model.skill_ids(list(required_skills))
+    # Column -1 (padding) points at an all-zero extra column
+    rows = np.concatenate([model.matrix[req_ids], np.zeros((len(req_ids), 1), dtype=np.float32)], axis=1)
+    rows.flags.writeable = False
+    return rows
+
+def required_vector(required_skills):
+    """Similarity rows of a project's required skills against every known skill, cached per skill set"""
+    model = get_model()
+    model.skill_ids(required_skills)  # extend the vocabulary first so the cache key is final
+    return _required_rows(tuple(required_skills), model.version)
+
+def match_scores(required_skills, id_matrix):
+    """Partial-credit match per employee: mean over required skills of the best similarity
+    to any of the employee's skills, in [0, 1]. One gather over the whole roster."""
+    if not required_skills or id_matrix.shape[0] == 0:
+        return np.zeros(id_matrix.shape[0], dtype=np.float32)
+    return required_vector(required_skills)[:, id_matrix].max(axis=2).mean(axis=0)
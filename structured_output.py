@@ -0,0 +1,164 @@
+# structured_output.py
+import json
+import threading
+from collections import Counter
+
+MAX_SCAN_CHARS = 200000  # longer responses are cut before scanning
+MAX_CANDIDATES = 20      # opening brackets tried as the start of the JSON before giving up
+
+_OPENERS = {"{": "}", "[": "]"}
+_FENCE = "```"
+
+# Expected shape of the JSON each call type asks for.
+# fields: name -> (accepted types, required); choices: name -> allowed (lower-case) values
+SCHEMAS = {
+    "parameters": {
+        "type": dict,
+        "fields": {
+            "summary": (str, False),
+            "complexity": (str, True),
+            "recommended_team_size": ((int, float), True),
+            "estimated_budget": ((int, float), True),
+            "timeline_weeks": ((int, float), True),
+            "risk_level": (str, True),
+            "key_technologies": (list, False),
+        },
+        "choices": {
+            "complexity": ["low", "medium", "high", "very high"],
+            "risk_level": ["low", "medium", "high"],
+        },
+    },
+    "skills": {"type": list, "items": str},
+}
+
+_counts_lock = threading.Lock()
+_counts = Counter()
+
+def _fenced_blocks(text):
+    """Contents of ``` fenced blocks (language tag dropped), in order"""
+    blocks = []
+    start = text.find(_FENCE)
+    while start != -1:
+        end = text.find(_FENCE, start + 3)
+        if end == -1:
+            break
+        body = text[start + 3:end]
+        first_line, _, rest = body.partition("\n")
+        blocks.append(rest if first_line.strip().isalpha() else body)
+        start = text.find(_FENCE, end + 3)
+    return blocks
+
+def _span_end(text, start):
+    """Index just past the balanced span opening at text[start], or None if a bracket is
+    mismatched or the span never closes"""
+    stack = []
+    in_string = escaped = False
+    for i in range(start, len(text)):
+        ch = text[i]
+        if in_string:
+            if escaped:
+                escaped = False
+            elif ch == "\\":
+                escaped = True
+            elif ch == '"':
+                in_string = False
+        elif ch == '"':
+            in_string = True
+        elif ch in _OPENERS:
+            stack.append(_OPENERS[ch])
+        elif ch in "}]":
+            if ch != stack.pop():
+                return None
+            if not stack:
+                return i + 1
+    return None
+
+def _next_opener(text, pos, kinds):
+    found = [i for i in (text.find(kind, pos) for kind in kinds) if i != -1]
+    return min(found) if found else -1
+
+def _scan(text, kinds):
+    """First balanced span that parses. A span that does not (mismatched, unterminated or invalid
+    JSON) is retried from the next opening bracket inside it, so JSON wrapped in stray brackets is
+    still found."""
+    start = _next_opener(text, 0, kinds)
+    tried = 0
+    while start != -1 and tried < MAX_CANDIDATES:
+        tried += 1
+        end = _span_end(text, start)
+        if end is not None:
+            try:
+                return json.loads(text[start:end])
+            except ValueError:
+                pass
+        start = _next_opener(text, start + 1, kinds)
+    return None
+
+def extract_json(text, kinds="{["):
+    """First valid JSON object/array in an LLM response (code fences preferred), or None"""
+    if not text:
+        return None
+    text = text[:MAX_SCAN_CHARS]
+    stripped = text.strip()
+    if stripped[:1] in kinds:
+        try:
+            return json.loads(stripped)
+        except ValueError:
+            pass
+    for block in _fenced_blocks(text):
+        found = _scan(block, kinds)
+        if found is not None:
+            return found
+    return _scan(text, kinds)
+
+def validate(obj, call_type):
+    """Check obj against SCHEMAS[call_type]; returns a cleaned copy or None"""
+    schema = SCHEMAS.get(call_type)
+    if schema is None:
+        return obj
+    if not isinstance(obj, schema["type"]):
+        return None
+    if schema["type"] is list:
+        return [item for item in obj if isinstance(item, schema["items"])] or None
+    cleaned = dict(obj)
+    for field, (types, required) in schema["fields"].items():
+        value = obj.get(field)
+        if value is None:
+            if required:
+                return None
+            cleaned.pop(field, None)
+        elif isinstance(value, bool) or not isinstance(value, types):
+            return None
+    for field, allowed in schema.get("choices", {}).items():
+        value = cleaned[field].strip().lower()
+        if value not in allowed:
+            return None
+        cleaned[field] = value
+    return cleaned
+
+def parse_structured(raw, call_type):
+    """Extract and validate the JSON for call_type from a raw response, counting failures"""
+    schema = SCHEMAS.get(call_type)
+    kinds = "{["
+    if schema:
+        kinds = "[" if schema["type"] is list else "{"
+    obj = extract_json(raw, kinds)
+    if obj is None:
+        _count(call_type, "no_json")
+        return None
+    cleaned = validate(obj, call_type)
+    _count(call_type, "ok" if cleaned is not None else "schema_mismatch")
+    return cleaned
+
+def _count(call_type, outcome):
+    with _counts_lock:
+        _counts[(call_type, outcome)] += 1
+
+def get_parse_metrics():
+    """{call_type: {"ok": n, "no_json": n, "schema_mismatch": n}}"""
+    with _counts_lock:
+        items = list(_counts.items())
+    metrics = {}
+    for (call_type, outcome), n in items:
+        metrics.setdefault(call_type, {})[outcome] = n
+    return metrics
@@ -1,10 +1,25 @@
 # team_builder.py
 import streamlit as st
 import pandas as pd
-from utils import save_json
-from core_functions import score_employee
+from utils import save_json, data_path
+from core_functions import score_employee, calculate_project_timeline, estimate_project_cost
+from portfolio_summary import get_summary, update_project
+from project_similarity import index_project
+from roster_store import get_roster
 
 PROJ_FILE = "projects.json"
+TOP_CANDIDATES = 10
+
+def save_team(project):
+    """Persist a re-teamed project: team size, timeline and cost follow the new team, and the
+    portfolio summary, similarity index and department shard are updated with them"""
+    team = project.get('team', [])
+    project['team_size'] = len(team)
+    project['timeline'] = calculate_project_timeline(project.get('complexity', 'medium'), len(team))
+    project['estimated_cost'] = estimate_project_cost(team, project['timeline'])
+    update_project(get_summary(), project)
+    index_project(project)
+    save_json(data_path(PROJ_FILE), st.session_state.projects)
 
 def render_team_builder():
     st.header("👥 Team Builder")
@@ -29,12 +44,20 @@ def render_team_builder():
             skills_html += "</div>"
             st.markdown(skills_html, unsafe_allow_html=True)
         
+        # Ranked once per roster snapshot and skill set, shared by every session
+        roster = get_roster()
+        ranked, scores = roster.ranking(project.get('required_skills', []))
+
         # Current team
         st.subheader("Current Team")
         if project.get('team'):
             team_data = []
             for emp in project['team']:
-                score = score_employee(emp.get("skills", []), project.get('required_skills', []), emp.get("experience", 1))
+                pos = roster.by_id.get(emp.get('id'))
+                if pos is not None:
+                    score = scores[pos]
+                else:
+                    score = score_employee(emp.get("skills", []), project.get('required_skills', []), emp.get("experience", 1))
                 team_data.append({
                     "Name": emp['name'],
                     "Skills": ", ".join(emp['skills']),
@@ -47,31 +70,39 @@ def render_team_builder():
             
             # Remove buttons
             for i, emp in enumerate(project['team']):
-                if st.button(f"Remove {emp['name']}", key=f"remove_{project['id']}_{i}"):
+                if st.button(f"Remove {emp['name']}", key=f"remove_{project['id']}_{emp.get('id', i)}"):
                     project['team'].pop(i)
-                    save_json(PROJ_FILE, st.session_state.projects)
+                    save_team(project)
                     st.rerun()
         else:
             st.info("No team members selected yet.")
         
-        # Available employees
+        # Available employees: best-ranked candidates not already on the team
         st.subheader("Available Employees")
-        available_emps = [e for e in st.session_state.employees if e not in project.get('team', [])]
+        team_ids = {e.get('id') for e in project.get('team', [])}
+        search = st.text_input("Search employees", key=f"candidate_search_{project['id']}").strip().lower()
+        available_emps = []
+        for pos in ranked:
+            emp = roster[pos]
+            if emp.get('id') in team_ids or (search and search not in emp['name'].lower()):
+                continue
+            available_emps.append((emp, scores[pos]))
+            if len(available_emps) == TOP_CANDIDATES:
+                break
         
         if available_emps:
-            for i, emp in enumerate(available_emps):
-                score = score_employee(emp.get("skills", []), project.get('required_skills', []), emp.get("experience", 1))
+            for emp, score in available_emps:
                 col1, col2, col3 = st.columns([3, 2, 1])
                 with col1:
                     st.write(f"**{emp['name']}** - {', '.join(emp['skills'])}")
                 with col2:
                     st.write(f"Match: {score}%")
                 with col3:
-                    if st.button("Add", key=f"add_{i}"):
+                    if st.button("Add", key=f"add_{project['id']}_{emp['id']}"):
                         if 'team' not in project:
                             project['team'] = []
-                        project['team'].append(emp)
-                        save_json(PROJ_FILE, st.session_state.projects)
+                        project['team'].append(emp.to_dict())
+                        save_team(project)
                         st.rerun()
         else:
-            st.info("No available employees.")
\ No newline at end of file
+            st.info("No available employees.")
@@ -0,0 +1,56 @@
+# test_advice_prefetch.py
+import glob
+import json
+import os
+import shutil
+
+import pytest
+from streamlit.testing.v1 import AppTest
+
+import advice_prefetch
+
+APP_DIR = os.path.dirname(os.path.abspath(__file__))
+
+@pytest.fixture
+def app(tmp_path, monkeypatch):
+    # Run against a scratch copy of the data files, with prefetching enabled and its jobs recorded
+    for path in glob.glob(os.path.join(APP_DIR, "*.json")) + glob.glob(os.path.join(APP_DIR, "*.npz")):
+        shutil.copy(path, tmp_path)
+    monkeypatch.chdir(tmp_path)
+    with open("projects.json", encoding="utf-8") as f:
+        projects = json.load(f)
+    for i, project in enumerate(projects):
+        project["name"] = f"{project['name']} {i}"  # distinct, so the advisor's picker can change
+        project["team"] = []  # every project has skill gaps, so there is something to prefetch
+    with open("projects.json", "w", encoding="utf-8") as f:
+        json.dump(projects, f)
+    submitted = []
+    monkeypatch.setattr(advice_prefetch, "LLM_ENABLED", True)
+    monkeypatch.setattr(advice_prefetch, "submit", lambda key, *args: submitted.append(key) or key)
+    monkeypatch.setattr(advice_prefetch, "_budget", advice_prefetch.gemini_client.TokenBucket(1000, 1000))
+    at = AppTest.from_file(os.path.join(APP_DIR, "main_app.py"), default_timeout=60)
+    at.run()
+    return at, submitted
+
+def test_no_prefetch_on_reruns_of_other_tabs(app):
+    at, submitted = app
+    at.text_input(key=[w.key for w in at.text_input if w.key and w.key.startswith("candidate_search_")][0]).input("a").run()
+    at.run()
+    assert not at.exception
+    assert submitted == []
+    assert "advice_prefetch" not in at.session_state
+
+def test_prefetch_starts_once_a_project_is_picked_in_the_advisor(app):
+    at, submitted = app
+    picker = at.selectbox(key="advisor_project")
+    picker.select(picker.options[-1]).run()
+    assert not at.exception
+    assert len(submitted) == advice_prefetch.PREFETCH_PER_PROJECT
+    assert len(at.session_state.advice_prefetch["keys"]) == advice_prefetch.PREFETCH_PER_PROJECT
+
+def test_prefetch_starts_once_a_suggestion_is_asked(app):
+    at, submitted = app
+    at.button(key="suggest_0").click().run()
+    assert not at.exception
+    # The question itself, then the suggestions prefetched on the rerun it triggers
+    assert len(submitted) == 1 + advice_prefetch.PREFETCH_PER_PROJECT
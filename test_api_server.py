@@ -0,0 +1,70 @@
+# test_api_server.py
+import json
+import shutil
+import threading
+import urllib.error
+import urllib.request
+from http.server import ThreadingHTTPServer
+
+import pytest
+
+import api_server
+
+@pytest.fixture
+def base_url(tmp_path, monkeypatch):
+    # A scratch copy of the roster, so the server never writes back to the repo's data
+    shutil.copy("employees.json", tmp_path / "employees.json")
+    monkeypatch.setattr(api_server, "EMP_FILE", str(tmp_path / "employees.json"))
+    server = ThreadingHTTPServer(("127.0.0.1", 0), api_server.ApiHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
+
+def post(base_url, path, body):
+    request = urllib.request.Request(base_url + path, data=json.dumps(body).encode("utf-8"),
+                                     headers={"Content-Type": "application/json"}, method="POST")
+    try:
+        with urllib.request.urlopen(request) as response:
+            return response.status, json.load(response)
+    except urllib.error.HTTPError as e:
+        return e.code, json.load(e)
+
+@pytest.mark.parametrize("path", ["/team", "/skill-gaps", "/estimate"])
+@pytest.mark.parametrize("body, message", [
+    ({"required_skills": "Python"}, "required_skills"),
+    ({"required_skills": ["Python", ""]}, "required_skills"),
+    ({"required_skills": ["Python", 3]}, "required_skills"),
+    ({"required_skills": ["Python"], "team_size": -1}, "team_size"),
+    ({"required_skills": ["Python"], "team_size": "3"}, "team_size"),
+    ({"required_skills": ["Python"], "team_size": 2.5}, "team_size"),
+    ({"required_skills": ["Python"], "team_size": True}, "team_size"),
+    ({"required_skills": ["Python"], "team_ids": "abc"}, "team_ids"),
+])
+def test_bad_payloads_are_rejected(base_url, path, body, message):
+    status, payload = post(base_url, path, body)
+    assert status == 400
+    assert message in payload["error"]
+
+def test_bad_batch_project_is_rejected(base_url):
+    status, payload = post(base_url, "/batch/score", {"projects": [
+        {"id": "ok", "required_skills": ["Python"]},
+        {"id": "bad", "required_skills": "Python"},
+    ]})
+    assert status == 400
+    assert payload["error"].startswith("projects[1]: required_skills")
+
+def test_batch_projects_must_be_objects(base_url):
+    status, _ = post(base_url, "/batch/score", {"projects": ["Python"]})
+    assert status == 400
+
+def test_valid_team_request(base_url):
+    status, payload = post(base_url, "/team", {"required_skills": ["Python"], "team_size": 2})
+    assert status == 200
+    assert len(payload["team"]) == 2
+
+def test_zero_team_size_is_allowed(base_url):
+    status, payload = post(base_url, "/team", {"required_skills": ["Python"], "team_size": 0})
+    assert status == 200
+    assert payload["team"] == []
@@ -0,0 +1,21 @@
+# test_job_queue.py
+import time
+
+from job_queue import get_job, notify, submit
+
+def _wait(key):
+    deadline = time.monotonic() + 5
+    while get_job(key)["status"] not in ("done", "failed") and time.monotonic() < deadline:
+        time.sleep(0.01)
+    return get_job(key)
+
+def _fall_back():
+    notify("model disabled", "error")
+    notify("rate limited")
+    notify("rate limited")
+    return "fallback"
+
+def test_notices_keep_their_level():
+    job = _wait(submit("test:notices", _fall_back))
+    assert job["result"] == "fallback"
+    assert job["notices"] == [("error", "model disabled"), ("warning", "rate limited")]
@@ -2,6 +2,16 @@
 import json
 import os
 import streamlit as st
+from knowledge_base import get_knowledge_base
+from chat_store import load_recent
+from roster_store import get_roster
+from shard_store import shard_path, run_parallel, write_json, valid_department
+
+# Department whose project/chat shards a session works on ("" = the unsharded top-level files);
+# a session can pick another one with ?department=... or the sidebar
+DEFAULT_DEPARTMENT = os.getenv("DEPARTMENT", "")
+if not valid_department(DEFAULT_DEPARTMENT):
+    raise ValueError(f"DEPARTMENT is not a valid department name: {DEFAULT_DEPARTMENT!r}")
 
 # Helpful save/load functions
 def load_json_if_exists(path, default):
@@ -13,26 +23,60 @@ def load_json_if_exists(path, default):
             return default
     return default
 
+def _json_default(obj):
+    # Roster records (roster_store.EmployeeRecord) referenced from projects
+    if hasattr(obj, "to_dict"):
+        return obj.to_dict()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
 def save_json(path, data):
     try:
-        with open(path, "w", encoding="utf-8") as f:
-            json.dump(data, f, indent=2, ensure_ascii=False)
+        write_json(path, data, indent=2, default=_json_default)
     except Exception as e:
         st.error(f"Could not save {path}: {e}")
 
+def data_path(path):
+    """The session's department shard of a data file (see shard_store); writes only ever touch it"""
+    return shard_path(path, st.session_state.get('department', DEFAULT_DEPARTMENT))
+
+def link_team_ids(projects, employees):
+    """Attach roster ids to team members saved before employees had ids"""
+    ids_by_name = {}
+    for emp in employees:
+        ids_by_name.setdefault(emp.get("name"), emp["id"])
+    changed = False
+    for project in projects:
+        for member in project.get("team", []):
+            if not member.get("id") and member.get("name") in ids_by_name:
+                member["id"] = ids_by_name[member["name"]]
+                changed = True
+    return changed
+
 def initialize_session_state(EMP_FILE, PROJ_FILE, CHAT_FILE, KNOWLEDGE_FILE):
     """Initialize session state variables"""
-    if 'employees' not in st.session_state:
-        st.session_state.employees = load_json_if_exists(EMP_FILE, [])
+    # The roster is one read-only snapshot shared by all sessions (see roster_store.get_roster)
+    roster = get_roster(EMP_FILE)
+    if 'department' not in st.session_state:
+        department = st.query_params.get("department", DEFAULT_DEPARTMENT)
+        if not valid_department(department):
+            st.warning(f"Ignoring invalid department {department!r}")
+            department = DEFAULT_DEPARTMENT
+        st.session_state.department = department
+    # Only this department's shards are loaded, projects and chat in parallel
+    loads = {}
     if 'projects' not in st.session_state:
-        st.session_state.projects = load_json_if_exists(PROJ_FILE, [])
+        loads['projects'] = (load_json_if_exists, data_path(PROJ_FILE), [])
+    if 'chat_history' not in st.session_state:
+        # Only the hot tier; older entries stay in the compressed archive (see chat_store)
+        loads['chat_history'] = (load_recent, data_path(CHAT_FILE))
+    for name, value in zip(loads, run_parallel(loads.values())):
+        st.session_state[name] = value
+    if 'projects' in loads and link_team_ids(st.session_state.projects, roster):
+        save_json(data_path(PROJ_FILE), st.session_state.projects)
     if 'selected_employees' not in st.session_state:
         st.session_state.selected_employees = []
-    if 'chat_history' not in st.session_state:
-        st.session_state.chat_history = load_json_if_exists(CHAT_FILE, [])
-    if 'knowledge_base' not in st.session_state:
-        from knowledge_base import ADVANCED_KNOWLEDGE
-        st.session_state.knowledge_base = load_json_if_exists(KNOWLEDGE_FILE, ADVANCED_KNOWLEDGE)
+    # The knowledge base is shared by all sessions (see knowledge_base.get_knowledge_base)
+    get_knowledge_base(KNOWLEDGE_FILE)
     if 'ai_predictions' not in st.session_state:
         st.session_state.ai_predictions = None
     if 'current_question' not in st.session_state: